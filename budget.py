@@ -0,0 +1,98 @@
+# made by SSJMarx with the help of GLM 4.6
+
+from constants import *
+from timing import sim_clock, expiry_scheduler, discard_from
+from effects import particle_pool
+
+# Categories that gameplay depends on - cosmetic particles make way for these
+CRITICAL_CATEGORIES = ('circle', 'projectile')
+
+
+class ObjectBudget:
+    """Central object cap with per-category counters, a reserve for critical entities and particle eviction."""
+
+    def __init__(self, limit=INITIAL_MAX_OBJECTS):
+        self.particles = []  # The live particle list (eviction removes from it directly)
+        self.reset(limit, self.particles)
+
+    def reset(self, limit, particles):
+        """Start counting from zero for a new game using the given live particle list."""
+        self.limit = limit
+        self.particles = particles
+        self.counts = {'circle': 0, 'projectile': 0, 'particle': 0}
+        self.refused = {'circle': 0, 'projectile': 0, 'particle': 0}  # Requests that got less than asked
+        self.evicted = 0
+
+    @property
+    def total(self):
+        """Objects currently alive across every category."""
+        return self.counts['circle'] + self.counts['projectile'] + self.counts['particle']
+
+    def room(self, category):
+        """Free capacity for a category (particles may not dip into the critical reserve)."""
+        if category in CRITICAL_CATEGORIES:
+            return self.limit - self.total
+        return self.limit - BUDGET_CRITICAL_RESERVE - self.total
+
+    def grant(self, category, wanted, partial=True):
+        """Reserve up to wanted objects of a category; returns how many the caller may create."""
+        if wanted <= 0:
+            return 0
+        shortfall = wanted - self.room(category)
+        if shortfall > 0:
+            # Old cosmetic particles give way instead of the new object being refused
+            self.evict(shortfall)
+        granted = max(0, min(wanted, self.room(category)))
+        if granted < wanted:
+            self.refused[category] += 1
+            if not partial:
+                return 0
+        self.counts[category] += granted
+        return granted
+
+    def added(self, category, count=1):
+        """Count objects that are created unconditionally (e.g. split children)."""
+        self.counts[category] += count
+        overflow = self.total - self.limit
+        if overflow > 0 and category in CRITICAL_CATEGORIES:
+            self.evict(overflow)
+
+    def removed(self, category, count=1):
+        """Count objects that left the game."""
+        self.counts[category] -= count
+
+    def evict(self, count):
+        """Remove up to count of the oldest non-persistent particles; returns how many went."""
+        now = sim_clock.now
+        victims = []
+        # The particle list is in spawn order, so the oldest candidates come first
+        for particle in self.particles:
+            if len(victims) >= count:
+                break
+            if particle.is_persistent:
+                continue
+            if now - particle.spawn_time < BUDGET_EVICT_MIN_AGE:
+                break  # Everything after this is younger still
+            victims.append(particle)
+
+        if victims:
+            discard_from(self.particles, victims)
+            for particle in victims:
+                expiry_scheduler.cancel(particle)
+            particle_pool.release_all(victims)
+            self.counts['particle'] -= len(victims)
+            self.evicted += len(victims)
+        return len(victims)
+
+    def report(self):
+        """Report per-category counts, refusals and evictions."""
+        return {
+            'limit': self.limit,
+            'counts': dict(self.counts),
+            'refused': dict(self.refused),
+            'evicted': self.evicted,
+        }
+
+
+# Global object budget instance
+object_budget = ObjectBudget()
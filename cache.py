@@ -1,235 +1,349 @@
 # made by SSJMarx with the help of GLM 4.6
 
-import random
 import math
 import time
+import threading
+from collections import deque
+from itertools import chain
+import numpy as np
 from constants import *
+from rng import rng
 
 
 class CalculationCache:
     """Caches expensive calculations to improve performance."""
-    
+
     def __init__(self):
         self.is_preloaded = False
-        self.cache_timer = 0.0
-        self.cache_update_interval = 1.0  # Update every second
-        
-        # Particle creation caches
-        self.particle_velocity_patterns = []      # Pre-calculated velocity patterns
+        self.window_timer = 0.0
+        self.window_duration = 1.0  # Demand is measured over one-second windows
+
+        # Particle creation caches (static tables, reused)
         self.particle_size_distributions = []     # Size distributions by circle size
         self.particle_color_sets = []             # Color variations
-        
-        # Circle splitting caches
-        self.circle_split_configurations = {}     # Key: split_count, Value: list of configurations
-        self.split_angle_patterns = {}           # Angle distributions for splits
-        
-        # Explosion caches
-        self.explosion_force_patterns = []       # Force application patterns
-        self.explosion_size_multipliers = []     # Size multipliers for different circle sizes
-        
+
+        # Pattern pools - each pattern is handed out once and replaced by the producer
+        # Key: pool name, Value: deque (append/popleft are atomic, so no lock is needed)
+        self.pools = {}
+        self.factories = {}  # Key: pool name, Value: function(stream) -> new pattern
+        self.targets = {}  # Key: pool name, Value: depth the producer keeps the pool at
+        self.demand = {}  # Key: pool name, Value: requests in the current window
+        self.peak_rates = {}  # Key: pool name, Value: decaying peak requests per second
+        self.register_pool('particle', self.make_particle_pattern)
+        for split_count in range(2, 7):
+            self.register_pool(f'split_{split_count}',
+                               lambda stream, n=split_count: self.make_split_configuration(n, stream))
+            self.register_pool(f'angles_{split_count}',
+                               lambda stream, n=split_count: self.make_split_angles(n, stream))
+        self.register_pool('explosion', self.make_explosion_pattern)
+        self.register_pool('multiplier', self.make_explosion_multiplier)
+
+        # Background producer
+        self.producer_thread = None
+        self.producer_running = False
+        self.producer_rng = None
+        self.wake_event = threading.Event()
+        self.produced = 0
+
         # Performance tracking
         self.cache_hits = 0
         self.cache_misses = 0
-    
-    def generate_particle_patterns(self):
-        """Generate cached particle creation patterns."""
-        # Generate velocity patterns (100 patterns)
-        for _ in range(100):
-            pattern = []
-            base_speed = random.uniform(100, 500) * SCALE_X
-            for _ in range(20):  # 20 particles per pattern
-                angle = random.uniform(0, 2 * math.pi)
-                speed_factor = random.uniform(0.7, 1.3)
-                velocity = (
-                    math.cos(angle) * base_speed * speed_factor,
-                    math.sin(angle) * base_speed * speed_factor
-                )
-                pattern.append(velocity)
-            self.particle_velocity_patterns.append(pattern)
-        
+
+    def register_pool(self, name, factory):
+        """Create an empty pattern pool with its factory."""
+        self.pools[name] = deque()
+        self.factories[name] = factory
+        self.targets[name] = CACHE_MIN_POOL_DEPTH
+        self.demand[name] = 0
+        self.peak_rates[name] = 0.0
+
+    @staticmethod
+    def make_particle_pattern(stream):
+        """Generate one 20-particle velocity pattern."""
+        pattern = []
+        base_speed = stream.uniform(100, 500) * SCALE_X
+        for _ in range(20):  # 20 particles per pattern
+            angle = stream.uniform(0, 2 * math.pi)
+            speed_factor = stream.uniform(0.7, 1.3)
+            velocity = (
+                math.cos(angle) * base_speed * speed_factor,
+                math.sin(angle) * base_speed * speed_factor
+            )
+            pattern.append(velocity)
+        return pattern
+
+    @staticmethod
+    def make_split_configuration(split_count, stream):
+        """Generate size ratios for one split (normalized to sum to 0.8)."""
+        size_ratios = []
+        remaining_ratio = 1.0
+
+        for i in range(split_count - 1):
+            ratio = stream.uniform(0.1, remaining_ratio * 0.8)
+            size_ratios.append(ratio)
+            remaining_ratio -= ratio
+
+        size_ratios.append(remaining_ratio)
+        stream.shuffle(size_ratios)
+
+        # Normalize to ensure sum is 0.8
+        total = sum(size_ratios)
+        return [r * 0.8 / total for r in size_ratios]
+
+    @staticmethod
+    def make_split_angles(split_count, stream):
+        """Generate evenly spaced split angles with a random base angle."""
+        base_angle = stream.uniform(0, 2 * math.pi)
+        return [base_angle + (2 * math.pi * i / split_count) for i in range(split_count)]
+
+    @staticmethod
+    def make_explosion_pattern(stream):
+        """Generate one explosion force pattern."""
+        pattern = []
+        base_strength = stream.uniform(5, 20)
+        radius = stream.uniform(100, 300) * SCALE_X
+
+        # Generate force application points
+        for _ in range(10):
+            distance_ratio = stream.uniform(0, 1)
+            force = base_strength * (1 - distance_ratio ** 2)
+            pattern.append((distance_ratio, force))
+
+        return radius, pattern
+
+    @staticmethod
+    def make_explosion_multiplier(stream):
+        """Generate an explosion radius multiplier."""
+        return stream.uniform(3, 7)
+
+    def generate_particle_tables(self):
+        """Generate the static particle size and color tables."""
         # Generate size distributions for different circle size ranges
         size_ranges = [
             (MIN_RADIUS * SCALE_X, MAX_RADIUS * 0.5 * SCALE_X),      # Small circles
             (MAX_RADIUS * 0.5 * SCALE_X, MAX_RADIUS * SCALE_X),        # Medium circles
             (MAX_RADIUS * SCALE_X, MAX_RADIUS * 1.5 * SCALE_X)         # Large circles
         ]
-        
+
         for min_size, max_size in size_ranges:
             distribution = []
             for _ in range(50):
                 # Calculate size ratio relative to the range
-                size_ratio = random.uniform(0.25, 1.0)
+                size_ratio = rng.uniform(0.25, 1.0)
                 min_particle_size = 8 * SCALE_X
                 max_particle_size = 24 * SCALE_X
                 particle_size = min_particle_size + (max_particle_size - min_particle_size) * size_ratio
                 distribution.append(particle_size)
             self.particle_size_distributions.append((min_size, max_size, distribution))
-        
+
         # Generate color sets
         for _ in range(30):
             color_set = []
             for _ in range(20):
                 color = (
-                    random.randint(0, 50),      # Red: 0-50 (very low)
-                    random.randint(100, 200),   # Green: 100-200 (moderate)
-                    random.randint(200, 255)    # Blue: 200-255 (high)
+                    rng.randint(0, 50),      # Red: 0-50 (very low)
+                    rng.randint(100, 200),   # Green: 100-200 (moderate)
+                    rng.randint(200, 255)    # Blue: 200-255 (high)
                 )
                 color_set.append(color)
             self.particle_color_sets.append(color_set)
-    
-    def generate_circle_split_patterns(self):
-        """Generate cached circle splitting configurations."""
-        # Generate patterns for 2-6 splits
-        for split_count in range(2, 7):
-            configurations = []
-            angle_patterns = []
-            
-            for _ in range(50):  # 50 configurations per split count
-                # Size ratios that sum to ~0.8 (80% of original area)
-                size_ratios = []
-                remaining_ratio = 1.0
-                
-                for i in range(split_count - 1):
-                    ratio = random.uniform(0.1, remaining_ratio * 0.8)
-                    size_ratios.append(ratio)
-                    remaining_ratio -= ratio
-                
-                size_ratios.append(remaining_ratio)
-                random.shuffle(size_ratios)
-                
-                # Normalize to ensure sum is 0.8
-                total = sum(size_ratios)
-                size_ratios = [r * 0.8 / total for r in size_ratios]
-                
-                configurations.append(size_ratios)
-                
-                # Generate angle pattern
-                base_angle = random.uniform(0, 2 * math.pi)
-                angle_pattern = [base_angle + (2 * math.pi * i / split_count) for i in range(split_count)]
-                angle_patterns.append(angle_pattern)
-            
-            self.circle_split_configurations[split_count] = configurations
-            self.split_angle_patterns[split_count] = angle_patterns
-    
-    def generate_explosion_patterns(self):
-        """Generate cached explosion patterns."""
-        # Generate force patterns for different explosion sizes
-        for _ in range(30):
-            pattern = []
-            base_strength = random.uniform(5, 20)
-            radius = random.uniform(100, 300) * SCALE_X
-            
-            # Generate force application points
-            for _ in range(10):
-                distance_ratio = random.uniform(0, 1)
-                force = base_strength * (1 - distance_ratio ** 2)
-                pattern.append((distance_ratio, force))
-            
-            self.explosion_force_patterns.append((radius, pattern))
-        
-        # Generate size multipliers for different circle sizes
-        for _ in range(20):
-            multiplier = random.uniform(3, 7)  # Explosion radius multiplier
-            self.explosion_size_multipliers.append(multiplier)
-    
+
+    def take(self, name):
+        """Hand out the next pattern from a pool, or None on a miss."""
+        self.demand[name] += 1
+        pool = self.pools[name]
+        try:
+            pattern = pool.popleft()
+        except IndexError:
+            self.cache_misses += 1
+            self.wake_event.set()
+            return None
+
+        self.cache_hits += 1
+        if len(pool) < self.targets[name] // 2:
+            self.wake_event.set()  # Running low - nudge the producer
+        return pattern
+
+    def top_up(self, stream, limit=None):
+        """Refill pools toward their target depth; returns how many patterns were made."""
+        made = 0
+        for name, pool in self.pools.items():
+            factory = self.factories[name]
+            while len(pool) < self.targets[name]:
+                if limit is not None and made >= limit:
+                    break
+                pool.append(factory(stream))
+                made += 1
+        self.produced += made
+        return made
+
+    def produce(self):
+        """Producer loop - keeps every pool at its target depth off the logic thread."""
+        while self.producer_running:
+            if not self.top_up(self.producer_rng, CACHE_PRODUCER_BATCH):
+                self.wake_event.wait(CACHE_PRODUCER_IDLE_WAIT)
+                self.wake_event.clear()
+
+    def start_producer(self):
+        """Start the background producer thread."""
+        if self.producer_thread is not None:
+            return
+        self.producer_rng = rng.spawn()  # Own stream so the logic thread's draws are unaffected
+        self.producer_running = True
+        self.producer_thread = threading.Thread(target=self.produce, daemon=True)
+        self.producer_thread.start()
+
+    def stop_producer(self):
+        """Stop the background producer thread."""
+        self.producer_running = False
+        self.wake_event.set()
+        if self.producer_thread is not None:
+            self.producer_thread.join(timeout=1.0)
+            self.producer_thread = None
+
     def get_cached_particle_pattern(self, particle_count):
         """Get a cached particle creation pattern."""
-        if not self.particle_velocity_patterns:
+        pattern = self.take('particle')
+        if pattern is None:
             return None
-        
-        self.cache_hits += 1
-        pattern = random.choice(self.particle_velocity_patterns)
         return pattern[:particle_count] if len(pattern) >= particle_count else pattern
-    
+
     def get_cached_particle_sizes(self, circle_radius):
         """Get cached particle sizes for a given circle radius."""
         for min_size, max_size, distribution in self.particle_size_distributions:
             if min_size <= circle_radius <= max_size:
                 self.cache_hits += 1
-                return random.choice(distribution[:20])  # Return up to 20 sizes
+                return rng.choice(distribution[:20])  # Return up to 20 sizes
+        self.cache_misses += 1
         return None
-    
+
     def get_cached_particle_colors(self, particle_count):
         """Get cached particle colors."""
         if not self.particle_color_sets:
+            self.cache_misses += 1
             return None
-        
+
         self.cache_hits += 1
-        color_set = random.choice(self.particle_color_sets)
+        color_set = rng.choice(self.particle_color_sets)
         return color_set[:particle_count] if len(color_set) >= particle_count else color_set
-    
+
     def get_cached_split_configuration(self, split_count):
         """Get cached circle split configuration."""
-        if split_count not in self.circle_split_configurations:
+        if f'split_{split_count}' not in self.pools:
             return None
-        
-        self.cache_hits += 1
-        return random.choice(self.circle_split_configurations[split_count])
-    
+        return self.take(f'split_{split_count}')
+
     def get_cached_split_angles(self, split_count):
         """Get cached split angle pattern."""
-        if split_count not in self.split_angle_patterns:
+        if f'angles_{split_count}' not in self.pools:
             return None
-        
-        self.cache_hits += 1
-        return random.choice(self.split_angle_patterns[split_count])
-    
+        return self.take(f'angles_{split_count}')
+
     def get_cached_explosion_pattern(self):
         """Get cached explosion pattern."""
-        if not self.explosion_force_patterns:
-            return None
-        
-        self.cache_hits += 1
-        return random.choice(self.explosion_force_patterns)
-    
+        return self.take('explosion')
+
     def get_cached_explosion_multiplier(self):
         """Get cached explosion size multiplier."""
-        if not self.explosion_size_multipliers:
-            return 5.0  # Default multiplier
-        
-        self.cache_hits += 1
-        return random.choice(self.explosion_size_multipliers)
-    
+        multiplier = self.take('multiplier')
+        return multiplier if multiplier is not None else 5.0  # Default multiplier
+
     def update_cache(self, dt):
-        """Update cache periodically (called every second)."""
-        self.cache_timer += dt
-        
-        if self.cache_timer >= self.cache_update_interval:
-            self.cache_timer = 0.0
-            
-            # Add a few new patterns to keep things fresh
-            if len(self.particle_velocity_patterns) < 200:
-                # Add 5 new particle patterns
-                for _ in range(5):
-                    pattern = []
-                    base_speed = random.uniform(100, 500) * SCALE_X
-                    for _ in range(20):
-                        angle = random.uniform(0, 2 * math.pi)
-                        speed_factor = random.uniform(0.7, 1.3)
-                        velocity = (
-                            math.cos(angle) * base_speed * speed_factor,
-                            math.sin(angle) * base_speed * speed_factor
-                        )
-                        pattern.append(velocity)
-                    self.particle_velocity_patterns.append(pattern)
-            
-            # Remove oldest patterns if cache gets too large
-            if len(self.particle_velocity_patterns) > 200:
-                self.particle_velocity_patterns = self.particle_velocity_patterns[-150:]
-    
+        """Adapt pool depths to demand (and refill inline when no producer thread runs)."""
+        self.window_timer += dt
+
+        if self.window_timer >= self.window_duration:
+            # Size each pool to cover the recent peak demand for CACHE_LEAD_TIME seconds
+            for name in self.pools:
+                rate = self.demand[name] / self.window_timer
+                self.peak_rates[name] = max(rate, self.peak_rates[name] * 0.9)
+                target = math.ceil(self.peak_rates[name] * CACHE_LEAD_TIME)
+                self.targets[name] = max(CACHE_MIN_POOL_DEPTH, min(CACHE_MAX_POOL_DEPTH, target))
+                self.demand[name] = 0
+            self.window_timer = 0.0
+            self.wake_event.set()
+
+        # Seeded sessions refill on the logic thread so they stay reproducible
+        if self.producer_thread is None and self.is_preloaded:
+            self.top_up(rng, CACHE_INLINE_BATCH)
+
+    @staticmethod
+    def flatten_pattern(name, pattern):
+        """One pattern as a flat run of floats (every pattern of a pool has the same length)."""
+        if name == 'particle':
+            return chain.from_iterable(pattern)
+        if name == 'explosion':
+            radius, points = pattern
+            return chain((radius,), chain.from_iterable(points))
+        if name == 'multiplier':
+            return (pattern,)
+        return pattern  # Split ratios and angles are already flat
+
+    @staticmethod
+    def unflatten_pattern(name, row):
+        """Inverse of flatten_pattern."""
+        if name == 'particle':
+            return list(zip(row[0::2], row[1::2]))
+        if name == 'explosion':
+            return row[0], list(zip(row[1::2], row[2::2]))
+        if name == 'multiplier':
+            return row[0]
+        return row
+
+    def get_state(self):
+        """Capture the pools and demand tracking as arrays (empty while a producer thread owns the pools)."""
+        if self.producer_thread is not None:
+            return {}  # Unseeded session - the pools change under us and their contents are interchangeable
+        state = {'cache_window_timer': np.array([self.window_timer])}
+        for name, pool in self.pools.items():
+            values = np.fromiter(chain.from_iterable(self.flatten_pattern(name, pattern) for pattern in pool),
+                                 dtype=np.float64)
+            state[f'cache_pool_{name}'] = values.reshape(len(pool), -1) if pool else values.reshape(0, 0)
+            state[f'cache_rate_{name}'] = np.array([self.targets[name], self.demand[name],
+                                                    self.peak_rates[name]], dtype=np.float64)
+        return state
+
+    def set_state(self, state):
+        """Restore a state captured with get_state (an empty state leaves the pools alone)."""
+        if not state or self.producer_thread is not None:
+            return
+        self.window_timer = float(state['cache_window_timer'][0])
+        for name, pool in self.pools.items():
+            pool.clear()
+            pool.extend(self.unflatten_pattern(name, row) for row in state[f'cache_pool_{name}'].tolist())
+            target, demand, peak_rate = state[f'cache_rate_{name}'].tolist()
+            self.targets[name] = int(target)
+            self.demand[name] = int(demand)
+            self.peak_rates[name] = peak_rate
+
+    def report(self):
+        """Report hit/miss counters and pool depths."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / lookups if lookups else 1.0,
+            'produced': self.produced,
+            'depths': {name: len(pool) for name, pool in self.pools.items()},
+            'targets': dict(self.targets),
+        }
+
     def preload_all(self):
         """Preload all cache data."""
         print("Preloading calculations...")
         start_time = time.time()
-        
-        self.generate_particle_patterns()
-        self.generate_circle_split_patterns()
-        self.generate_explosion_patterns()
-        
+
+        self.generate_particle_tables()
+        self.top_up(rng)
+
         self.is_preloaded = True
         elapsed = time.time() - start_time
         print(f"Cache preload completed in {elapsed:.2f} seconds")
-        
+
+        # Unseeded sessions move pattern generation onto a background thread
+        if rng.seed_value is None:
+            self.start_producer()
+
         return elapsed
 
 
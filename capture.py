@@ -0,0 +1,242 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import os
+import sys
+import json
+import time
+import subprocess
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from constants import *
+
+# Control words at the start of the shared block; the ring is single-producer, single-consumer, so each
+# side only ever writes its own counter
+CONTROL_WRITTEN = 0  # Frames the game has put in the ring
+CONTROL_ENCODED = 1  # Frames the encoder has finished with (their slots are free again)
+CONTROL_STOP = 2  # Set by the game when capture ends; the encoder drains the ring and exits
+CONTROL_READY = 3  # Set by the encoder once it is attached and waiting for frames
+CONTROL_WORDS = 4
+
+
+def ring_views(buffer, slots, frame_bytes):
+    """Control words, per-slot timestamps and frame slots laid over the shared block."""
+    control = np.ndarray((CONTROL_WORDS,), np.int64, buffer, 0)
+    times = np.ndarray((slots,), np.float64, buffer, control.nbytes)
+    frames = np.ndarray((slots, frame_bytes), np.uint8, buffer, control.nbytes + times.nbytes)
+    return control, times, frames
+
+
+class FrameCapture:
+    """Copies each presented frame into a shared-memory ring that a separate encoder process writes to disk."""
+
+    def __init__(self):
+        self.enabled = False
+        self.shared = None
+        self.control = None
+        self.times = None
+        self.frames = None
+        self.screen = None
+        self.source = None  # Surface whose pixels go into the ring: the screen itself or a reduced-size copy
+        self.encoder = None
+        self.path = None
+        self.slots = CAPTURE_RING_FRAMES
+        self.start_time = 0.0
+
+        # Statistics
+        self.captured = 0
+        self.dropped = 0  # The ring was full because the encoder fell behind
+        self.encoded = 0
+        self.grab_time = 0.0
+
+    def start(self, screen):
+        """Allocate the ring and launch the encoder (only when CAPTURE_ENABLED is set)."""
+        if self.enabled or not CAPTURE_ENABLED:
+            return
+        self.screen = screen
+        width, height = screen.get_size()
+        size = (max(1, round(width * CAPTURE_SCALE)), max(1, round(height * CAPTURE_SCALE)))
+        if size == (width, height) and screen.get_bytesize() == 4:
+            self.source = screen  # Full size - the screen's own pixels are copied as they are
+        else:
+            self.source = pygame.Surface(size, 0, 32)
+
+        # One slot holds a frame exactly as the source stores it, row padding included
+        frame_bytes = self.source.get_pitch() * size[1]
+        self.shared = shared_memory.SharedMemory(create=True, size=8 * (CONTROL_WORDS + self.slots) +
+                                                 self.slots * frame_bytes)
+        self.control, self.times, self.frames = ring_views(self.shared.buf, self.slots, frame_bytes)
+        self.control[:] = 0
+        self.frames[:] = 0  # Fault the pages in now rather than on the first laps of the ring
+
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        self.path = os.path.join(CAPTURE_DIR, time.strftime("capture_%Y%m%d_%H%M%S"))
+        os.makedirs(self.path, exist_ok=True)
+        layout = {'name': self.shared.name, 'slots': self.slots, 'frame_bytes': frame_bytes,
+                  'width': size[0], 'height': size[1], 'pitch': self.source.get_pitch(),
+                  'masks': self.source.get_masks()[:3], 'shifts': self.source.get_shifts()[:3],
+                  'path': self.path, 'format': CAPTURE_FORMAT}
+
+        # A plain child interpreter running only this module (not a fork of the game and its SDL state)
+        self.encoder = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--encode", json.dumps(layout)])
+        self.captured = self.dropped = self.encoded = 0
+        self.grab_time = 0.0
+        self.start_time = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        """Let the encoder finish the frames already in the ring, then free it."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.control[CONTROL_STOP] = 1
+        try:
+            self.encoder.wait(timeout=CAPTURE_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.encoder.kill()
+        self.encoded = int(self.control[CONTROL_ENCODED])
+        self.control = self.times = self.frames = None  # Views must go before the block can close
+        self.shared.close()
+        self.shared.unlink()
+        self.shared = None
+        self.source = self.screen = None
+
+    def grab(self):
+        """Copy the frame just presented into the next free slot, or count it as dropped when none is free."""
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        control = self.control
+        written = int(control[CONTROL_WRITTEN])
+        if written - int(control[CONTROL_ENCODED]) >= self.slots:
+            self.dropped += 1
+            return
+        if self.source is not self.screen:
+            pygame.transform.scale(self.screen, self.source.get_size(), self.source)
+        slot = written % self.slots
+        self.frames[slot] = np.frombuffer(self.source.get_buffer(), np.uint8)  # The one copy
+        self.times[slot] = start - self.start_time
+        control[CONTROL_WRITTEN] = written + 1  # Published only once the slot is complete
+        self.captured += 1
+        self.grab_time += time.perf_counter() - start
+
+    def report(self):
+        """Report captured and dropped frames and the cost to the render loop."""
+        encoded = self.encoded if self.control is None else int(self.control[CONTROL_ENCODED])
+        return {'captured': self.captured, 'dropped': self.dropped, 'encoded': encoded,
+                'grab_ms': round(1000 * self.grab_time / self.captured, 3) if self.captured else 0.0}
+
+
+def frame_to_rgb(frame, layout):
+    """A slot's raw pixels as an (height, width, 3) RGB array."""
+    width, height = layout['width'], layout['height']
+    pixels = frame.reshape(height, layout['pitch'])[:, :width * 4].view('<u4')
+    rgb = np.empty((height, width, 3), np.uint8)
+    for channel, (mask, shift) in enumerate(zip(layout['masks'], layout['shifts'])):
+        rgb[:, :, channel] = (pixels & mask) >> shift
+    return rgb
+
+
+def encode_frames(layout):
+    """Encoder process: write frames from the ring to disk as a raw RGB24 file or an image sequence."""
+    try:
+        shared = shared_memory.SharedMemory(layout['name'], track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the block, and this process would unlink it on exit
+        from multiprocessing import resource_tracker
+        shared = shared_memory.SharedMemory(layout['name'])
+        resource_tracker.unregister(shared._name, "shared_memory")
+    control, times, frames = ring_views(shared.buf, layout['slots'], layout['frame_bytes'])
+    width, height, path, image_format = layout['width'], layout['height'], layout['path'], layout['format']
+    control[CONTROL_READY] = 1
+
+    raw = None
+    if image_format == "raw":
+        # Plays with: ffmpeg -f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT -i frames_WIDTHxHEIGHT_rgb24.raw
+        raw = open(os.path.join(path, f"frames_{width}x{height}_rgb24.raw"), "wb")
+    stamps = []
+    encoded = 0
+    while True:
+        if encoded == int(control[CONTROL_WRITTEN]):
+            if control[CONTROL_STOP] and encoded == int(control[CONTROL_WRITTEN]):
+                break
+            time.sleep(CAPTURE_POLL_INTERVAL)
+            continue
+        slot = encoded % layout['slots']
+        rgb = frame_to_rgb(frames[slot], layout)
+        stamps.append(float(times[slot]))
+        encoded += 1
+        control[CONTROL_ENCODED] = encoded  # The slot is free as soon as its pixels are converted
+        if raw is not None:
+            raw.write(rgb.tobytes())
+        else:
+            image = pygame.image.frombuffer(rgb.tobytes(), (width, height), "RGB")
+            pygame.image.save(image, os.path.join(path, f"frame_{encoded:06d}.{image_format}"))
+
+    if raw is not None:
+        raw.close()
+    np.save(os.path.join(path, "timestamps.npy"), np.array(stamps))  # Seconds since capture started, per frame
+    del control, times, frames
+    shared.close()
+
+
+# Global frame capture instance
+frame_capture = FrameCapture()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--encode":
+        encode_frames(json.loads(sys.argv[2]))
+        sys.exit()
+
+    # Usage: python capture.py
+    # Cost of one grab for the render loop at full and half size, frames dropped when the game outruns the
+    # encoder, and a check that the encoded frames are the ones presented
+    import random
+    import tempfile
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def draw_frame(index):
+        """A frame that differs from the last, with a marker pixel encoding its index."""
+        screen.fill(BACKGROUND_BLUE)
+        for _ in range(50):
+            pygame.draw.circle(screen, (random.randrange(256), 0, 200),
+                               (random.randrange(SCREEN_WIDTH), random.randrange(SCREEN_HEIGHT)), 20)
+        screen.fill((index % 256, index // 256 % 256, 7), pygame.Rect(0, 0, 16, 16))
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as directory:
+        CAPTURE_ENABLED = True
+        CAPTURE_DIR = directory
+        for scale, pace in ((1.0, 0.0), (0.5, 0.0), (0.5, 1 / 60)):
+            CAPTURE_SCALE = scale
+            capture = FrameCapture()
+            capture.start(screen)
+            while not capture.control[CONTROL_READY]:
+                time.sleep(0.01)
+            first = None
+            for index in range(240):
+                draw_frame(index)
+                pygame.display.flip()
+                capture.grab()
+                if first is None:
+                    first = pygame.surfarray.array3d(pygame.transform.scale(screen, capture.source.get_size()))
+                if pace:
+                    time.sleep(pace)
+            capture.stop()
+            report = capture.report()
+
+            path = capture.path
+            stamps = np.load(os.path.join(path, "timestamps.npy"))
+            raw_name = [name for name in os.listdir(path) if name.endswith(".raw")][0]
+            video = np.fromfile(os.path.join(path, raw_name), np.uint8)
+            frame_size = first.shape[0] * first.shape[1] * 3
+            corners = video[:video.size // frame_size * frame_size].reshape(-1, frame_size)[:, :3].astype(int)
+            markers = corners[:, 0] + corners[:, 1] * 256  # The index each encoded frame was drawn with
+            decoded = video[:frame_size].reshape(first.shape[1], first.shape[0], 3).transpose(1, 0, 2)
+            print(f"{first.shape[0]}x{first.shape[1]} {'at 60 fps' if pace else 'unpaced'}: {report['captured']} captured, "
+                  f"{report['dropped']} dropped, {len(stamps)} encoded, {video.size // frame_size} in the file; "
+                  f"grab {report['grab_ms']:.2f} ms per frame; first frame matches: "
+                  f"{np.array_equal(decoded, first)}, in order: {np.all(np.diff(markers) > 0)}")
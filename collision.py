@@ -0,0 +1,167 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+from constants import *
+
+
+def segment_circle_time(x0, y0, x1, y1, radius):
+    """Earliest t in [0, 1] at which a point moving from (x0, y0) to (x1, y1) is within radius of the origin, or None."""
+    c = x0 * x0 + y0 * y0 - radius * radius
+    if c <= 0:
+        return 0.0  # Already touching at the start
+    dx, dy = x1 - x0, y1 - y0
+    b = x0 * dx + y0 * dy
+    if b >= 0:
+        return None  # Moving away from the circle
+    a = dx * dx + dy * dy
+    discriminant = b * b - a * c
+    if discriminant < 0:
+        return None  # Passes beside the circle
+    t = (-b - math.sqrt(discriminant)) / a
+    return t if t <= 1.0 else None
+
+
+def segment_box_time(x0, y0, x1, y1, left, top, right, bottom):
+    """Earliest t in [0, 1] at which a moving point enters an axis-aligned box, or None (slab method)."""
+    t_enter, t_exit = 0.0, 1.0
+    for start, delta, low, high in ((x0, x1 - x0, left, right), (y0, y1 - y0, top, bottom)):
+        if delta == 0:
+            if start < low or start > high:
+                return None
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        t_enter = max(t_enter, t_low)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return None
+    return t_enter
+
+
+def segment_rounded_rect_time(x0, y0, x1, y1, left, top, right, bottom, radius):
+    """Earliest t in [0, 1] at which a moving point comes within radius of a rectangle, or None."""
+    # The rectangle grown by radius is two crossed boxes plus a circle at each corner
+    hits = [
+        segment_box_time(x0, y0, x1, y1, left - radius, top, right + radius, bottom),
+        segment_box_time(x0, y0, x1, y1, left, top - radius, right, bottom + radius),
+    ]
+    for corner_x, corner_y in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        hits.append(segment_circle_time(x0 - corner_x, y0 - corner_y, x1 - corner_x, y1 - corner_y, radius))
+    hits = [t for t in hits if t is not None]
+    return min(hits) if hits else None
+
+
+def swept_circle_hit(ax0, ay0, ax1, ay1, bx0, by0, bx1, by1, radius):
+    """Earliest t in [0, 1] at which two points moving over the same interval come within radius, or None."""
+    # Work in the frame of the second point so only one of them moves
+    return segment_circle_time(ax0 - bx0, ay0 - by0, ax1 - bx1, ay1 - by1, radius)
+
+
+def swept_projectile_hit(projectile, circle):
+    """Earliest fraction of the tick at which a projectile touched a circle, or None."""
+    # A shot fired mid-tick only covers the tail of its first tick, so the circle's segment starts there too
+    start = projectile.step_start
+    t = swept_circle_hit(projectile.prev_x, projectile.prev_y, projectile.x, projectile.y,
+                         circle.prev_x + (circle.x - circle.prev_x) * start,
+                         circle.prev_y + (circle.y - circle.prev_y) * start, circle.x, circle.y,
+                         circle.radius + PROJECTILE_HITBOX_BONUS)
+    return None if t is None else start + (1.0 - start) * t
+
+
+def swept_player_hit(circle, start_rect, end_rect):
+    """Earliest fraction of the tick at which a circle touched the player rect, or None."""
+    # Circle centre relative to the rect's top-left corner at both ends of the tick
+    return segment_rounded_rect_time(circle.prev_x - start_rect.x, circle.prev_y - start_rect.y,
+                                     circle.x - end_rect.x, circle.y - end_rect.y,
+                                     0, 0, end_rect.width, end_rect.height, circle.radius)
+
+
+if __name__ == "__main__":
+    # Tunnelling check: fire projectiles at moving circles and compare the discrete test used before
+    # (end-of-tick positions with the padded hitbox) and the swept test against a finely stepped reference
+    import random
+
+    def reference_hit(px, py, pdx, pdy, cx, cy, cdx, cdy, radius, duration, steps=2000):
+        """Brute-force ground truth by stepping both objects in tiny increments."""
+        for i in range(steps + 1):
+            t = duration * i / steps
+            if (px + pdx * t - cx - cdx * t) ** 2 + (py + pdy * t - cy - cdy * t) ** 2 < radius ** 2:
+                return True
+        return False
+
+    random.seed(7)
+    projectile_speed = PROJECTILE_SPEED * SCALE_X
+    trials = 2000
+    print(f"{'rate':>6} {'reference hits':>15} {'discrete misses':>16} {'swept misses':>13} {'swept false hits':>17}")
+    for rate in (10, 20, 60):
+        dt = 1.0 / rate
+        reference_hits = discrete_misses = swept_misses = swept_false = 0
+        for _ in range(trials):
+            radius = random.uniform(MIN_SPLIT_RADIUS, MAX_RADIUS) * SCALE_X
+            angle = random.uniform(0, 2 * math.pi)
+            pdx, pdy = math.cos(angle) * projectile_speed, math.sin(angle) * projectile_speed
+            circle_speed = random.uniform(MIN_SPEED, MAX_SPEED) * SCALE_X
+            circle_angle = random.uniform(0, 2 * math.pi)
+            cdx, cdy = math.cos(circle_angle) * circle_speed, math.sin(circle_angle) * circle_speed
+            # Place the circle near the projectile's path somewhere within one tick of flight
+            along = random.uniform(0, projectile_speed * dt)
+            offset = random.uniform(-1.5, 1.5) * radius
+            cx = along * math.cos(angle) - offset * math.sin(angle)
+            cy = along * math.sin(angle) + offset * math.cos(angle)
+
+            hit_radius = radius + PROJECTILE_HITBOX_BONUS
+            truth = reference_hit(0.0, 0.0, pdx, pdy, cx, cy, cdx, cdy, hit_radius, dt)
+            discrete = (pdx * dt - cx - cdx * dt) ** 2 + (pdy * dt - cy - cdy * dt) ** 2 < hit_radius ** 2
+            swept = swept_circle_hit(0.0, 0.0, pdx * dt, pdy * dt, cx, cy, cx + cdx * dt, cy + cdy * dt,
+                                     hit_radius) is not None
+            reference_hits += truth
+            discrete_misses += truth and not discrete
+            swept_misses += truth and not swept
+            swept_false += swept and not truth
+        print(f"{rate:>4}Hz {reference_hits:>15} {discrete_misses:>16} {swept_misses:>13} {swept_false:>17}")
+
+    # Same check for circles against the moving player rect (the player steers at up to PLAYER_MAX_SPEED)
+    import pygame
+
+    def reference_rect_hit(cx, cy, cdx, cdy, rx, ry, rdx, rdy, width, height, radius, duration, steps=2000):
+        """Brute-force ground truth for a circle against a moving rect."""
+        for i in range(steps + 1):
+            t = duration * i / steps
+            x, y = cx + cdx * t - (rx + rdx * t), cy + cdy * t - (ry + rdy * t)
+            closest_x, closest_y = max(0, min(x, width)), max(0, min(y, height))
+            if (x - closest_x) ** 2 + (y - closest_y) ** 2 < radius ** 2:
+                return True
+        return False
+
+    print(f"{'rate':>6} {'reference hits':>15} {'discrete misses':>16} {'swept misses':>13} {'swept false hits':>17}")
+    for rate in (10, 20, 60):
+        dt = 1.0 / rate
+        reference_hits = discrete_misses = swept_misses = swept_false = 0
+        for _ in range(trials):
+            radius = random.uniform(MIN_SPLIT_RADIUS, MAX_RADIUS) * SCALE_X
+            circle_speed = random.uniform(MIN_SPEED, MAX_SPEED) * SCALE_X
+            circle_angle = random.uniform(0, 2 * math.pi)
+            cdx, cdy = math.cos(circle_angle) * circle_speed, math.sin(circle_angle) * circle_speed
+            player_angle = random.uniform(0, 2 * math.pi)
+            player_speed = random.uniform(0, PLAYER_MAX_SPEED)
+            # Whole-pixel player motion, like pygame.Rect
+            rdx = round(math.cos(player_angle) * player_speed * dt) / dt
+            rdy = round(math.sin(player_angle) * player_speed * dt) / dt
+            cx = random.uniform(-1, 1) * (radius + (circle_speed + player_speed) * dt)
+            cy = random.uniform(-1, 1) * (radius + (circle_speed + player_speed) * dt)
+
+            start_rect = pygame.Rect(0, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+            end_rect = start_rect.move(round(rdx * dt), round(rdy * dt))
+            truth = reference_rect_hit(cx, cy, cdx, cdy, 0, 0, rdx, rdy, PLAYER_WIDTH, PLAYER_HEIGHT, radius, dt)
+            end_x, end_y = cx + cdx * dt - end_rect.x, cy + cdy * dt - end_rect.y
+            closest_x, closest_y = max(0, min(end_x, PLAYER_WIDTH)), max(0, min(end_y, PLAYER_HEIGHT))
+            discrete = (end_x - closest_x) ** 2 + (end_y - closest_y) ** 2 < radius ** 2
+            swept = segment_rounded_rect_time(cx, cy, end_x, end_y, 0, 0, PLAYER_WIDTH, PLAYER_HEIGHT,
+                                              radius) is not None
+            reference_hits += truth
+            discrete_misses += truth and not discrete
+            swept_misses += truth and not swept
+            swept_false += swept and not truth
+        print(f"{rate:>4}Hz {reference_hits:>15} {discrete_misses:>16} {swept_misses:>13} {swept_false:>17}")
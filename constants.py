@@ -55,6 +55,8 @@ MAX_RADIUS = 50
 MIN_SPEED = 40
 MAX_SPEED = 200
 MIN_SPLIT_RADIUS = 10
+CIRCLE_COLOR_FAMILIES = ('red', 'orange', 'yellow', 'pink')
+CIRCLE_SPAWN_SIDES = ('left', 'right', 'top', 'bottom')
 
 # Projectile Constants
 PROJECTILE_SPEED = 900
@@ -71,6 +73,9 @@ SINGLE_FIRE_SIZE_MULTIPLIER = 5.0
 
 # Particle Constants
 PARTICLE_LIFETIME = 30
+PERSISTENT_PARTICLE_LIFETIME = 30.0
+PARTICLE_FRICTION = 0.96  # Velocity multiplier per logic tick
+PARTICLE_FRICTION_LOG = math.log(PARTICLE_FRICTION)
 PUSH_RANGE = SCREEN_WIDTH / 4
 PUSH_STRENGTH = 2.0
 
@@ -83,11 +88,106 @@ TARGET_LOGIC_FPS = 20
 LOGIC_TIMESTEP = 1.0 / TARGET_LOGIC_FPS
 PLAYER_LOGIC_FPS = 120
 PLAYER_LOGIC_TIMESTEP = 1.0 / PLAYER_LOGIC_FPS
+PARTICLE_GLIDE_FACTOR = LOGIC_TIMESTEP / (1.0 - PARTICLE_FRICTION)  # Total glide distance per unit velocity
 FPS_CHECK_INTERVAL = 15
 INITIAL_MAX_OBJECTS = 2000
 OBJECT_BUFFER = 20
 PARTICLE_CLEANUP_RATIO = 0.7
 
+# Destruction Pipeline Constants
+DESTRUCTION_BUDGET_PER_TICK = 12  # Particle bursts materialized per logic tick
+DESTRUCTION_SPLIT_BUDGET_PER_TICK = 32  # Splits per logic tick - one vectorized batch, so keep it >= SPLIT_BATCH_MIN
+DESTRUCTION_MAX_LAG_TICKS = 4  # Splits this late skip the budget; bursts still queued this late are dropped
+SPLIT_TABLE_SIZE = 256  # Precomputed size-ratio rows per split count for the batch splitter
+SPLIT_BATCH_MIN = 8  # Fewer splits than this in a tick use the scalar Circle.split (cheaper than NumPy setup)
+
+# Object Budget Constants
+BUDGET_CRITICAL_RESERVE = 150  # Slots below the cap that only circles and projectiles may use
+BUDGET_EVICT_MIN_AGE = 0.25  # Seconds a particle is guaranteed to live before it can be evicted
+
+# Debris Layer Constants
+DEBRIS_SLEEP_SPEED = 0.4 * SCALE_X  # Persistent particles slower than this (px/s) are baked into the debris layer
+DEBRIS_CELL_SIZE = 64 * SCALE_X  # Grid cell size used to find the debris an explosion wakes
+
+# Level of Detail Constants
+LOD_ENABLED = True
+LOD_TIERS = ((0, 1), (150 * SCALE_X, 2), (350 * SCALE_X, 4))  # (Minimum gap to the player, ticks between tests)
+LOD_PARTICLE_PERIOD = 2  # Ticks between explosion pushes on awake persistent particles
+LOD_PLAYER_SPEED_BOUND = 2 * PLAYER_MAX_SPEED  # Assumed top player speed when granting a circle a longer period
+LOD_SLACK = 1.0  # Pixels of clearance kept on top of the worst-case closing distance
+
+# Explosion Field Constants
+EXPLOSION_CLUSTER_DISTANCE = 120 * SCALE_X  # Same-tick explosions this close to a cluster's centre join it
+
+# Snapshot Constants
+SNAPSHOT_REWIND_ENABLED = False  # Set to True to keep a rewind history (Backspace); ~7 ms per snapshot at 2000 entities
+SNAPSHOT_REWIND_INTERVAL = 10  # Logic ticks between the snapshots kept for rewinding (Backspace)
+SNAPSHOT_REWIND_CAPACITY = 20  # Rewind snapshots kept in memory (10 seconds at the default interval)
+SNAPSHOT_QUICKSAVE_TO_DISK = False  # Set to True to also write the F5 quick-save to SNAPSHOT_QUICKSAVE_PATH
+SNAPSHOT_QUICKSAVE_PATH = "quicksave.npz"  # File read by F9 when there is no quick-save in memory
+
+# Object Pool Constants
+POOLING_ENABLED = True  # Set to False to compare allocation behaviour without pools
+POOL_MAX_FREE = 4000  # Released instances kept per entity type
+
+# Random Number Service Constants
+RNG_SEED = None  # Set to an integer to make a whole session reproducible
+RNG_BLOCK_SIZE = 4096  # Samples drawn per bulk refill
+
+# Calculation Cache Constants
+CACHE_MIN_POOL_DEPTH = 8  # Patterns every pool keeps ready even when idle
+CACHE_MAX_POOL_DEPTH = 400  # Upper bound on any pool's adaptive depth
+CACHE_LEAD_TIME = 1.5  # Seconds of peak demand each pool is sized to cover
+CACHE_PRODUCER_BATCH = 32  # Patterns the producer makes before checking for more work
+CACHE_PRODUCER_IDLE_WAIT = 0.05  # Seconds the producer sleeps when every pool is full
+CACHE_INLINE_BATCH = 24  # Patterns refilled per logic tick when no producer thread runs
+
+# Slow-Frame Watchdog Constants
+WATCHDOG_ENABLED = False  # Set to True to log slow frames with stack samples
+WATCHDOG_FRAME_BUDGET = 1.0 / 40  # Seconds a whole frame may take before it counts as a hitch
+WATCHDOG_TICK_BUDGET = LOGIC_TIMESTEP / 4  # Seconds one game_logic tick may take
+WATCHDOG_SAMPLE_INTERVAL = 0.002  # Seconds between stack samples of the main thread
+WATCHDOG_SAMPLE_WINDOW = 2.0  # Seconds of stack samples kept in memory
+WATCHDOG_MAX_INCIDENTS = 20  # Incident files kept on disk (oldest are overwritten)
+WATCHDOG_LOG_DIR = "watchdog_logs"  # Directory for incident files
+
+# Telemetry Constants
+TELEMETRY_ENABLED = False  # Set to True to record per-tick and per-frame telemetry to disk
+TELEMETRY_CAPACITY = 131072  # Records in the on-disk ring (about 10 MB, roughly 15 minutes of play)
+TELEMETRY_FLUSH_INTERVAL = 1.0  # Seconds between background flushes of the ring
+TELEMETRY_MAX_SESSIONS = 5  # Session files kept on disk (oldest are deleted)
+TELEMETRY_LOG_DIR = "telemetry_logs"  # Directory for session files
+
+# Entity Trace Constants
+TRACE_ENABLED = False  # Set to True to record every entity's position and velocity each tick to disk
+TRACE_CAPACITY = 12_000_000  # Rows preallocated per column (about 300 MB in all, minutes of a crowded game)
+TRACE_TICK_CAPACITY = 72000  # Ticks indexed per session (an hour at the logic rate)
+TRACE_MAX_SESSIONS = 3  # Session directories kept on disk (oldest are deleted)
+TRACE_LOG_DIR = "trace_logs"  # Directory for session directories
+
+# Spectator Constants
+SPECTATOR_ENABLED = False  # Set to True to stream the world to spectators on a local socket
+SPECTATOR_HOST = "127.0.0.1"  # Loopback only - the stream is for a second process on this machine
+SPECTATOR_PORT = 50490
+SPECTATOR_UNIX_PATH = ""  # Listen on this Unix socket path instead of TCP when set
+SPECTATOR_POSITION_QUANTUM = 0.5  # Pixels per step of the quantized positions on the wire
+SPECTATOR_COMPRESSION_LEVEL = 1  # zlib level for each message (1 is fastest)
+SPECTATOR_MAX_BACKLOG = 4 * 1024 * 1024  # Unsent bytes after which a spectator that can't keep up is dropped
+
+# Video Capture Constants
+CAPTURE_ENABLED = False  # Set to True to record every presented frame to disk from a separate encoder process
+CAPTURE_SCALE = 0.5  # Capture size relative to the screen (1.0 copies the screen as it is)
+CAPTURE_RING_FRAMES = 8  # Frames the shared-memory ring holds before new ones are dropped
+CAPTURE_FORMAT = "raw"  # "raw" for one RGB24 video file, or an image extension ("png", "bmp", "tga", "jpg")
+CAPTURE_DIR = "captures"  # Directory for capture sessions
+CAPTURE_POLL_INTERVAL = 0.002  # Seconds the encoder sleeps when the ring is empty
+CAPTURE_STOP_TIMEOUT = 10.0  # Seconds the game waits on exit for the encoder to finish
+
+# Input Latency Constants
+LATENCY_TRACKING_ENABLED = True  # Timestamps input events and measures time until the result is shown
+LATENCY_SAMPLE_COUNT = 1000  # Most recent measurements kept per input type
+LATENCY_TIMEOUT = 1.0  # Seconds after which an input that caused nothing is dropped
+
 # Particle Generation Variables
 INITIAL_PARTICLE_COUNT = 20  # Base number of particles when game starts
 
@@ -124,3 +224,36 @@ SOUND_DEATH_START_FREQ = 880  # Hz
 SOUND_DEATH_END_FREQ = 110    # Hz
 SOUND_COLLISION_FREQ1 = 440    # Hz
 SOUND_COLLISION_FREQ2 = 220    # Hz
+
+# Explosion Sound Bank Constants
+SOUND_BANK_SIZE_STEPS = 12  # Explosion size variants between smallest and largest
+SOUND_BANK_PITCH_FACTORS = (0.9, 1.0, 1.12)  # Resampled pitch variants per size
+SOUND_BANK_MAX_SIZE = 1.0  # Size factor that maps to the largest variant
+
+# Sound Event Queue Constants
+SOUND_MAX_EVENTS_PER_TICK = 3  # Distinct sounds started per logic tick
+SOUND_MERGE_SIZE_BOOST = 0.25  # Size increase per doubling of merged explosions
+SOUND_PRIORITIES = {
+    'death': 3,
+    'missile': 2,
+    'explosion': 1,
+    'shoot': 0,
+}
+SOUND_VOICE_CAPS = {  # Maximum simultaneous voices per sound kind
+    'death': 1,
+    'missile': 2,
+    'explosion': 3,
+    'shoot': 2,
+    'hit': 2,
+    'collision': 1,
+}
+
+# Music Constants
+MUSIC_ENABLED = True
+MUSIC_VOLUME = 0.4  # Relative to the sound effect volume
+MUSIC_CHUNK_DURATION = 0.5  # Seconds per generated chunk (one beat at 120 BPM)
+MUSIC_QUEUE_DEPTH = 4  # Chunks buffered ahead by the producer thread
+MUSIC_FULL_INTENSITY_ENTITIES = 400  # Entity count that maxes out the crowd intensity
+MUSIC_FULL_INTENSITY_HITS = 125  # Hit count that maxes out the progress intensity
+MUSIC_BASS_NOTES = [55.0, 55.0, 65.41, 49.0]  # Bass roots per bar (A1, A1, C2, G1)
+MUSIC_ARP_STEPS = [0, 3, 7, 10, 12, 10, 7, 3]  # Arpeggio pattern in semitones above the root
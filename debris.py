@@ -0,0 +1,196 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+import pygame
+from constants import *
+from timing import sim_clock, settle_scheduler, discard_from
+
+# Colour key for the baked surfaces (particles are always blue-ish, never black)
+DEBRIS_COLORKEY = (0, 0, 0)
+
+
+class DebrisLayer:
+    """Settled persistent particles, baked into cached surfaces until an explosion wakes them."""
+
+    def __init__(self, cell_size=DEBRIS_CELL_SIZE):
+        self.cell_size = cell_size
+        self.sleeping = {}  # Key: particle, Value: grid cell (insertion ordered = bake order)
+        self.cells = {}  # Key: (cell x, cell y), Value: set of sleeping particles
+        self.back_surface = None  # Created on first draw (needs the display)
+        self.front_surface = None
+        self.unbaked = []  # Sleepers not yet drawn onto the surfaces
+        self.dirty = False  # A sleeper left, so the surfaces must be rebuilt from scratch
+
+        self.slept = 0
+        self.woken = 0
+        self.rebakes = 0
+
+    def update(self, particles):
+        """Move the persistent particles that came to rest this tick out of the live list."""
+        settled = settle_scheduler.pop_due(sim_clock.tick)['particle']
+        if not settled:
+            return
+        discard_from(particles, settled)
+        now = sim_clock.now
+        for particle in settled:
+            particle.freeze(now)
+        self.lay_down(settled)
+
+    def lay_down(self, settled):
+        """Add frozen particles to the layer (they are drawn on the next bake)."""
+        for particle in settled:
+            key = (int(particle.x0 // self.cell_size), int(particle.y0 // self.cell_size))
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = set()
+            cell.add(particle)
+            self.sleeping[particle] = key
+        self.unbaked.extend(settled)
+        self.slept += len(settled)
+
+    def take(self, particle):
+        """Drop one particle from the layer; returns False if it wasn't sleeping."""
+        key = self.sleeping.pop(particle, None)
+        if key is None:
+            return False
+        cell = self.cells[key]
+        cell.discard(particle)
+        if not cell:
+            del self.cells[key]
+        self.dirty = True
+        return True
+
+    def wake(self, explosion, particles):
+        """Return the sleepers inside an explosion's radius to the live list; returns the woken particles."""
+        if not self.cells:
+            return []
+        radius = explosion.radius
+        radius_sq = radius * radius
+        low_x, high_x = int((explosion.x - radius) // self.cell_size), int((explosion.x + radius) // self.cell_size)
+        low_y, high_y = int((explosion.y - radius) // self.cell_size), int((explosion.y + radius) // self.cell_size)
+        if (high_x - low_x + 1) * (high_y - low_y + 1) > len(self.cells):
+            # Big explosion over sparse debris - walking the occupied cells is cheaper than the range
+            candidates = [cell for (key_x, key_y), cell in self.cells.items()
+                          if low_x <= key_x <= high_x and low_y <= key_y <= high_y]
+        else:
+            candidates = [self.cells[key] for key in
+                          ((key_x, key_y) for key_x in range(low_x, high_x + 1) for key_y in range(low_y, high_y + 1))
+                          if key in self.cells]
+        woken = []
+        for cell in candidates:
+            for particle in cell:
+                if (particle.x0 - explosion.x) ** 2 + (particle.y0 - explosion.y) ** 2 < radius_sq:
+                    woken.append(particle)
+        for particle in woken:
+            self.take(particle)
+            # Back to sleep next tick unless the explosion actually moves it
+            settle_scheduler.schedule(particle, 'particle', sim_clock.now)
+        # Explosion.apply_force pushes them and restarts their motion (and their settle timer)
+        particles.extend(woken)
+        self.woken += len(woken)
+        return woken
+
+    def forget(self, dead):
+        """Drop expired particles from the layer and from the settle schedule."""
+        for particle in dead:
+            settle_scheduler.cancel(particle)
+            self.take(particle)
+
+    def clear(self):
+        """Forget every sleeper (e.g. on game reset)."""
+        settle_scheduler.clear()
+        self.sleeping.clear()
+        self.cells.clear()
+        self.unbaked = []
+        self.dirty = True
+
+    def bake(self):
+        """Bring the cached surfaces up to date - a full rebuild only after something left the layer."""
+        if self.back_surface is None:
+            # RLE makes blitting a sparse layer nearly free; it is re-encoded only on ticks where the layer changed
+            self.back_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.back_surface.set_colorkey(DEBRIS_COLORKEY, pygame.RLEACCEL)
+            self.front_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.front_surface.set_colorkey(DEBRIS_COLORKEY, pygame.RLEACCEL)
+            self.dirty = True
+        if self.dirty:
+            self.back_surface.fill(DEBRIS_COLORKEY)
+            self.front_surface.fill(DEBRIS_COLORKEY)
+            self.unbaked = list(self.sleeping)
+            self.dirty = False
+            self.rebakes += 1
+        for particle in self.unbaked:
+            surface = self.front_surface if particle.draw_in_front else self.back_surface
+            # Sleepers have finished shrinking, so their final size is half the initial one
+            pygame.draw.circle(surface, particle.color, (int(particle.x0), int(particle.y0)),
+                               int(particle.initial_size * 0.5))
+        self.unbaked = []
+
+    def draw_back(self, screen):
+        """Blit the debris that sits behind the player and circles."""
+        if self.unbaked or self.dirty:
+            self.bake()
+        if self.sleeping:
+            screen.blit(self.back_surface, (0, 0))
+
+    def draw_front(self, screen):
+        """Blit the debris that sits in front of everything else."""
+        if self.sleeping:
+            screen.blit(self.front_surface, (0, 0))
+
+    def report(self):
+        """Report how many particles slept, woke and how often the layer was rebuilt."""
+        return {'sleeping': len(self.sleeping), 'slept': self.slept, 'woken': self.woken,
+                'rebakes': self.rebakes}
+
+    def __len__(self):
+        return len(self.sleeping)
+
+
+# Global debris layer instance
+debris_layer = DebrisLayer()
+
+
+if __name__ == "__main__":
+    # Benchmark: drawing settled persistent particles one by one versus blitting the baked layer,
+    # plus a check that freezing moves a particle less than a pixel from its analytic position
+    import os
+    import timeit
+    from rng import rng
+    from effects import particle_pool
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    print(f"{'debris':>7} {'per-particle us':>16} {'baked us':>9} {'max drift px':>13}")
+    for count in (100, 500, 2000):
+        debris_layer.clear()
+        particles = []
+        for _ in range(count):
+            speed = rng.uniform(5, 15) * SCALE_X
+            angle = rng.uniform(0, 2 * math.pi)
+            particles.append(particle_pool.acquire(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), True,
+                                                   (math.cos(angle) * speed, math.sin(angle) * speed)))
+        # Run the clock until every particle has settled
+        latest = max(particle.settle_time() for particle in particles)
+        while sim_clock.now < latest:
+            sim_clock.advance()
+        analytic = {particle: particle.position_at(sim_clock.now) for particle in particles}
+        awake = list(particles)
+        debris_layer.update(awake)
+        drift = max(math.hypot(particle.x0 - analytic[particle][0], particle.y0 - analytic[particle][1])
+                    for particle in particles)
+
+        def per_particle():
+            for particle in particles:
+                particle.draw(screen, sim_clock.now)
+
+        def baked():
+            debris_layer.draw_back(screen)
+            debris_layer.draw_front(screen)
+
+        per_particle_time = min(timeit.repeat(per_particle, number=20, repeat=5)) / 20 * 1e6
+        baked_time = min(timeit.repeat(baked, number=20, repeat=5)) / 20 * 1e6
+        print(f"{count:>7} {per_particle_time:>16.1f} {baked_time:>9.1f} {drift:>13.3f}")
+        particle_pool.release_all(particles)
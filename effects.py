@@ -1,10 +1,11 @@
 # made by SSJMarx with the help of GLM 4.6
 
 import pygame
-import random
-import time
 import math
 from constants import *
+from rng import rng
+from timing import sim_clock, expiry_scheduler, settle_scheduler
+from pools import ObjectPool, entity_ids
 
 
 class Star:
@@ -12,15 +13,15 @@ class Star:
     
     def __init__(self, x=None, y=None, direction=None):
         # Random size
-        self.size = random.uniform(STAR_MIN_SIZE, STAR_MAX_SIZE) * SCALE_X
+        self.size = rng.uniform(STAR_MIN_SIZE, STAR_MAX_SIZE) * SCALE_X
         
         # Random color
-        self.color = random.choice(STAR_COLORS)
+        self.color = rng.choice(STAR_COLORS)
         
         # Twinkle effect
-        self.twinkle_speed = random.uniform(0.01, 0.05)
-        self.twinkle_phase = random.uniform(0, math.pi * 2)
-        self.brightness = random.uniform(0.5, 1.0)
+        self.twinkle_speed = rng.uniform(0.01, 0.05)
+        self.twinkle_phase = rng.uniform(0, math.pi * 2)
+        self.brightness = rng.uniform(0.5, 1.0)
         
         # Position
         if x is None or y is None:
@@ -40,50 +41,50 @@ class Star:
         if 0 <= angle < math.pi / 8 or 15 * math.pi / 8 <= angle < 2 * math.pi:
             # Moving right, spawn on left edge
             self.x = -self.size
-            self.y = random.uniform(0, SCREEN_HEIGHT)
+            self.y = rng.uniform(0, SCREEN_HEIGHT)
         elif math.pi / 8 <= angle < 3 * math.pi / 8:
             # Moving down-right, spawn on top or left edge
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 self.x = -self.size
-                self.y = random.uniform(0, SCREEN_HEIGHT)
+                self.y = rng.uniform(0, SCREEN_HEIGHT)
             else:
-                self.x = random.uniform(0, SCREEN_WIDTH)
+                self.x = rng.uniform(0, SCREEN_WIDTH)
                 self.y = -self.size
         elif 3 * math.pi / 8 <= angle < 5 * math.pi / 8:
             # Moving down, spawn on top edge
-            self.x = random.uniform(0, SCREEN_WIDTH)
+            self.x = rng.uniform(0, SCREEN_WIDTH)
             self.y = -self.size
         elif 5 * math.pi / 8 <= angle < 7 * math.pi / 8:
             # Moving down-left, spawn on top or right edge
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 self.x = SCREEN_WIDTH + self.size
-                self.y = random.uniform(0, SCREEN_HEIGHT)
+                self.y = rng.uniform(0, SCREEN_HEIGHT)
             else:
-                self.x = random.uniform(0, SCREEN_WIDTH)
+                self.x = rng.uniform(0, SCREEN_WIDTH)
                 self.y = -self.size
         elif 7 * math.pi / 8 <= angle < 9 * math.pi / 8:
             # Moving left, spawn on right edge
             self.x = SCREEN_WIDTH + self.size
-            self.y = random.uniform(0, SCREEN_HEIGHT)
+            self.y = rng.uniform(0, SCREEN_HEIGHT)
         elif 9 * math.pi / 8 <= angle < 11 * math.pi / 8:
             # Moving up-left, spawn on bottom or right edge
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 self.x = SCREEN_WIDTH + self.size
-                self.y = random.uniform(0, SCREEN_HEIGHT)
+                self.y = rng.uniform(0, SCREEN_HEIGHT)
             else:
-                self.x = random.uniform(0, SCREEN_WIDTH)
+                self.x = rng.uniform(0, SCREEN_WIDTH)
                 self.y = SCREEN_HEIGHT + self.size
         elif 11 * math.pi / 8 <= angle < 13 * math.pi / 8:
             # Moving up, spawn on bottom edge
-            self.x = random.uniform(0, SCREEN_WIDTH)
+            self.x = rng.uniform(0, SCREEN_WIDTH)
             self.y = SCREEN_HEIGHT + self.size
         else:  # 13 * math.pi / 8 <= angle < 15 * math.pi / 8
             # Moving up-right, spawn on bottom or left edge
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 self.x = -self.size
-                self.y = random.uniform(0, SCREEN_HEIGHT)
+                self.y = rng.uniform(0, SCREEN_HEIGHT)
             else:
-                self.x = random.uniform(0, SCREEN_WIDTH)
+                self.x = rng.uniform(0, SCREEN_WIDTH)
                 self.y = SCREEN_HEIGHT + self.size
     
     def update(self, dt, direction):
@@ -114,176 +115,268 @@ class Star:
 class Explosion:
     """Represents an explosion that applies outward force to particles."""
 
+    __slots__ = ('x', 'y', 'radius', 'strength', 'lifetime', 'max_lifetime', 'spawn_time', 'uid')
+
     def __init__(self, x, y, radius, strength, lifetime):
+        self.uid = entity_ids.take()  # Identifies the explosion in traces
         self.x = x
         self.y = y
         self.radius = radius
         self.strength = strength
         self.lifetime = lifetime
         self.max_lifetime = lifetime
+        self.spawn_time = sim_clock.now
+        expiry_scheduler.schedule(self, 'explosion', self.spawn_time + lifetime)
 
-    def update(self, dt):
-        """Update the explosion's lifetime."""
-        self.lifetime -= dt
+    def particle_force(self, distance):
+        """Push on a particle at a given distance (stronger when closer, none outside the radius)."""
+        if 0 < distance < self.radius:
+            distance_ratio = distance / self.radius
+            return self.strength * (1 - distance_ratio ** 2)
+        return 0.0
 
-    def is_expired(self):
-        """Check if the explosion has expired."""
-        return self.lifetime <= 0
+    def player_forces(self, distance):
+        """Blast and direct push on the player at a given distance."""
+        blast = direct = 0.0
+        # Increased effective radius by 50% for player
+        effective_radius = self.radius * 1.5
+        if 0 < distance < effective_radius:
+            distance_ratio = distance / effective_radius
+            blast = self.strength * (1 - distance_ratio ** 2) * 15.0  # Increased from 10.0 to 15.0
+        if 0 < distance < self.radius:
+            distance_ratio = distance / self.radius
+            direct = self.strength * (1 - distance_ratio ** 2) * 3.0  # Triple the effect on player
+        return blast, direct
 
-    def apply_force(self, particle):
-        """Apply explosion force to a particle (only persistent particles)."""
+    def apply_force(self, particle, scale=1.0):
+        """Apply explosion force to a particle (only persistent particles); scale covers skipped ticks."""
         # Only apply force to persistent particles
         if not particle.is_persistent:
             return
 
-        dx = particle.x - self.x
-        dy = particle.y - self.y
+        particle_x, particle_y = particle.position_at(sim_clock.now)
+        dx = particle_x - self.x
+        dy = particle_y - self.y
         distance = math.sqrt(dx ** 2 + dy ** 2)
-
-        if 0 < distance < self.radius:
-            # Calculate force based on distance (stronger when closer)
-            distance_ratio = distance / self.radius
-            force = self.strength * (1 - distance_ratio ** 2)
-
+        force = self.particle_force(distance) * scale
+        if force:
             # Apply force in the direction away from explosion center
-            if distance > 0:
-                particle.dx += (dx / distance) * force
-                particle.dy += (dy / distance) * force
+            particle.apply_impulse((dx / distance) * force, (dy / distance) * force, sim_clock.now)
 
     def apply_force_to_player(self, player):
         """Apply explosion force to the player and return the push strength."""
         dx = player.rect.centerx - self.x
         dy = player.rect.centery - self.y
         distance = math.sqrt(dx ** 2 + dy ** 2)
-
-        # Increased effective radius by 50% for player
-        effective_radius = self.radius * 1.5
-
-        if 0 < distance < effective_radius:
-            # Calculate force based on distance (stronger when closer)
-            distance_ratio = distance / effective_radius
-            force = self.strength * (1 - distance_ratio ** 2) * 15.0  # Increased from 10.0 to 15.0
-
+        force, _ = self.player_forces(distance)
+        if force:
             # Apply force to player's velocity
-            if distance > 0:
-                player.vx += (dx / distance) * force
-                player.vy += (dy / distance) * force
-                player.apply_push_visual()  # Trigger visual effect
+            player.vx += (dx / distance) * force
+            player.vy += (dy / distance) * force
+            player.apply_push_visual()  # Trigger visual effect
 
-                # Return the force strength for shake effect
-                return force * 0.5  # Return a portion of the force for shake
+            # Return the force strength for shake effect
+            return force * 0.5  # Return a portion of the force for shake
         return 0  # No force applied, no shake
 
 
-class ParticleCloud:
-    """Represents an area where particles were recently generated."""
-
-    def __init__(self, x, y, lifetime):
-        self.x = x
-        self.y = y
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-
-    def update(self, dt):
-        """Update the cloud's lifetime."""
-        self.lifetime -= dt
-
-    def is_expired(self):
-        """Check if the cloud has expired."""
-        return self.lifetime <= 0
-
-    def is_too_close(self, x, y, min_distance):
-        """Check if a position is too close to this cloud."""
-        distance = math.sqrt((self.x - x) ** 2 + (self.y - y) ** 2)
-        return distance < min_distance
+class CloudGrid:
+    """Coarse occupancy grid of recent particle clouds with lazy per-cell expiry."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # Key: (cell x, cell y), Value: [x, y, expiry time] entries, oldest first
+        # (every cloud lives PARTICLE_LIFETIME, so entries expire in the order they were added)
+        self.cells = {}
+
+    def live_entries(self, key, now):
+        """Entries of one cell after dropping the expired ones (empty cells are forgotten)."""
+        entries = self.cells.get(key)
+        if entries is None:
+            return ()
+        expired = 0
+        while expired < len(entries) and entries[expired][2] <= now:
+            expired += 1
+        if expired:
+            del entries[:expired]
+            if not entries:
+                del self.cells[key]
+        return entries
+
+    def is_near(self, x, y, distance):
+        """True if a live cloud is within distance of (x, y) (distance must not exceed the cell size)."""
+        now = sim_clock.now
+        cell_x, cell_y = int(x // self.cell_size), int(y // self.cell_size)
+        distance_sq = distance * distance
+        for key_x in (cell_x - 1, cell_x, cell_x + 1):
+            for key_y in (cell_y - 1, cell_y, cell_y + 1):
+                for cloud_x, cloud_y, _ in self.live_entries((key_x, key_y), now):
+                    if (cloud_x - x) ** 2 + (cloud_y - y) ** 2 < distance_sq:
+                        return True
+        return False
+
+    def add(self, x, y, lifetime):
+        """Record a new cloud at (x, y) that lasts lifetime seconds."""
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        entries = self.cells.get(key)
+        if entries is None:
+            entries = self.cells[key] = []
+        entries.append([x, y, sim_clock.now + lifetime])
+
+    def clear(self):
+        """Forget every cloud (e.g. on game reset)."""
+        self.cells.clear()
+
+    def __len__(self):
+        now = sim_clock.now
+        return sum(len(self.live_entries(key, now)) for key in list(self.cells))
 
 
 class Particle:
     """Represents a visual particle effect."""
 
+    __slots__ = ('is_persistent', 'draw_in_front', 'color', 'initial_size', 'lifetime', 'spawn_time',
+                 'shrink_duration', 'x0', 'y0', 'dx0', 'dy0', 'motion_time', 'exit_time', 'uid')
+
+    # Only the spawn state is stored; position, size and fade are evaluated on demand
+    # from the closed form of the per-tick friction, so particles need no per-tick update.
+
     def __init__(self, x, y, is_persistent=False, initial_velocity=None):
-        self.x = x
-        self.y = y
+        self.uid = entity_ids.take()  # Identifies the particle in traces
         self.is_persistent = is_persistent
-        self.draw_in_front = random.random() < 0.5
+
+        # One batched draw covers every random attribute of the particle
+        draw_front, red, green, blue, size = rng.take(5)
+        self.draw_in_front = draw_front < 0.5
 
         # Generate cool blue colors (higher blue values, moderate green, low red)
         self.color = (
-            random.randint(0, 50),  # Red: 0-50 (very low)
-            random.randint(100, 200),  # Green: 100-200 (moderate)
-            random.randint(200, 255)  # Blue: 200-255 (high)
+            int(red * 51),  # Red: 0-50 (very low)
+            100 + int(green * 101),  # Green: 100-200 (moderate)
+            200 + int(blue * 56)  # Blue: 200-255 (high)
         )
 
-        # Size will be set by the create_particles method
-        self.size = random.randint(8, 24) * SCALE_X  # Default size, will be overridden
-        self.initial_size = self.size  # Store initial size for shrinking
+        # Initial size will be set by the create_particles method
+        self.initial_size = (8 + int(size * 17)) * SCALE_X  # Default size, will be overridden
 
-        self.lifetime = 1.0  # Set to 1 second for non-persistent particles
-        self.persistent_timer = 0.0
-        self.creation_time = time.time()  # Track when the particle was created
-        self.shrink_timer = 0.0  # Timer for shrinking effect
+        # 1 second for normal particles, 30 seconds for persistent ones
+        self.lifetime = PERSISTENT_PARTICLE_LIFETIME if is_persistent else 1.0
+        self.spawn_time = sim_clock.now
         self.shrink_duration = 0.5  # Shrink over 0.5 seconds
 
         # Set initial velocity
         if initial_velocity:
-            self.dx, self.dy = initial_velocity
+            dx, dy = initial_velocity
         else:
             # Default random velocity if none provided
-            self.dx = random.uniform(-4, 4) * SCALE_X
-            self.dy = random.uniform(-4, 4) * SCALE_X
-
-    def update(self, dt):
-        """Updates particle position and lifetime."""
-        self.x += self.dx * dt
-        self.y += self.dy * dt
-
-        if not self.is_persistent:
-            self.lifetime -= dt  # Use dt directly instead of decrementing by 1
-
-        # Update shrinking effect (independent of particle type)
-        self.shrink_timer += dt
-        if self.shrink_timer < self.shrink_duration:
-            # Shrink from full size to half size over shrink_duration
-            shrink_ratio = self.shrink_timer / self.shrink_duration  # 0.0 to 1.0
-            # Linear interpolation from full size to half size
-            self.size = self.initial_size * (1.0 - shrink_ratio * 0.5)
-        else:
-            # After shrink_duration, maintain half size
-            self.size = self.initial_size * 0.5
+            dx = rng.uniform(-4, 4) * SCALE_X
+            dy = rng.uniform(-4, 4) * SCALE_X
+
+        self.set_motion(x, y, dx, dy, self.spawn_time)
+
+    def set_motion(self, x, y, dx, dy, start_time):
+        """Restart the analytic motion from a known position and velocity."""
+        self.x0 = x
+        self.y0 = y
+        self.dx0 = dx
+        self.dy0 = dy
+        self.motion_time = start_time
+        self.exit_time = start_time + self._time_to_leave_screen()
+        expiry_scheduler.schedule(self, 'particle', self.expiry_time())
+        if self.is_persistent:
+            # Persistent particles are baked into the debris layer once they stop moving
+            settle_scheduler.schedule(self, 'particle', self.settle_time())
+
+    def _decay(self, t):
+        """Fraction of the starting velocity left after moving for t seconds."""
+        return PARTICLE_FRICTION ** (max(0.0, t - self.motion_time) / LOGIC_TIMESTEP)
+
+    def position_at(self, t):
+        """Position at simulation time t (closed form of x += dx * dt; dx *= friction)."""
+        travelled = 1.0 - self._decay(t)
+        return (self.x0 + self.dx0 * PARTICLE_GLIDE_FACTOR * travelled,
+                self.y0 + self.dy0 * PARTICLE_GLIDE_FACTOR * travelled)
+
+    def velocity_at(self, t):
+        """Velocity at simulation time t."""
+        decay = self._decay(t)
+        return self.dx0 * decay, self.dy0 * decay
+
+    def settle_time(self):
+        """Simulation time at which the particle has slowed below DEBRIS_SLEEP_SPEED and finished shrinking."""
+        speed = math.hypot(self.dx0, self.dy0)
+        settle = self.motion_time
+        if speed > DEBRIS_SLEEP_SPEED:
+            settle += LOGIC_TIMESTEP * math.log(DEBRIS_SLEEP_SPEED / speed) / PARTICLE_FRICTION_LOG
+        return max(settle, self.spawn_time + self.shrink_duration)
+
+    def freeze(self, t):
+        """Stop at the resting point of the current glide (less than a pixel from where it is by now)."""
+        self.x0 = self.x0 + self.dx0 * PARTICLE_GLIDE_FACTOR
+        self.y0 = self.y0 + self.dy0 * PARTICLE_GLIDE_FACTOR
+        self.dx0 = 0.0
+        self.dy0 = 0.0
+        self.motion_time = t
+
+    def size_at(self, t):
+        """Size at simulation time t - shrinks to half size over shrink_duration."""
+        shrink_ratio = min(1.0, max(0.0, t - self.spawn_time) / self.shrink_duration)
+        return self.initial_size * (1.0 - shrink_ratio * 0.5)
+
+    def apply_impulse(self, ix, iy, t):
+        """Add a velocity impulse at time t and restart the analytic motion from there."""
+        x, y = self.position_at(t)
+        dx, dy = self.velocity_at(t)
+        self.set_motion(x, y, dx + ix, dy + iy, t)
+
+    def _time_to_leave_screen(self):
+        """Time after motion_time at which the particle crosses the off-screen margin."""
+        margin = 50
+        exit_after = math.inf
+        for start, velocity, high in ((self.x0, self.dx0, SCREEN_WIDTH + margin),
+                                      (self.y0, self.dy0, SCREEN_HEIGHT + margin)):
+            if start < -margin or start > high:
+                return 0.0
+            # The particle glides toward start + glide distance and never passes it
+            glide = velocity * PARTICLE_GLIDE_FACTOR
+            if start + glide > high:
+                travelled = (high - start) / glide
+            elif start + glide < -margin:
+                travelled = (-margin - start) / glide
+            else:
+                continue
+            exit_after = min(exit_after, LOGIC_TIMESTEP * math.log(1.0 - travelled) / PARTICLE_FRICTION_LOG)
+        return exit_after
 
-        # Apply friction
-        self.dx *= 0.96
-        self.dy *= 0.96
+    def expiry_time(self):
+        """Simulation time at which this particle expires or leaves the screen."""
+        return min(self.spawn_time + self.lifetime, self.exit_time)
 
-        # Update persistent timer
-        if self.is_persistent:
-            self.persistent_timer += dt
+    def is_expired(self, t):
+        """Checks if a particle has exceeded its lifetime at time t."""
+        return t - self.spawn_time >= self.lifetime
 
-    def is_expired(self):
-        """Checks if a particle has exceeded its lifetime."""
-        if self.is_persistent:
-            return self.persistent_timer >= 30.0
-        else:
-            return self.lifetime <= 0
+    def is_off_screen(self, t):
+        """Checks if the particle is off-screen at time t."""
+        return t >= self.exit_time
 
-    def draw(self, screen):
-        """Draws the particle."""
+    def draw(self, screen, t):
+        """Draws the particle as it is at simulation time t."""
+        x, y = self.position_at(t)
         if not self.is_persistent:
-            alpha = self.lifetime / 1.0  # Use the actual lifetime value (1.0)
+            alpha = min(1.0, max(0.0, 1.0 - (t - self.spawn_time) / self.lifetime))
             base_color = self.color
             fade_color = (0, 0, 50)
             color = tuple(int(base_color[i] * alpha + fade_color[i] * (1 - alpha)) for i in range(3))
         else:
             color = self.color
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), int(self.size))
-
-    def is_off_screen(self):
-        """Checks if the particle is off-screen."""
-        margin = 50
-        return (self.x < -margin or self.x > SCREEN_WIDTH + margin or
-                self.y < -margin or self.y > SCREEN_HEIGHT + margin)
+        pygame.draw.circle(screen, color, (int(x), int(y)), int(self.size_at(t)))
 
 
-# Global lists for particle effects
-particle_clouds = []
+# Global particle cloud grid (cells as wide as the cloud spacing) and explosion list
+cloud_grid = CloudGrid(100 * SCALE_X)
 explosions = []
+
+# Global pools for short-lived effects
+particle_pool = ObjectPool(Particle)
+explosion_pool = ObjectPool(Explosion)
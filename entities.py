@@ -1,55 +1,67 @@
 # made by SSJMarx with the help of GLM 4.6
 
 import pygame
-import random
 import math
 from constants import *
+from rng import rng
+from pools import ObjectPool, entity_ids
+from collision import swept_player_hit
 
 
 class Circle:
     """Represents an enemy circle."""
 
+    __slots__ = ('radius', 'speed', 'x', 'y', 'prev_x', 'prev_y', 'dx', 'dy', 'color', 'lod_period', 'lod_due',
+                 'lod_born', 'lod_serial', 'uid')
+
     def __init__(self):
+        self.uid = entity_ids.take()  # Identifies the circle in traces
         max_radius = MAX_RADIUS * 1.5
-        self.radius = max(random.randint(MIN_RADIUS, int(max_radius)) * SCALE_X, MIN_RADIUS * SCALE_X)
-        self.speed = random.uniform(MIN_SPEED, MAX_SPEED) * SCALE_X
+        self.radius = max(rng.randint(MIN_RADIUS, int(max_radius)) * SCALE_X, MIN_RADIUS * SCALE_X)
+        self.speed = rng.uniform(MIN_SPEED, MAX_SPEED) * SCALE_X
         self.prev_x = self.x = 0
         self.prev_y = self.y = 0
         self.color = self._get_random_color()
         self._spawn_from_edge()
         self.prev_x = self.x
         self.prev_y = self.y
+        self.lod_period = 0  # Not yet tiered (see lod.py)
+        self.lod_due = 0
+        self.lod_born = 0
+        self.lod_serial = 0
 
     @staticmethod
     def _get_random_color():
         """Generates a random warm color for the circle."""
-        color_choice = random.choice(['red', 'orange', 'yellow', 'pink'])
+        # One batched draw: color family plus the three channels
+        choice, red, green, blue = rng.take(4)
+        color_choice = CIRCLE_COLOR_FAMILIES[int(choice * 4)]
         if color_choice == 'red':
-            return random.randint(200, 255), random.randint(0, 100), random.randint(0, 100)
+            return 200 + int(red * 56), int(green * 101), int(blue * 101)
         elif color_choice == 'orange':
-            return random.randint(200, 255), random.randint(100, 200), random.randint(0, 100)
+            return 200 + int(red * 56), 100 + int(green * 101), int(blue * 101)
         elif color_choice == 'yellow':
-            return random.randint(200, 255), random.randint(200, 255), random.randint(0, 100)
+            return 200 + int(red * 56), 200 + int(green * 56), int(blue * 101)
         else:  # pink
-            return random.randint(200, 255), random.randint(100, 200), random.randint(150, 255)
+            return 200 + int(red * 56), 100 + int(green * 101), 150 + int(blue * 106)
 
     def _spawn_from_edge(self):
         """Spawns the circle at a random edge of the screen."""
-        side = random.choice(['left', 'right', 'top', 'bottom'])
+        side = rng.choice(CIRCLE_SPAWN_SIDES)
         if side == 'left':
-            self.x, self.y = -self.radius, random.randint(int(self.radius), int(SCREEN_HEIGHT - self.radius))
-            angle = random.uniform(-math.pi / 4, math.pi / 4)
+            self.x, self.y = -self.radius, rng.randint(int(self.radius), int(SCREEN_HEIGHT - self.radius))
+            angle = rng.uniform(-math.pi / 4, math.pi / 4)
         elif side == 'right':
-            self.x, self.y = SCREEN_WIDTH + self.radius, random.randint(int(self.radius),
+            self.x, self.y = SCREEN_WIDTH + self.radius, rng.randint(int(self.radius),
                                                                         int(SCREEN_HEIGHT - self.radius))
-            angle = random.uniform(3 * math.pi / 4, 5 * math.pi / 4)
+            angle = rng.uniform(3 * math.pi / 4, 5 * math.pi / 4)
         elif side == 'top':
-            self.x, self.y = random.randint(int(self.radius), int(SCREEN_WIDTH - self.radius)), -self.radius
-            angle = random.uniform(math.pi / 4, 3 * math.pi / 4)
+            self.x, self.y = rng.randint(int(self.radius), int(SCREEN_WIDTH - self.radius)), -self.radius
+            angle = rng.uniform(math.pi / 4, 3 * math.pi / 4)
         else:  # bottom
-            self.x, self.y = random.randint(int(self.radius),
+            self.x, self.y = rng.randint(int(self.radius),
                                             int(SCREEN_WIDTH - self.radius)), SCREEN_HEIGHT + self.radius
-            angle = random.uniform(-3 * math.pi / 4, -math.pi / 4)
+            angle = rng.uniform(-3 * math.pi / 4, -math.pi / 4)
 
         # Calculate initial direction
         self.dx = math.cos(angle) * self.speed
@@ -100,11 +112,8 @@ class Circle:
         pygame.draw.circle(screen, self.color, (int(interpolated_x), int(interpolated_y)), int(self.radius))
 
     def collides_with(self, player):
-        """Checks collision with the player rectangle."""
-        closest_x = max(player.rect.left, min(self.x, player.rect.right))
-        closest_y = max(player.rect.top, min(self.y, player.rect.bottom))
-        distance_sq = (self.x - closest_x) ** 2 + (self.y - closest_y) ** 2
-        return distance_sq < (self.radius ** 2)
+        """Checks collision with the player rectangle anywhere along this tick's motion of both."""
+        return swept_player_hit(self, player.tick_rect, player.rect) is not None
 
     def collides_with_circle(self, other_circle):
         """Checks collision with another circle."""
@@ -122,7 +131,7 @@ class Circle:
             return []
 
         # Determine number of splits (2-6)
-        num_splits = random.randint(2, 6)
+        num_splits = rng.randint(2, 6)
 
         new_circles = []
         
@@ -144,7 +153,7 @@ class Circle:
 
             for i in range(num_splits - 1):
                 # Each circle gets a random portion of the remaining area
-                ratio = random.uniform(0.1, remaining_ratio * 0.8)
+                ratio = rng.uniform(0.1, remaining_ratio * 0.8)
                 size_ratios.append(ratio)
                 remaining_ratio -= ratio
 
@@ -152,7 +161,7 @@ class Circle:
             size_ratios.append(remaining_ratio)
 
             # Shuffle to randomize which circle gets which size
-            random.shuffle(size_ratios)
+            rng.shuffle(size_ratios)
 
         # Calculate minimum area needed for all circles
         min_total_area = num_splits * math.pi * (min_split_radius ** 2)
@@ -175,22 +184,22 @@ class Circle:
                 remaining_ratio = 1.0
 
                 for i in range(num_splits - 1):
-                    ratio = random.uniform(0.1, remaining_ratio * 0.8)
+                    ratio = rng.uniform(0.1, remaining_ratio * 0.8)
                     size_ratios.append(ratio)
                     remaining_ratio -= ratio
 
                 size_ratios.append(remaining_ratio)
-                random.shuffle(size_ratios)
+                rng.shuffle(size_ratios)
 
         # Use cached angles if available, otherwise generate
         if cached_angles:
             angles = cached_angles
         else:
-            split_angle = random.uniform(0, 2 * math.pi)
+            split_angle = rng.uniform(0, 2 * math.pi)
             angles = [split_angle + (2 * math.pi * i / num_splits) for i in range(num_splits)]
 
         for i in range(num_splits):
-            new_circle = Circle.__new__(Circle)
+            new_circle = circle_pool.acquire_blank()
 
             # Calculate radius based on the area ratio
             target_area = total_target_area * size_ratios[i]
@@ -224,41 +233,41 @@ class Circle:
 
             new_circle.prev_x = new_circle.x
             new_circle.prev_y = new_circle.y
+            new_circle.lod_period = 0
+            new_circle.lod_due = 0
+            new_circle.lod_born = 0
+            new_circle.lod_serial = 0
             new_circles.append(new_circle)
 
         return new_circles
 
-    def create_particles(self, current_objects, max_objects):
+    def create_particles(self):
         """Creates a particle cloud upon destruction."""
-        from effects import particle_clouds  # Import here to avoid circular import
-        from effects import Particle  # Import here to avoid circular import
+        from effects import cloud_grid  # Import here to avoid circular import
+        from effects import particle_pool  # Import here to avoid circular import
         from cache import calculation_cache  # Import cache system
+        from budget import object_budget  # Import here to avoid circular import
         
         particles = []
-        available_slots = max_objects - current_objects - OBJECT_BUFFER
-
-        if available_slots > 0:
-            # Check if this location is too close to existing particle clouds
-            min_distance = 100 * SCALE_X  # Minimum distance between particle clouds
-            too_close = False
 
-            for cloud in particle_clouds:
-                if cloud.is_too_close(self.x, self.y, min_distance):
-                    too_close = True
-                    break
+        # Check if this location is too close to existing particle clouds
+        min_distance = 100 * SCALE_X  # Minimum distance between particle clouds
+        too_close = cloud_grid.is_near(self.x, self.y, min_distance)
 
-            # If too close to another cloud, reduce particle count significantly
-            if too_close:
-                particle_count = min(2, available_slots)  # Only generate a few particles
-            else:
-                # Use the current_particle_count (starts at 20, can be reduced by performance system)
-                from main import current_particle_count  # Import here to avoid circular import
-                particle_count = min(current_particle_count, available_slots)
+        # If too close to another cloud, reduce particle count significantly
+        if too_close:
+            wanted = 2  # Only generate a few particles
+        else:
+            # Use the current_particle_count (starts at 20, can be reduced by performance system)
+            from main import current_particle_count  # Import here to avoid circular import
+            wanted = current_particle_count
+        particle_count = object_budget.grant('particle', wanted)
 
+        if particle_count > 0:
+            if not too_close:
                 # Add a new cloud to track this area
                 # Use PARTICLE_LIFETIME as the cloud's lifetime
-                from effects import ParticleCloud  # Import here to avoid circular import
-                particle_clouds.append(ParticleCloud(self.x, self.y, PARTICLE_LIFETIME))
+                cloud_grid.add(self.x, self.y, PARTICLE_LIFETIME)
 
             # Try to get cached particle pattern
             cached_pattern = calculation_cache.get_cached_particle_pattern(particle_count)
@@ -279,7 +288,7 @@ class Circle:
 
             for i in range(particle_count):
                 # Reduced chance of creating persistent particles from 5% to 2%
-                is_persistent = random.random() < 0.02
+                is_persistent = rng.random() < 0.02
 
                 # Use cached values if available, otherwise fall back to random generation
                 if cached_pattern and i < len(cached_pattern):
@@ -291,31 +300,32 @@ class Circle:
                         dy = (dy / cached_speed) * base_speed
                 else:
                     # Fallback to random generation
-                    angle = random.uniform(0, 2 * math.pi)
-                    velocity_factor = random.uniform(0.7, 1.3)
+                    angle = rng.uniform(0, 2 * math.pi)
+                    velocity_factor = rng.uniform(0.7, 1.3)
                     initial_speed = base_speed * velocity_factor
                     dx = math.cos(angle) * initial_speed
                     dy = math.sin(angle) * initial_speed
 
                 # Create particle with initial velocity
-                particle = Particle(self.x, self.y, is_persistent, (dx, dy))
+                particle = particle_pool.acquire(self.x, self.y, is_persistent, (dx, dy))
 
                 # Use cached size if available, otherwise calculate
                 if cached_sizes:
-                    particle.size = cached_sizes
+                    particle.initial_size = cached_sizes
                 else:
                     # Scale the particle size based on the size ratio
                     # Updated min/max sizes: 8 * SCALE_X to 24 * SCALE_X
                     min_particle_size = 8 * SCALE_X
                     max_particle_size = 24 * SCALE_X
-                    particle.size = min_particle_size + (max_particle_size - min_particle_size) * size_ratio
+                    particle.initial_size = min_particle_size + (max_particle_size - min_particle_size) * size_ratio
 
                 # Use cached color if available
                 if cached_colors and i < len(cached_colors):
                     particle.color = cached_colors[i]
 
-                # Store the initial size for shrinking effect
-                particle.initial_size = particle.size
-
                 particles.append(particle)
         return particles
+
+
+# Global circle pool
+circle_pool = ObjectPool(Circle)
@@ -0,0 +1,228 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+from constants import *
+from timing import sim_clock, discard_from
+
+
+class ExplosionCluster:
+    """Explosions created on the same tick close to one another, with one bounding circle for all of them."""
+
+    __slots__ = ('x', 'y', 'reach', 'spawn_time', 'members')
+
+    def __init__(self, explosion):
+        self.x = explosion.x
+        self.y = explosion.y
+        self.reach = explosion.radius * 1.5  # Farthest any member pushes anything (the player blast)
+        self.spawn_time = explosion.spawn_time
+        self.members = [explosion]
+
+    def add(self, explosion):
+        """Take in one more explosion and grow the bounding circle to cover it."""
+        self.members.append(explosion)
+        offset = math.sqrt((explosion.x - self.x) ** 2 + (explosion.y - self.y) ** 2)
+        self.reach = max(self.reach, offset + explosion.radius * 1.5)
+
+
+class ExplosionField:
+    """Live explosions merged into same-tick clusters; every target sums the push of all of them in one pass."""
+
+    def __init__(self, merge_distance=EXPLOSION_CLUSTER_DISTANCE):
+        self.merge_distance = merge_distance
+        self.clusters = []  # In creation order, so only the newest ones can still take members
+        self.cluster_of = {}  # Key: explosion, Value: its cluster
+
+        # Statistics
+        self.explosions_added = 0
+        self.explosions_merged = 0  # Joined an existing cluster instead of starting one
+        self.clusters_skipped = 0  # Cluster-target pairs rejected by the bounding circle alone
+
+    def add(self, explosion):
+        """Register a new explosion, merging it into a nearby cluster from the same tick."""
+        self.explosions_added += 1
+        merge_sq = self.merge_distance * self.merge_distance
+        for cluster in reversed(self.clusters):
+            if cluster.spawn_time != explosion.spawn_time:
+                break  # Older ticks - their members' timing differs, so they never merge
+            if (cluster.x - explosion.x) ** 2 + (cluster.y - explosion.y) ** 2 <= merge_sq:
+                cluster.add(explosion)
+                self.cluster_of[explosion] = cluster
+                self.explosions_merged += 1
+                return
+        cluster = ExplosionCluster(explosion)
+        self.clusters.append(cluster)
+        self.cluster_of[explosion] = cluster
+
+    def discard(self, dead):
+        """Drop expired explosions, and the clusters they leave empty."""
+        emptied = []
+        for explosion in dead:
+            cluster = self.cluster_of.pop(explosion, None)
+            if cluster is None:
+                continue
+            cluster.members.remove(explosion)
+            if not cluster.members:
+                emptied.append(cluster)
+        if emptied:
+            discard_from(self.clusters, emptied)
+
+    def rebuild(self, explosions):
+        """Recreate the clusters from a list of live explosions (e.g. after loading state)."""
+        self.clear()
+        for explosion in explosions:
+            self.add(explosion)
+
+    def clear(self):
+        """Forget every explosion (e.g. on game reset)."""
+        self.clusters = []
+        self.cluster_of.clear()
+
+    def push(self, player, particles, particle_scale=1.0):
+        """Apply this tick's push from every explosion to the player and to the given persistent particles."""
+        if not self.clusters:
+            return
+        if player is not None:
+            self.push_player(player)
+        now = sim_clock.now
+        for particle in particles:
+            x, y = particle.position_at(now)
+            impulse_x = impulse_y = 0.0
+            for cluster in self.clusters:
+                if (x - cluster.x) ** 2 + (y - cluster.y) ** 2 >= cluster.reach * cluster.reach:
+                    self.clusters_skipped += 1
+                    continue
+                for explosion in cluster.members:
+                    dx, dy = x - explosion.x, y - explosion.y
+                    distance = math.sqrt(dx ** 2 + dy ** 2)
+                    force = explosion.particle_force(distance) * particle_scale
+                    if force:
+                        impulse_x += (dx / distance) * force
+                        impulse_y += (dy / distance) * force
+            # Impulses at one instant just add up, so one restart of the analytic motion covers them all
+            if impulse_x or impulse_y:
+                particle.apply_impulse(impulse_x, impulse_y, now)
+
+    def push_player(self, player):
+        """Sum the blast and direct pushes on the player (one distance per explosion) and shake once."""
+        player_x, player_y = player.rect.centerx, player.rect.centery
+        vx, vy = player.vx, player.vy
+        shake_sq = 0.0
+        pushed = False
+        for cluster in self.clusters:
+            if (player_x - cluster.x) ** 2 + (player_y - cluster.y) ** 2 >= cluster.reach * cluster.reach:
+                self.clusters_skipped += 1
+                continue
+            for explosion in cluster.members:
+                dx, dy = player_x - explosion.x, player_y - explosion.y
+                distance = math.sqrt(dx ** 2 + dy ** 2)
+                blast, direct = explosion.player_forces(distance)
+                if blast:
+                    vx += (dx / distance) * blast
+                    vy += (dy / distance) * blast
+                    # Separate shakes of up to m_i add up to the spread of one shake of up to sqrt(sum m_i^2)
+                    shake_sq += min(blast, 10.0) ** 2
+                    pushed = True
+                if direct:
+                    vx += (dx / distance) * direct
+                    vy += (dy / distance) * direct
+                    pushed = True
+        player.vx, player.vy = vx, vy
+        if pushed:
+            player.apply_push_visual()
+        if shake_sq:
+            player.shake_by(math.sqrt(shake_sq))
+
+    def report(self):
+        """Report how much merging and bounding-circle rejection saved."""
+        return {'clusters': len(self.clusters), 'explosions': len(self.cluster_of),
+                'merged_pct': round(100.0 * self.explosions_merged / self.explosions_added, 1)
+                if self.explosions_added else 0.0,
+                'clusters_skipped': self.clusters_skipped}
+
+
+# Global explosion field instance
+explosion_field = ExplosionField()
+
+
+if __name__ == "__main__":
+    # Equivalence and cost: the old per-explosion loop (blast, shake and the direct push each recomputing
+    # the distance) against one clustered pass, on the same chain reaction
+    import random
+    import timeit
+    import pygame
+    from effects import Explosion, Particle
+    from player import Player
+
+    def chain_reaction(count, groups):
+        """count explosions spread over a few tight groups, as collisions between neighbours produce."""
+        sim_clock.advance()
+        centres = [(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT)) for _ in range(groups)]
+        explosions = []
+        for i in range(count):
+            x, y = centres[i % groups]
+            radius = random.uniform(MIN_RADIUS, MAX_RADIUS) * SCALE_X
+            explosions.append(Explosion(x + random.uniform(-40, 40) * SCALE_X, y + random.uniform(-40, 40) * SCALE_X,
+                                        radius * 5, radius / 10, 0.5))
+        return explosions
+
+    def per_explosion(explosions, player, particles):
+        """The loop game_logic ran before explosions were clustered."""
+        for explosion in explosions:
+            for particle in particles:
+                explosion.apply_force(particle)
+            shake_force = explosion.apply_force_to_player(player)
+            if shake_force > 0:
+                player.apply_shake(shake_force)
+            dx = player.rect.centerx - explosion.x
+            dy = player.rect.centery - explosion.y
+            distance = math.sqrt(dx ** 2 + dy ** 2)
+            if 0 <= distance < explosion.radius:
+                distance_ratio = distance / explosion.radius
+                force = explosion.strength * (1 - distance_ratio ** 2) * 3.0
+                if distance > 0:
+                    player.vx += (dx / distance) * force
+                    player.vy += (dy / distance) * force
+                    player.apply_push_visual()
+
+    def setup(explosions, particle_count, seed):
+        """A player in the middle and persistent particles scattered around, reproducibly."""
+        random.seed(seed)
+        player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        particles = [Particle(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), True, (0.0, 0.0))
+                     for _ in range(particle_count)]
+        return player, particles
+
+    pygame.init()
+    print(f"{'explosions':>10} {'velocity diff':>14} {'shake sd old':>13} {'shake sd new':>13} "
+          f"{'old us':>8} {'new us':>8}")
+    for count in (5, 20, 80):
+        random.seed(count)
+        explosions = chain_reaction(count, max(1, count // 10))
+        field = ExplosionField()
+        for explosion in explosions:
+            field.add(explosion)
+
+        # Same pushes: player velocity and particle velocities after one tick
+        old_player, old_particles = setup(explosions, 200, 1)
+        per_explosion(explosions, old_player, old_particles)
+        new_player, new_particles = setup(explosions, 200, 1)
+        field.push(new_player, new_particles)
+        diff = max([abs(old_player.vx - new_player.vx), abs(old_player.vy - new_player.vy)] +
+                   [abs(a.dx0 - b.dx0) + abs(a.dy0 - b.dy0) for a, b in zip(old_particles, new_particles)])
+
+        # Same shake spread: standard deviation of the offset over many independent ticks
+        old_offsets, new_offsets = [], []
+        for trial in range(2000):
+            player, _ = setup(explosions, 0, trial)
+            per_explosion(explosions, player, [])
+            old_offsets.append(player.shake_offset_x)
+            player, _ = setup(explosions, 0, trial)
+            field.push_player(player)
+            new_offsets.append(player.shake_offset_x)
+        old_sd = math.sqrt(sum(o * o for o in old_offsets) / len(old_offsets))
+        new_sd = math.sqrt(sum(o * o for o in new_offsets) / len(new_offsets))
+
+        player, particles = setup(explosions, 200, 1)
+        old_time = min(timeit.repeat(lambda: per_explosion(explosions, player, particles), number=5, repeat=3)) / 5
+        new_time = min(timeit.repeat(lambda: field.push(player, particles), number=5, repeat=3)) / 5
+        print(f"{count:>10} {diff:>14.2e} {old_sd:>13.2f} {new_sd:>13.2f} {old_time * 1e6:>8.0f} {new_time * 1e6:>8.0f}")
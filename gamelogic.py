@@ -2,21 +2,122 @@
 
 import random
 import math
+from collections import deque
 from constants import *
-from effects import Explosion, ParticleCloud
-from sounds import sound_manager
+from effects import explosion_pool
+from entities import circle_pool
+from splitter import batch_splitter
+from budget import object_budget
+from forces import explosion_field
+from sounds import sound_queue
+
+
+class DestructionQueue:
+    """Spreads the splits and particle bursts of destroyed circles across ticks."""
+
+    def __init__(self, budget=DESTRUCTION_BUDGET_PER_TICK, split_budget=DESTRUCTION_SPLIT_BUDGET_PER_TICK,
+                 max_lag=DESTRUCTION_MAX_LAG_TICKS):
+        self.budget = budget  # Particle bursts processed per tick
+        self.split_budget = split_budget  # Splits processed per tick (one vectorized batch)
+        self.max_lag = max_lag  # Ticks a job may wait: later splits are forced through, later bursts dropped
+        self.splits = deque()  # Entries: (circle, tick destroyed), waiting to be split
+        self.bursts = deque()  # Entries: (circle, tick destroyed), split and waiting for their particles
+        self.tick = 0
+        
+        # Queue depth reporting
+        self.peak_depth = 0
+        self.total_jobs = 0
+        self.deferred_jobs = 0  # Jobs that had to wait at least one tick
+        self.dropped_bursts = 0  # Bursts that waited too long and were never shown
+    
+    def push(self, circle):
+        """Queue the split and particle burst for a destroyed circle."""
+        self.splits.append((circle, self.tick))
+        self.total_jobs += 2
+        self.peak_depth = max(self.peak_depth, len(self.splits) + len(self.bursts))
+    
+    def process(self, circles_list, particles_list, dt=LOGIC_TIMESTEP):
+        """Run one tick's budget of splits and particle bursts (call once per logic tick)."""
+        # One batch of splits, plus any that already waited max_lag ticks so children never trail far behind
+        splits = self.splits
+        count = min(self.split_budget, len(splits))
+        while count < len(splits) and self.tick - splits[count][1] >= self.max_lag:
+            count += 1
+        split_parents = []
+        split_delays = []
+        for _ in range(count):
+            circle, destroyed_tick = splits.popleft()
+            delay_ticks = self.tick - destroyed_tick
+            if delay_ticks > 0:
+                self.deferred_jobs += 1
+            split_parents.append(circle)
+            split_delays.append(delay_ticks)
+            # The burst can only come once the circle is split, as it frees the circle
+            self.bursts.append((circle, destroyed_tick))
+        
+        # A burst this late would go off where the player no longer looks - drop it and free its circle
+        stale = []
+        while self.bursts and self.tick - self.bursts[0][1] >= self.max_lag:
+            stale.append(self.bursts.popleft()[0])
+        self.dropped_bursts += len(stale)
+        
+        finished = []
+        for _ in range(min(self.budget, len(self.bursts))):
+            circle, destroyed_tick = self.bursts.popleft()
+            if self.tick > destroyed_tick:
+                self.deferred_jobs += 1
+            particles_list.extend(circle.create_particles())
+            finished.append(circle)
+        
+        # Late children are caught up to where they would be had they spawned on time
+        children = batch_splitter.split_batch(split_parents, split_delays, dt)
+        object_budget.added('circle', len(children))  # Splits always happen; particles make room
+        circles_list.extend(children)
+        circle_pool.release_all(stale)  # Only after the split, which may have read them this tick
+        circle_pool.release_all(finished)
+        
+        self.tick += 1
+    
+    def jobs(self):
+        """All pending jobs as (job kind, circle, tick destroyed), splits first."""
+        return [('split', circle, tick) for circle, tick in self.splits] + \
+            [('particles', circle, tick) for circle, tick in self.bursts]
+    
+    def requeue(self, kind, circle, tick):
+        """Put back a job returned by jobs() (e.g. when restoring a snapshot)."""
+        (self.splits if kind == 'split' else self.bursts).append((circle, tick))
+    
+    def clear(self):
+        """Drop all pending jobs (e.g. on game reset)."""
+        self.splits.clear()
+        self.bursts.clear()
+    
+    def report(self):
+        """Report current and peak queue depth and how late the oldest pending job is."""
+        oldest = min([jobs[0][1] for jobs in (self.splits, self.bursts) if jobs], default=self.tick)
+        return {
+            'depth': len(self.splits) + len(self.bursts),
+            'peak_depth': self.peak_depth,
+            'oldest_ticks': self.tick - oldest,
+            'total_jobs': self.total_jobs,
+            'deferred_jobs': self.deferred_jobs,
+            'dropped_bursts': self.dropped_bursts,
+        }
+
+
+# Global destruction queue instance
+destruction_queue = DestructionQueue()
 
 
-def destroy_circle(circle, circles_list, particles_list, max_obj_limit, explosions_list):
+def destroy_circle(circle, circles_list, explosions_list):
     """Handles the destruction of a circle, creating splits, particles, and explosions."""
     from cache import calculation_cache  # Import cache system
     
     if circle in circles_list:
         circles_list.remove(circle)
-        circles_list.extend(circle.split())
-        total_objects = len(circles_list) + len(particles_list)
-        new_particles = circle.create_particles(total_objects, max_obj_limit)
-        particles_list.extend(new_particles)
+        object_budget.removed('circle')
+        # Removal, explosion and sound stay immediate; splits and particles are amortized
+        destruction_queue.push(circle)
 
         # Try to get cached explosion pattern
         cached_explosion = calculation_cache.get_cached_explosion_pattern()
@@ -34,10 +135,12 @@ def destroy_circle(circle, circles_list, particles_list, max_obj_limit, explosio
         
         explosion_strength = circle.radius / 10  # Make's explosion strength proportional to circle size
 
-        explosions_list.append(Explosion(circle.x, circle.y, explosion_radius, explosion_strength, 0.5))
-        # Play explosion sound with size-based volume and duration
+        explosion = explosion_pool.acquire(circle.x, circle.y, explosion_radius, explosion_strength, 0.5)
+        explosions_list.append(explosion)
+        explosion_field.add(explosion)
+        # Queue explosion sound with size-based volume and duration (merged per tick)
         size_factor = circle.radius / MAX_RADIUS  # Normalize to 0-1 range
-        sound_manager.play_sized_explosion(size_factor)
+        sound_queue.push_explosion(size_factor)
 
 
 def cleanup_and_update_max(objects_dict, current_max):
@@ -0,0 +1,63 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import time
+from collections import deque
+import pygame
+from constants import *
+
+# Event types the game reacts to - everything else (mouse motion, window events...) is dropped by SDL
+INPUT_EVENT_TYPES = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]
+
+
+class KeyState(set):
+    """Set of held keys that can be indexed like pygame.key.get_pressed()."""
+
+    __getitem__ = set.__contains__
+
+
+class InputBuffer:
+    """Drains the pygame event queue once per frame and hands each player step the input for its time slice."""
+
+    def __init__(self):
+        self.pending = deque()  # (timestamp, event) not yet consumed by a player step
+        self.keys = KeyState()  # Keys held as of the last consumed event
+        self.last_drain = time.perf_counter()
+        self.events_drained = 0
+
+    def setup(self):
+        """Ask SDL to queue only the event types we use (call once after the display is created)."""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(INPUT_EVENT_TYPES)
+
+    def drain(self):
+        """Take every queued event (call exactly once per frame); returns them for UI handling."""
+        now = time.perf_counter()
+        events = pygame.event.get()
+        # pygame doesn't expose SDL's event times, so stamp each event with the start of the
+        # window it arrived in - the first player step that covers that window applies it
+        for event in events:
+            self.pending.append((self.last_drain, event))
+        self.last_drain = now
+        self.events_drained += len(events)
+        return events
+
+    def slice_end(self, accumulator):
+        """Wall-clock end of the player step that leaves this much time in the accumulator."""
+        return self.last_drain - accumulator
+
+    def consume(self, slice_end):
+        """Pop the events that happened up to slice_end and apply them to the held-key state."""
+        events = []
+        pending = self.pending
+        while pending and pending[0][0] <= slice_end:
+            event = pending.popleft()[1]
+            if event.type == pygame.KEYDOWN:
+                self.keys.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.keys.discard(event.key)
+            events.append(event)
+        return events
+
+
+# Global input buffer instance
+input_buffer = InputBuffer()
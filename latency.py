@@ -0,0 +1,96 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import time
+from collections import deque
+import pygame
+from constants import *
+
+# Keys that steer the player and the direction each one accelerates it in (see Player.move)
+MOVEMENT_KEYS = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1),
+                 pygame.K_a: (-1, 0), pygame.K_d: (1, 0), pygame.K_w: (0, -1), pygame.K_s: (0, 1)}
+
+# Input types tracked
+LATENCY_KINDS = ('fire', 'move', 'key')
+
+
+class LatencyTracker:
+    """Measures input-to-photon latency: event intake -> first visible effect -> display.flip()."""
+
+    def __init__(self):
+        self.pending = {kind: deque() for kind in LATENCY_KINDS}  # Intake times still waiting for an effect
+        self.move_directions = deque()  # Direction of each pending 'move' key, in the same order
+        self.effected = []  # (kind, intake time) whose effect will be visible on the next flip
+        self.samples = {kind: deque(maxlen=LATENCY_SAMPLE_COUNT) for kind in LATENCY_KINDS}  # Milliseconds
+        self.timeouts = {kind: 0 for kind in LATENCY_KINDS}  # Inputs that never produced an effect
+
+    def intake(self, events):
+        """Timestamp this frame's input events (call right after pygame.event.get())."""
+        if not LATENCY_TRACKING_ENABLED:
+            return
+        now = time.perf_counter()
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.pending['fire'].append(now)
+            elif event.type == pygame.KEYDOWN:
+                if event.key in MOVEMENT_KEYS:
+                    self.pending['move'].append(now)
+                    self.move_directions.append(MOVEMENT_KEYS[event.key])
+                else:
+                    # Other keys are handled in the same frame, so they show on the next flip
+                    self.effected.append(('key', now))
+
+    def effect(self, kind):
+        """The game just produced the result of the oldest pending input of this kind."""
+        pending = self.pending[kind]
+        if pending:
+            self.effected.append((kind, pending.popleft()))
+
+    def steered(self, steer_x, steer_y):
+        """Match the oldest pending move key once the held keys accelerate the player along its direction."""
+        # Only the keys' own velocity change counts - drift and explosion pushes move the ship without them
+        if self.move_directions:
+            direction_x, direction_y = self.move_directions[0]
+            if steer_x * direction_x + steer_y * direction_y > 0:
+                self.move_directions.popleft()
+                self.effect('move')
+
+    def presented(self):
+        """The frame that shows every effect so far has been flipped (call after display.flip())."""
+        if not LATENCY_TRACKING_ENABLED:
+            return
+        now = time.perf_counter()
+        for kind, stamp in self.effected:
+            self.samples[kind].append((now - stamp) * 1000)
+        self.effected.clear()
+
+        # Forget inputs that never caused anything (e.g. a click while the object cap is reached)
+        for kind, pending in self.pending.items():
+            while pending and now - pending[0] > LATENCY_TIMEOUT:
+                pending.popleft()
+                if kind == 'move':
+                    self.move_directions.popleft()
+                self.timeouts[kind] += 1
+
+    def percentile(self, kind, fraction):
+        """Latency in milliseconds below which the given fraction of samples fall."""
+        ordered = sorted(self.samples[kind])
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self):
+        """Text report of latency percentiles per input type."""
+        lines = ["Input-to-photon latency (ms):"]
+        for kind in LATENCY_KINDS:
+            count = len(self.samples[kind])
+            if not count:
+                lines.append(f"  {kind}: no samples, {self.timeouts[kind]} timed out")
+                continue
+            lines.append(f"  {kind}: p50 {self.percentile(kind, 0.5):.1f}, p90 {self.percentile(kind, 0.9):.1f}, "
+                         f"p99 {self.percentile(kind, 0.99):.1f}, max {max(self.samples[kind]):.1f} "
+                         f"({count} samples, {self.timeouts[kind]} timed out)")
+        return "\n".join(lines)
+
+
+# Global latency tracker instance
+latency_tracker = LatencyTracker()
@@ -0,0 +1,264 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+from constants import *
+from timing import sim_clock
+from collision import segment_circle_time
+
+
+class LodScheduler:
+    """Multi-rate scheduling: circles far from the player run their interaction tests every few ticks over a longer dt."""
+
+    # A circle's motion is linear and integrated every tick; what the tiers thin out are the player hit
+    # test and the circle-pair tests. Once per period a far circle tests its pairs with a swept test covering
+    # the whole period, so passing overlaps are still caught (up to period - 1 ticks late).
+    # It only gets that period when the player (at LOD_PLAYER_SPEED_BOUND) cannot reach it in the meantime.
+
+    def __init__(self, tiers=LOD_TIERS, particle_period=LOD_PARTICLE_PERIOD):
+        self.enabled = LOD_ENABLED
+        self.tiers = tiers  # ((minimum gap to the player, period in ticks), ...) nearest first
+        self.particle_period = particle_period
+        self.next_serial = 0  # Spawn order of tiered circles, which decides who tests a pair of far circles
+
+        # Statistics
+        self.tier_counts = [0] * len(tiers)  # Circles per tier after the latest tick
+        self.pair_tests = 0
+        self.pairs_skipped = 0
+
+    def player_period(self, circle, player, player_speed):
+        """Longest period the tier policy allows a circle without the player being able to reach it first."""
+        if not self.enabled:
+            return 1
+        if player is None:
+            gap = math.inf
+        else:
+            rect = player.rect
+            gap_x = max(rect.left - circle.x, 0, circle.x - rect.right)
+            gap_y = max(rect.top - circle.y, 0, circle.y - rect.bottom)
+            gap = math.sqrt(gap_x ** 2 + gap_y ** 2) - circle.radius
+        period = 1
+        for min_gap, tier_period in self.tiers:
+            if gap >= min_gap and gap - LOD_SLACK > (circle.speed + player_speed) * tier_period * LOGIC_TIMESTEP:
+                period = max(period, tier_period)
+        return period
+
+    def is_due(self, circle):
+        """True if the circle runs its interaction tests this tick."""
+        return circle.lod_due <= sim_clock.tick
+
+    def find_collisions(self, circles, player):
+        """Colliding circles in the order an all-pairs scan finds them; re-tiers every circle that was due."""
+        tick = sim_clock.tick
+        near, far_due = [], []
+        for index, circle in enumerate(circles):
+            if circle.lod_period == 0:
+                # First test - nothing before this tick can be swept over
+                circle.lod_born = tick
+                circle.lod_serial = self.next_serial
+                self.next_serial += 1
+            if circle.lod_period <= 1:
+                near.append(index)
+            elif circle.lod_due <= tick:
+                far_due.append(index)
+
+        pairs = []
+        tests = 0
+        # Near circles test each other every tick at their current positions
+        for p, i in enumerate(near):
+            a = circles[i]
+            ax, ay, ar = a.x, a.y, a.radius
+            for j in near[p + 1:]:
+                b = circles[j]
+                if math.sqrt((ax - b.x) ** 2 + (ay - b.y) ** 2) < ar + b.radius:
+                    pairs.append((i, j))
+            tests += len(near) - p - 1
+
+        # Due far circles test the near circles and the far circles they are responsible for (a pair of
+        # far circles belongs to the older one), swept back over the ticks since they last did
+        dt = LOGIC_TIMESTEP
+        for i in far_due:
+            a = circles[i]
+            ax, ay, ar, adx, ady, serial = a.x, a.y, a.radius, a.dx, a.dy, a.lod_serial
+            since = min(a.lod_period, tick - a.lod_born)
+            for j, b in enumerate(circles):
+                if b.lod_period > 1 and b.lod_serial <= serial:
+                    continue  # Itself, or a far circle that tests this pair
+                tests += 1
+                window = min(since, tick - b.lod_born) * dt
+                radius = ar + b.radius
+                rx, ry = ax - b.x, ay - b.y
+                rdx, rdy = adx - b.dx, ady - b.dy
+                # Cheap bound first: too far apart to have touched at any point of the window
+                reach = radius + math.sqrt(rdx ** 2 + rdy ** 2) * window
+                if rx * rx + ry * ry >= reach * reach:
+                    continue
+                if segment_circle_time(rx - rdx * window, ry - rdy * window, rx, ry, radius) is not None:
+                    pairs.append((min(i, j), max(i, j)))
+
+        # Hand out the new periods
+        if player is not None:
+            player_speed = max(LOD_PLAYER_SPEED_BOUND, math.sqrt(player.vx ** 2 + player.vy ** 2))
+        else:
+            player_speed = 0.0
+        for i in near + far_due:
+            circle = circles[i]
+            circle.lod_period = self.player_period(circle, player, player_speed)
+            circle.lod_due = tick + circle.lod_period
+        tier_index = {tier_period: n for n, (_, tier_period) in enumerate(self.tiers)}
+        tier_counts = [0] * len(self.tiers)
+        for circle in circles:
+            tier_counts[tier_index.get(circle.lod_period, 0)] += 1
+        self.tier_counts = tier_counts
+
+        all_pairs = len(circles) * (len(circles) - 1) // 2
+        self.pair_tests += tests
+        self.pairs_skipped += max(0, all_pairs - tests)
+
+        # Same order as testing every pair (i, j) with i < j, so destruction (and RNG use) stays reproducible
+        pairs.sort()
+        colliding = {}
+        for i, j in pairs:
+            colliding[circles[i]] = True
+            colliding[circles[j]] = True
+        return list(colliding)
+
+    def due_particles(self, particles):
+        """Awake persistent particles that feel explosions this tick (non-persistent ones never do)."""
+        period = self.particle_period if self.enabled else 1
+        if period == 1:
+            return [particle for particle in particles if particle.is_persistent]
+        # Staggered by spawn tick so each tick pushes about 1/period of them
+        phase = sim_clock.tick % period
+        return [particle for particle in particles
+                if particle.is_persistent and round(particle.spawn_time / LOGIC_TIMESTEP) % period == phase]
+
+    def particle_scale(self):
+        """Force multiplier that makes up for the ticks a particle was not pushed."""
+        return self.particle_period if self.enabled else 1
+
+    def report(self):
+        """Report the current tier populations and how many circle-pair tests were skipped."""
+        total = self.pair_tests + self.pairs_skipped
+        return {
+            'tiers': {tier_period: count for (_, tier_period), count in zip(self.tiers, self.tier_counts)},
+            'pair_tests': self.pair_tests,
+            'pairs_skipped_pct': round(100.0 * self.pairs_skipped / total, 1) if total else 0.0,
+        }
+
+
+# Global level-of-detail scheduler instance
+lod_scheduler = LodScheduler()
+
+
+if __name__ == "__main__":
+    # Accuracy check: the same crossing circle pairs and explosion pushes with every tier at full rate
+    # versus the configured tiers, then the cost of a seeded wave with tiering off and on
+    import random
+    import time
+    from entities import Circle
+    from effects import Particle, Explosion
+
+    def make_circle(x, y, radius, dx, dy):
+        """Bare circle with the given motion (no RNG use)."""
+        circle = Circle.__new__(Circle)
+        circle.radius, circle.speed = radius, math.hypot(dx, dy)
+        circle.prev_x = circle.x = x
+        circle.prev_y = circle.y = y
+        circle.dx, circle.dy = dx, dy
+        circle.color = (255, 0, 0)
+        circle.lod_period = circle.lod_due = circle.lod_born = circle.lod_serial = 0
+        return circle
+
+    def first_contact(scheduler, spec, ticks=60):
+        """Tick at which the scheduler reports the pair colliding, or None."""
+        circles = [make_circle(*spec[0]), make_circle(*spec[1])]
+        for tick in range(ticks + 2 * max(period for _, period in LOD_TIERS)):  # Room for a late report
+            sim_clock.advance()
+            for circle in circles:
+                circle.update(LOGIC_TIMESTEP)
+            if scheduler.find_collisions(circles, None):
+                return tick
+        return None
+
+    random.seed(3)
+    full_rate = LodScheduler()
+    full_rate.enabled = False
+    tiered = LodScheduler()
+    hits = misses = extra = 0
+    delays = []
+    for _ in range(2000):
+        # Two circles on paths that cross somewhere in the middle of a 3 second run
+        spec = []
+        for _ in range(2):
+            radius = random.uniform(MIN_SPLIT_RADIUS, MAX_RADIUS) * SCALE_X
+            speed = random.uniform(MIN_SPEED, MAX_SPEED * 1.44) * SCALE_X  # Up to two splits faster
+            angle = random.uniform(0, 2 * math.pi)
+            meet = random.uniform(0.5, 2.5) * speed
+            spec.append((SCREEN_WIDTH / 2 - math.cos(angle) * meet + random.uniform(-20, 20),
+                         SCREEN_HEIGHT / 2 - math.sin(angle) * meet + random.uniform(-20, 20),
+                         radius, math.cos(angle) * speed, math.sin(angle) * speed))
+        reference = first_contact(full_rate, spec)
+        result = first_contact(tiered, spec)
+        if reference is not None and result is None:
+            misses += 1
+        elif reference is None and result is not None:
+            extra += 1  # Grazes between two ticks that only the swept test sees
+        elif reference is not None:
+            hits += 1
+            delays.append(result - reference)
+    print(f"circle pairs (no player, so every circle gets the longest period {max(p for _, p in LOD_TIERS)}):")
+    print(f"  contacts {hits}, missed {misses}, extra grazes caught {extra}, "
+          f"delay ticks mean {sum(delays) / max(1, len(delays)):.2f} max {max(delays, default=0)}")
+
+    # Explosion pushes every tick versus every particle_period ticks at particle_period times the force
+    errors = []
+    for _ in range(200):
+        explosion = Explosion(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, 200 * SCALE_X, 10.0, 0.5)
+        angle = random.uniform(0, 2 * math.pi)
+        offset = random.uniform(10, 190) * SCALE_X
+        phase = random.choice((0, LOGIC_TIMESTEP))
+        rests = []
+        for scheduler in (full_rate, tiered):
+            sim_clock.advance()
+            start = sim_clock.now
+            particle = Particle(explosion.x + math.cos(angle) * offset, explosion.y + math.sin(angle) * offset,
+                                True, (0.0, 0.0))
+            particle.spawn_time += phase  # Either stagger phase
+            while sim_clock.now < start + explosion.max_lifetime:
+                sim_clock.advance()
+                for pushed in scheduler.due_particles([particle]):
+                    explosion.apply_force(pushed, scheduler.particle_scale())
+            rests.append(particle.position_at(math.inf))
+        errors.append(math.hypot(rests[0][0] - rests[1][0], rests[0][1] - rests[1][1]))
+    print(f"particle rest positions after an explosion: error mean {sum(errors) / len(errors):.2f} px "
+          f"max {max(errors):.2f} px")
+
+    # Cost of a seeded wave, tiering off and on (the player stands still in the middle)
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main
+    import lod  # The game's scheduler lives in the imported module, not in this __main__ one
+    from rng import rng
+    from cache import calculation_cache
+    from budget import object_budget
+
+    calculation_cache.preload_all()
+    for enabled in (False, True):
+        rng.seed(5)
+        lod.lod_scheduler.enabled = enabled
+        lod.lod_scheduler.pair_tests = lod.lod_scheduler.pairs_skipped = 0
+        main.reset_game()
+        elapsed = circle_ticks = 0
+        for tick in range(400):
+            for _ in range(3):
+                main.circles.append(main.circle_pool.acquire())
+                object_budget.added('circle')
+            start = time.perf_counter()
+            main.game_logic(LOGIC_TIMESTEP)
+            elapsed += time.perf_counter() - start
+            circle_ticks += len(main.circles)
+            main.player.vx = main.player.vy = 0.0
+            main.player.is_dying = False
+        print(f"tiering {'on ' if enabled else 'off'}: {circle_ticks / 400:.0f} circles, "
+              f"{elapsed / 400 * 1000:.2f} ms per tick, {lod.lod_scheduler.report()}")
@@ -1,24 +1,42 @@
 # made by SSJMarx with the help of GLM 4.6
 
 import pygame
+import gc
 import sys
 import time
 import math
-import random
 
 # Import all modules
 from constants import *
+from rng import rng
 from player import Player
-from entities import Circle
-from projectiles import Projectile
-from effects import Particle, Explosion, ParticleCloud, Star
-from gamelogic import destroy_circle, cleanup_and_update_max
+from entities import Circle, circle_pool
+from projectiles import Projectile, projectile_pool
+from effects import Particle, Explosion, Star, cloud_grid, particle_pool, explosion_pool
+from gamelogic import destroy_circle, cleanup_and_update_max, destruction_queue
+from splitter import batch_splitter
 from ui import draw_game_ui
 from debug import update_debug_display, apply_screen_shake
-from playarea import draw_game_objects, update_particle_clouds
-from sounds import sound_manager
+from playarea import draw_game_objects
+from sounds import sound_manager, sound_queue
 from cache import calculation_cache
 from loading import show_loading_screen
+from timing import sim_clock, expiry_scheduler, discard_from
+from music import music_streamer
+from pools import gc_monitor, allocation_report
+from watchdog import watchdog
+from telemetry import telemetry, FIRE_IDLE, FIRE_SINGLE, FIRE_AUTO
+from tracelog import trace_recorder
+from spectator import spectator_server
+from capture import frame_capture
+from latency import latency_tracker
+from weapons import weapon
+from inputs import input_buffer
+from budget import object_budget
+from debris import debris_layer
+from lod import lod_scheduler
+from forces import explosion_field
+from snapshot import world_snapshots
 
 # UI states
 UI_NONE = "none"
@@ -26,7 +44,6 @@ UI_TITLE = "title"
 UI_GAME_OVER = "game_over"
 
 # Global variables that need to be shared across modules
-particle_clouds = []
 explosions = []
 stars = []
 star_direction = 0
@@ -53,17 +70,11 @@ game_over_accumulator = 0.0
 global_frame_counter = 0
 last_cleanup_frame = 0
 screen_shake_timer = 0
-mouse_held = False
-auto_fire_timer = 0
 spawn_timer = 0
 spawn_delay = 15
-single_fire_shot = False
-mouse_hold_time = 0.0
-current_fire_delay = AUTO_FIRE_BASE_DELAY
-last_click_time = 0.0
-click_count = 0
-play_missile_sound = False
-play_shoot_sound = False
+
+# This module's globals are the world that snapshots capture and restore
+world = sys.modules[__name__]
 
 
 def initialize_game():
@@ -72,6 +83,7 @@ def initialize_game():
     
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Dodge the Circles")
+    input_buffer.setup()
     clock = pygame.time.Clock()
     font_small = pygame.font.SysFont(None, int(24 * SCALE_X))
     
@@ -80,12 +92,13 @@ def initialize_game():
         # Preload calculations
         if not calculation_cache.is_preloaded:
             calculation_cache.preload_all()
+        batch_splitter.build_tables()
         
         # Initialize stars
         if not stars:
-            star_direction = random.uniform(0, 2 * math.pi)
+            star_direction = rng.uniform(0, 2 * math.pi)
             for _ in range(STAR_COUNT):
-                stars.append(Star(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT)))
+                stars.append(Star(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)))
         
         # Initialize player
         player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
@@ -94,21 +107,41 @@ def initialize_game():
     
     # Show loading screen while initializing everything
     show_loading_screen(screen, clock, initialize_all_game_components)
+    
+    # Start the procedural soundtrack producer
+    music_streamer.start()
+    
+    # Move everything allocated while loading out of the cyclic GC's way and start counting pauses
+    gc.freeze()
+    gc_monitor.start()
+    
+    # Start the watchdog, telemetry log, entity trace, spectator stream and video capture (no-ops unless enabled)
+    watchdog.start()
+    telemetry.start()
+    trace_recorder.start()
+    spectator_server.start()
+    frame_capture.start(screen)
 
 
 def reset_game():
     """Reset game to initial state."""
     global ui_state, player, circles, projectiles, particles, score, circle_hits
     global game_over, start_time, accumulator, player_accumulator, game_over_accumulator
-    global mouse_held, auto_fire_timer, spawn_timer, spawn_delay, single_fire_shot
-    global mouse_hold_time, current_fire_delay, last_click_time, click_count
-    global screen_shake_timer, explosions
+    global spawn_timer, spawn_delay, screen_shake_timer, explosions
     
     ui_state = UI_NONE
+    sound_queue.clear()
+    destruction_queue.clear()
+    expiry_scheduler.clear()
+    cloud_grid.clear()
+    debris_layer.clear()
+    explosion_field.clear()
+    world_snapshots.forget_history()
     player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
     circles = []
     projectiles = []
     particles = []
+    object_budget.reset(max_objects, particles)
     score = 0.0
     circle_hits = 0
     game_over = False
@@ -116,30 +149,23 @@ def reset_game():
     accumulator = 0.0
     player_accumulator = 0.0
     game_over_accumulator = 0.0
-    mouse_held = False
-    auto_fire_timer = 0
+    weapon.reset()
     spawn_timer = 0
     spawn_delay = 15
-    single_fire_shot = False
-    mouse_hold_time = 0.0
-    current_fire_delay = AUTO_FIRE_BASE_DELAY
-    last_click_time = 0.0
-    click_count = 0
     screen_shake_timer = 0
     explosions = []
 
 
 def player_logic(dt, events=None):
     """Handle player input and movement at 120 FPS."""
-    global player, mouse_held, single_fire_shot, mouse_hold_time, current_fire_delay
-    global last_click_time, click_count, current_time
+    global player
     
     # Update player movement
-    player.prev_rect = player.rect.copy()
-    player.move(pygame.key.get_pressed(), dt)
+    player.prev_rect.update(player.rect)
+    player.move(input_buffer.keys, dt)
+    latency_tracker.steered(player.steer_vx, player.steer_vy)
     
-    # Handle mouse events
-    current_time = time.time()
+    # Handle keyboard and mouse events
     if events:
         for event in events:
             if event.type == pygame.KEYDOWN:
@@ -161,30 +187,9 @@ def player_logic(dt, events=None):
                     sound_manager.set_volume(new_volume)
                     print(f"Volume: {int(new_volume * 100)}%")
             if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_held = True
-                single_fire_shot = False
-                mouse_hold_time = 0.0
-                current_fire_delay = AUTO_FIRE_BASE_DELAY
-                
-                # Check for rapid clicking
-                if current_time - last_click_time < RAPID_CLICK_THRESHOLD:
-                    click_count += 1
-                else:
-                    click_count = 1
-                last_click_time = current_time
-                
+                weapon.press()
             if event.type == pygame.MOUSEBUTTONUP:
-                mouse_held = False
-                single_fire_shot = False
-                mouse_hold_time = 0.0
-                current_fire_delay = AUTO_FIRE_BASE_DELAY
-                
-                # Check for rapid clicking
-                if current_time - last_click_time < RAPID_CLICK_THRESHOLD:
-                    click_count += 1
-                else:
-                    click_count = 1
-                last_click_time = current_time
+                weapon.release()
     
     return True
 
@@ -202,16 +207,15 @@ def get_projectile_count():
 
 def game_logic(dt):
     """Update game logic at 20 FPS."""
-    global circles, projectiles, particles, explosions, particle_clouds
-    global spawn_timer, spawn_delay, auto_fire_timer, current_fire_delay
-    global mouse_held, mouse_hold_time, single_fire_shot, circle_hits
-    global last_click_time, current_time, screen_shake_timer, game_over
+    global circles, projectiles, particles, explosions
+    global spawn_timer, spawn_delay, circle_hits
+    global screen_shake_timer, game_over
     global player, score, start_time
-    global play_missile_sound, play_shoot_sound  # Sound trigger flags
     
-    # Reset sound triggers
-    play_missile_sound = False
-    play_shoot_sound = False
+    watchdog.begin_tick()
+    
+    # Advance simulation time for analytically evaluated effects
+    sim_clock.advance()
     
     # Update score (only if not game over)
     if not game_over:
@@ -223,38 +227,43 @@ def game_logic(dt):
         circle.update(dt)
         if circle.is_off_screen():
             circles.remove(circle)
+            object_budget.removed('circle')
+            circle_pool.release(circle)
             continue
+        if not lod_scheduler.is_due(circle):
+            continue  # Out of the player's reach until its next tiered test (see lod.py)
         if player is not None and circle.collides_with(player) and not player.is_dying:
             # Start death animation
             player.start_death_animation()
             
             # Create particles for player death
-            total_objects = len(circles) + len(projectiles) + len(particles)
-            available_slots = max_objects - total_objects - OBJECT_BUFFER
             max_death_particles = 50
-            particle_count = min(max_death_particles, available_slots, current_particle_count * 2)
+            particle_count = object_budget.grant('particle', min(max_death_particles, current_particle_count * 2))
             
             player_size_scale = 1.0
             for _ in range(particle_count):
-                is_persistent = random.random() < 0.05
-                particle = Particle(player.rect.centerx, player.rect.centery, is_persistent)
+                is_persistent = rng.random() < 0.05
+                angle = rng.uniform(0, 2 * math.pi)
+                speed = rng.uniform(5, 15) * SCALE_X
+                particle = particle_pool.acquire(player.rect.centerx, player.rect.centery, is_persistent,
+                                                 (math.cos(angle) * speed, math.sin(angle) * speed))
                 
                 min_particle_size = 8 * SCALE_X
                 max_particle_size = 24 * SCALE_X
-                particle.size = min_particle_size + (
+                particle.initial_size = min_particle_size + (
                     max_particle_size - min_particle_size) * player_size_scale
-                particle.initial_size = particle.size
-                
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(5, 15) * SCALE_X
-                particle.dx = math.cos(angle) * speed
-                particle.dy = math.sin(angle) * speed
                 particles.append(particle)
             
-            explosions.append(Explosion(player.rect.centerx, player.rect.centery,
-                                        200 * SCALE_X, 10.0, 0.5))
+            death_explosion = explosion_pool.acquire(player.rect.centerx, player.rect.centery,
+                                                     200 * SCALE_X, 10.0, 0.5)
+            explosions.append(death_explosion)
+            explosion_field.add(death_explosion)
             player.apply_shake(10.0)
-            sound_manager.play('death')
+            sound_queue.push('death')
+    if player is not None:
+        player.tick_rect.update(player.rect)
+    
+    watchdog.mark('circles')
     
     # Update player death animation
     if player is not None and player.is_dying:
@@ -263,161 +272,80 @@ def game_logic(dt):
             global ui_state
             ui_state = UI_GAME_OVER
     
-    # Update projectiles
+    # Update projectiles (swept hits, so the earliest circle along the shot's path is the one hit)
     for projectile in projectiles[:]:
         projectile.update(circles, dt)
-        if projectile.is_off_screen():
+        hit_circle, hit_time = None, None
+        for circle in circles:
+            t = projectile.hit_time(circle)
+            if t is not None and (hit_time is None or t < hit_time):
+                hit_circle, hit_time = circle, t
+        if hit_circle is not None:
             projectiles.remove(projectile)
-            continue
-        for circle in circles[:]:
-            if projectile.collides_with(circle):
-                if projectile in projectiles:
-                    projectiles.remove(projectile)
-                circle_hits += 1
-                destroy_circle(circle, circles, particles, max_objects, explosions)
-                screen_shake_timer = SCREEN_SHAKE_DURATION
-                break
-    
-    # Update particles
-    particles_to_remove = []
-    for particle in particles:
-        particle.update(dt)
-        if particle.is_expired() or particle.is_off_screen():
-            particles_to_remove.append(particle)
-    
-    for particle in particles_to_remove:
-        if particle in particles:
-            particles.remove(particle)
-    
-    # Update explosions
-    for explosion in explosions[:]:
-        explosion.update(dt)
-        if explosion.is_expired():
-            explosions.remove(explosion)
-        else:
-            # Apply explosion force to all particles
-            for particle in particles:
-                explosion.apply_force(particle)
-
-            # Apply explosion force to the player and get shake strength
-            if player is not None:
-                shake_force = explosion.apply_force_to_player(player)
-                if shake_force > 0:
-                    player.apply_shake(shake_force)
-
-                # Apply additional direct explosion force to player (from original)
-                dx = player.rect.centerx - explosion.x
-                dy = player.rect.centery - explosion.y
-                distance = math.sqrt(dx ** 2 + dy ** 2)
-                if 0 <= distance < explosion.radius:
-                    distance_ratio = distance / explosion.radius
-                    force = explosion.strength * (1 - distance_ratio ** 2) * 3.0  # Triple the effect on player
-                    if distance > 0:
-                        player.vx += (dx / distance) * force
-                        player.vy += (dy / distance) * force
-                        player.apply_push_visual()  # Trigger visual effect
-    
-    # Update mouse hold time and firing rate
-    if mouse_held:
-        mouse_hold_time += dt
-        hold_ratio = min(1.0, mouse_hold_time / AUTO_FIRE_RAMP_UP_TIME)
-        current_fire_delay = AUTO_FIRE_BASE_DELAY - (
-            AUTO_FIRE_BASE_DELAY - AUTO_FIRE_MIN_DELAY) * hold_ratio
-    
-    size_multiplier = 1.0 + (PROJECTILE_MAX_SIZE_MULTIPLIER - 1.0) * (
-        1.0 - current_fire_delay / AUTO_FIRE_BASE_DELAY)
-    
-    is_single_shot = (click_count == 1 and not single_fire_shot and
-                      (current_time - last_click_time) < RAPID_CLICK_THRESHOLD)
-    
-    # Handle firing - completely rewritten logic
-    if player is not None and mouse_held and not player.is_dying:
-        # Check if this should be a single shot (homing) or auto-fire
-        if is_single_shot and not single_fire_shot:
-            # Single click - fire homing shots
-            projectile_count = get_projectile_count()
-            total_objects = len(circles) + len(projectiles) + len(particles)
-            if total_objects + projectile_count < max_objects:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                for i in range(projectile_count):
-                    angle = (i - (projectile_count - 1) / 2) * 0.2 if projectile_count > 1 else 0
-                    dx, dy = mouse_x - player.rect.centerx, mouse_y - player.rect.centery
-                    distance = math.sqrt(dx ** 2 + dy ** 2)
-                    if distance > 0:
-                        cos_a, sin_a = math.cos(angle), math.sin(angle)
-                        new_dx, new_dy = dx * cos_a - dy * sin_a, dx * sin_a + dy * cos_a
-                        target_x, target_y = player.rect.centerx + new_dx, player.rect.centery + new_dy
-                    else:
-                        target_x, target_y = player.rect.centerx, player.rect.centery - 100
-                    projectiles.append(
-                        Projectile(player.rect.centerx, player.rect.centery, target_x, target_y, player.vx,
-                                   player.vy, SINGLE_FIRE_HOMING_STRENGTH, SINGLE_FIRE_COLOR,
-                                   SINGLE_FIRE_SIZE_MULTIPLIER))
-                    play_missile_sound = True
-            single_fire_shot = True
-        
-        else:
-            # Auto-fire logic (either holding mouse or single shot was already used)
-            auto_fire_timer += 1  # Increment by frame count since we're in 20 FPS loop
-            
-            # Calculate current fire delay based on hold time (ramp-up effect)
-            if mouse_held:
-                mouse_hold_time += dt
-                hold_ratio = min(1.0, mouse_hold_time / AUTO_FIRE_RAMP_UP_TIME)
-                current_fire_delay = AUTO_FIRE_BASE_DELAY - (
-                    AUTO_FIRE_BASE_DELAY - AUTO_FIRE_MIN_DELAY) * hold_ratio
-            else:
-                current_fire_delay = AUTO_FIRE_BASE_DELAY
-            
-            # Check if it's time to fire
-            if auto_fire_timer >= current_fire_delay:
-                projectile_count = get_projectile_count()
-                total_objects = len(circles) + len(projectiles) + len(particles)
-                if total_objects + projectile_count < max_objects:
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    for i in range(projectile_count):
-                        angle = (i - (projectile_count - 1) / 2) * 0.2 if projectile_count > 1 else 0
-                        dx, dy = mouse_x - player.rect.centerx, mouse_y - player.rect.centery
-                        distance = math.sqrt(dx ** 2 + dy ** 2)
-                        if distance > 0:
-                            cos_a, sin_a = math.cos(angle), math.sin(angle)
-                            new_dx, new_dy = dx * cos_a - dy * sin_a, dx * sin_a + dy * cos_a
-                            target_x, target_y = player.rect.centerx + new_dx, player.rect.centery + new_dy
-                        else:
-                            target_x, target_y = player.rect.centerx, player.rect.centery - 100
-                        projectiles.append(
-                            Projectile(player.rect.centerx, player.rect.centery, target_x, target_y, player.vx,
-                                       player.vy, HOMING_STRENGTH, AUTO_FIRE_COLOR, size_multiplier))
-                        play_shoot_sound = True
-                auto_fire_timer = 0
+            object_budget.removed('projectile')
+            projectile_pool.release(projectile)
+            circle_hits += 1
+            destroy_circle(hit_circle, circles, explosions)
+            screen_shake_timer = SCREEN_SHAKE_DURATION
+        elif projectile.is_off_screen():
+            projectiles.remove(projectile)
+            object_budget.removed('projectile')
+            projectile_pool.release(projectile)
+    
+    watchdog.mark('projectiles')
+    
+    # Remove only the particles and explosions whose lifetime ends on this tick
+    # (particle motion itself is evaluated at draw time)
+    expired = expiry_scheduler.pop_due(sim_clock.tick)
+    discard_from(particles, expired['particle'])
+    discard_from(explosions, expired['explosion'])
+    explosion_field.discard(expired['explosion'])
+    debris_layer.forget(expired['particle'])
+    object_budget.removed('particle', len(expired['particle']))
+    particle_pool.release_all(expired['particle'])
+    explosion_pool.release_all(expired['explosion'])
+    
+    # Persistent particles that came to rest move into the baked debris layer
+    debris_layer.update(particles)
+    watchdog.mark('expiry')
+    
+    # Update explosions (only persistent particles react, and they take turns - see lod.py)
+    if explosions:
+        pushed_particles = lod_scheduler.due_particles(particles)
+        for explosion in explosions:
+            # Settled debris in range rejoins the live particles and is pushed straight away
+            pushed_particles.extend(debris_layer.wake(explosion, particles))
+        # Same-tick explosions are clustered; the player and each particle take one summed push
+        explosion_field.push(player, pushed_particles, lod_scheduler.particle_scale())
+    
+    watchdog.mark('explosions')
     
     # Spawning logic
     spawn_timer += 1
     if spawn_timer >= spawn_delay:
-        if len(circles) + len(projectiles) + len(particles) < max_objects:
-            circles.append(Circle())
+        if object_budget.grant('circle', 1):
+            circles.append(circle_pool.acquire())
         spawn_timer = 0
         spawn_delay = max(8, spawn_delay - 0.1)
     
     # Check circle-to-circle collisions
-    circles_to_destroy = set()
-    for i, circle1 in enumerate(circles):
-        for circle2 in circles[i + 1:]:
-            if circle1.collides_with_circle(circle2):
-                circles_to_destroy.add(circle1)
-                circles_to_destroy.add(circle2)
+    # (circles out of reach of each other skip their pair tests; the order matches a full scan)
+    circles_to_destroy = lod_scheduler.find_collisions(circles, player)
     if circles_to_destroy:
         # sound_manager.play('collision')  # Commented out - destruction sounds provide enough feedback
         for circle in circles_to_destroy:
-            destroy_circle(circle, circles, particles, max_objects, explosions)
+            destroy_circle(circle, circles, explosions)
         screen_shake_timer = SCREEN_SHAKE_DURATION
     
+    watchdog.mark('collisions')
+    
+    # Materialize queued splits and particle bursts within this tick's budget
+    destruction_queue.process(circles, particles)
+    watchdog.mark('destruction')
+    
     if screen_shake_timer > 0:
         screen_shake_timer -= 1
     
-    # Update particle clouds (moved from render loop to 20 FPS)
-    update_particle_clouds(particle_clouds, LOGIC_TIMESTEP, global_frame_counter, particles)
-    
     # Update stars (moved from render loop to 20 FPS)
     for star in stars[:]:
         star.update(LOGIC_TIMESTEP, star_direction)
@@ -425,14 +353,34 @@ def game_logic(dt):
             stars.remove(star)
             stars.append(Star(direction=star_direction))
     
+    watchdog.mark('stars')
+    
     # Update cache system
     calculation_cache.update_cache(LOGIC_TIMESTEP)
     
-    # Play sounds based on trigger flags (moved to 20 FPS loop for performance)
-    if play_missile_sound:
-        sound_manager.play('missile')
-    if play_shoot_sound:
-        sound_manager.play('shoot')
+    # Let the soundtrack follow the action
+    music_streamer.set_intensity(object_budget.total, circle_hits)
+    
+    # Play this tick's queued sounds (merged and voice-limited)
+    sound_queue.flush()
+    watchdog.mark('cache_and_audio')
+    watchdog.end_tick()
+    
+    # Record this tick for post-mortem analysis
+    if telemetry.enabled:
+        if not weapon.held:
+            fire_mode = FIRE_IDLE
+        elif weapon.single_shot_used:
+            fire_mode = FIRE_AUTO
+        else:
+            fire_mode = FIRE_SINGLE
+        telemetry.record_tick(sim_clock.tick, len(circles), len(projectiles), len(particles), len(explosions),
+                              len(cloud_grid), spawn_delay, weapon.fire_delay, fire_mode, sound_queue,
+                              watchdog.last_tick_phases)
+    if trace_recorder.enabled:
+        trace_recorder.record_tick(sim_clock.tick, player, circles, projectiles, particles, explosions)
+    if spectator_server.enabled:
+        spectator_server.publish(sim_clock.tick, player, circles, projectiles, particles, game_over, score, circle_hits)
 
 
 def render():
@@ -501,7 +449,7 @@ def main():
     """Main game function - continuous game logic with UI overlays."""
     global ui_state, accumulator, player_accumulator, game_over_accumulator
     global global_frame_counter, last_cleanup_frame, spawn_timer, spawn_delay
-    global circles, projectiles, particles, explosions, particle_clouds, max_objects
+    global circles, projectiles, particles, explosions, max_objects
     
     initialize_game()
     
@@ -512,9 +460,11 @@ def main():
         player_accumulator += frame_time
         game_over_accumulator += frame_time
         global_frame_counter += 1
+        watchdog.begin_frame()
         
-        # Collect all events for this frame
-        events = pygame.event.get()
+        # Collect all events for this frame (the only place the event queue is drained)
+        events = input_buffer.drain()
+        latency_tracker.intake(events)
         
         # Handle input for UI overlays
         for event in events:
@@ -528,24 +478,39 @@ def main():
                         reset_game()
                 elif event.key == pygame.K_ESCAPE:
                     running = False
-        
-        # Handle player input only when no UI overlay is active
-        if ui_state == UI_NONE:
-            if not player_logic(PLAYER_LOGIC_TIMESTEP, events):
-                running = False
+                elif event.key == pygame.K_F5 and ui_state != UI_TITLE:
+                    world_snapshots.quick_save(world)
+                elif event.key == pygame.K_F9 or (event.key == pygame.K_BACKSPACE and ui_state != UI_TITLE):
+                    if event.key == pygame.K_F9:
+                        restored = world_snapshots.quick_load(world)
+                    else:
+                        restored = world_snapshots.rewind(world)
+                    if restored:
+                        # The mouse button may have been let go since the snapshot was taken
+                        weapon.held = weapon.held and pygame.mouse.get_pressed()[0]
         
         # Update game logic at 20 FPS (always runs)
         while accumulator >= LOGIC_TIMESTEP:
             game_logic(LOGIC_TIMESTEP)
             accumulator -= LOGIC_TIMESTEP
         
-        # Update player accumulator (only when no UI overlay)
+        # Keep a short history of the world to rewind to
+        if ui_state == UI_NONE:
+            world_snapshots.record(world)
+        
+        # Update player at 120 FPS - each step gets exactly the input from its own time slice
         while player_accumulator >= PLAYER_LOGIC_TIMESTEP:
+            player_accumulator -= PLAYER_LOGIC_TIMESTEP
+            step_events = input_buffer.consume(input_buffer.slice_end(player_accumulator))
             if ui_state == UI_NONE:
-                player_logic(PLAYER_LOGIC_TIMESTEP)
+                if not player_logic(PLAYER_LOGIC_TIMESTEP, step_events):
+                    running = False
                 # Update player shake effect
                 player.update_shake()
-            player_accumulator -= PLAYER_LOGIC_TIMESTEP
+                
+                # Fire on the player step; new shots cover the time left until the next logic tick
+                tick_remaining = LOGIC_TIMESTEP - accumulator + player_accumulator
+                weapon.update(PLAYER_LOGIC_TIMESTEP, tick_remaining, player, projectiles, get_projectile_count())
         
         # Update game over accumulator
         while game_over_accumulator >= LOGIC_TIMESTEP:
@@ -560,9 +525,41 @@ def main():
         #         particles = objects_dict['particles']
         #         last_cleanup_frame = global_frame_counter
         
+        # Keep the music channel fed (never blocks)
+        music_streamer.update()
+        
         # Render everything with UI overlays
         render()
+        latency_tracker.presented()
+        frame_capture.grab()  # After the present timestamp, so capturing never adds to measured latency
+        watchdog.end_frame({'circles': len(circles), 'projectiles': len(projectiles),
+                            'particles': len(particles), 'explosions': len(explosions),
+                            'clouds': len(cloud_grid), 'debris': len(debris_layer)})
+        telemetry.record_frame(sim_clock.tick, clock.get_fps(), frame_time)
         clock.tick(120)
+    
+    music_streamer.stop()
+    calculation_cache.stop_producer()
+    watchdog.stop()
+    telemetry.stop()
+    trace_recorder.stop()
+    spectator_server.stop()
+    frame_capture.stop()
+    
+    # Print the allocation report when the performance display was left on
+    if show_performance:
+        print(allocation_report())
+        print(f"Calculation cache: {calculation_cache.report()}")
+        print(latency_tracker.report())
+        print(f"Object budget: {object_budget.report()}")
+        print(f"Debris layer: {debris_layer.report()}")
+        print(f"Level of detail: {lod_scheduler.report()}")
+        print(f"Batch splitter: {batch_splitter.report()}")
+        print(f"Explosion field: {explosion_field.report()}")
+        print(f"Snapshots: {world_snapshots.report()}")
+        print(f"Entity trace: {trace_recorder.report()}")
+        print(f"Spectators: {spectator_server.report()}")
+        print(f"Video capture: {frame_capture.report()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import threading
+import queue
+import numpy as np
+import pygame
+from constants import *
+from sounds import sound_manager
+
+
+class MusicStreamer:
+    """Streams an adaptive procedural soundtrack generated in chunks on a background thread."""
+
+    def __init__(self):
+        self.chunks = queue.Queue(maxsize=MUSIC_QUEUE_DEPTH)  # Bounded - memory stays constant
+        self.channel = None
+        self.thread = None
+        self.running = False
+
+        # Intensity: target is written by the logic thread, current is smoothed by the producer
+        self.target_intensity = 0.0
+        self.current_intensity = 0.0
+
+        # Sequencer state (only touched by the producer thread)
+        self.sample_position = 0  # Running sample index keeps oscillators phase-continuous
+        self.beat = 0
+
+        # Playback state (only touched by the main thread)
+        self.last_chunk = None
+        self.chunks_played = 0
+        self.underruns = 0  # Times the producer fell behind and the last chunk was repeated
+
+    def start(self):
+        """Reserve a mixer channel and start the producer thread."""
+        if self.running or not MUSIC_ENABLED:
+            return
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        self.running = True
+        self.thread = threading.Thread(target=self.produce, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the producer thread and silence the music channel."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        if self.channel is not None:
+            self.channel.stop()
+
+    def set_intensity(self, entity_count, circle_hits):
+        """Set the target intensity from the live entity count and hit count (0.0 to 1.0)."""
+        crowd = min(1.0, entity_count / MUSIC_FULL_INTENSITY_ENTITIES)
+        progress = min(1.0, circle_hits / MUSIC_FULL_INTENSITY_HITS)
+        self.target_intensity = crowd * 0.7 + progress * 0.3
+
+    def produce(self):
+        """Producer loop - keeps the chunk queue topped up without ever blocking the game."""
+        while self.running:
+            # Drop the optional layers when the queue is nearly empty so we catch up faster
+            starving = self.chunks.qsize() <= 1
+            chunk = self.generate_chunk(full_mix=not starving)
+            while self.running:
+                try:
+                    self.chunks.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def generate_chunk(self, full_mix=True, sample_rate=22050):
+        """Generate one beat of music as a Sound."""
+        # Ease toward the target so intensity changes don't jump mid-phrase
+        self.current_intensity += (self.target_intensity - self.current_intensity) * 0.25
+        intensity = self.current_intensity
+
+        frames = int(MUSIC_CHUNK_DURATION * sample_rate)
+        local_t = np.arange(frames) / sample_rate
+        t = (self.sample_position + np.arange(frames)) / sample_rate
+
+        # Bass - one root note per bar, decaying over the beat
+        root = MUSIC_BASS_NOTES[(self.beat // 4) % len(MUSIC_BASS_NOTES)]
+        bass_envelope = np.exp(-3 * local_t / MUSIC_CHUNK_DURATION)
+        arr = 0.35 * (0.6 + 0.4 * intensity) * bass_envelope * np.sin(2 * np.pi * root * t)
+
+        # Kick drum on every beat once things get busy
+        if intensity > 0.2:
+            kick_freq = 40 + 80 * np.exp(-30 * local_t)
+            kick_envelope = np.exp(-25 * local_t)
+            arr += 0.5 * intensity * kick_envelope * np.sin(2 * np.pi * kick_freq * local_t)
+
+        if full_mix:
+            # Arpeggio - more notes per beat at higher intensity
+            subdivisions = 4 if intensity > 0.5 else 2
+            note_frames = frames // subdivisions
+            for n in range(subdivisions):
+                step = self.beat * subdivisions + n
+                semitones = MUSIC_ARP_STEPS[step % len(MUSIC_ARP_STEPS)]
+                freq = root * 4 * 2 ** (semitones / 12)
+                note_t = np.arange(note_frames) / sample_rate
+                note = np.sin(2 * np.pi * freq * note_t) * np.exp(-12 * note_t / (note_frames / sample_rate))
+                start = n * note_frames
+                arr[start:start + note_frames] += 0.12 * (0.4 + 0.6 * intensity) * note
+
+            # Hi-hat noise ticks on the off-beat at high intensity
+            if intensity > 0.6:
+                half = frames // 2
+                hat_t = np.arange(frames - half) / sample_rate
+                arr[half:] += 0.08 * intensity * np.random.uniform(-1, 1, frames - half) * np.exp(-60 * hat_t)
+
+        self.sample_position += frames
+        self.beat += 1
+        return sound_manager.to_sound(np.clip(arr * 0.8, -1, 1))
+
+    def update(self):
+        """Feed the music channel from the chunk queue (call once per frame, never blocks)."""
+        if self.channel is None:
+            return
+
+        if not sound_manager.enabled:
+            self.channel.pause()
+            return
+        self.channel.unpause()
+        self.channel.set_volume(sound_manager.volume * MUSIC_VOLUME)
+
+        # Keep exactly one chunk queued behind the one that is playing
+        if self.channel.get_queue() is not None:
+            return
+
+        try:
+            chunk = self.chunks.get_nowait()
+        except queue.Empty:
+            # Producer fell behind - repeat the last chunk rather than going silent
+            if self.last_chunk is None or self.channel.get_busy():
+                return
+            chunk = self.last_chunk
+            self.underruns += 1
+
+        if self.channel.get_busy():
+            self.channel.queue(chunk)
+        else:
+            self.channel.play(chunk)
+        self.last_chunk = chunk
+        self.chunks_played += 1
+
+
+# Global music streamer instance
+music_streamer = MusicStreamer()
@@ -2,14 +2,20 @@
 
 import pygame
 from constants import *
+from timing import sim_clock
+from debris import debris_layer
 
 
 def draw_game_objects(screen, player, circles, projectiles, particles, alpha, player_alpha, game_over):
     """Draws all game objects in the correct order."""
-    # Draw particles (background layer)
+    # Particles are evaluated at the same interpolated moment as the other entities
+    particle_time = sim_clock.render_time(alpha)
+    
+    # Draw particles (background layer) - settled debris first, from its baked surface
+    debris_layer.draw_back(screen)
     for particle in particles:
         if not particle.draw_in_front:
-            particle.draw(screen)
+            particle.draw(screen, particle_time)
 
     # Draw player (only if player exists and not in game over state, even if dying)
     if player is not None and not game_over:
@@ -26,14 +32,5 @@ def draw_game_objects(screen, player, circles, projectiles, particles, alpha, pl
     # Draw particles (foreground layer)
     for particle in particles:
         if particle.draw_in_front:
-            particle.draw(screen)
-
-
-def update_particle_clouds(particle_clouds, frame_time, global_frame_counter, particles=None):
-    """Updates particle clouds and removes expired ones."""
-    
-    # Update particle clouds and remove expired ones
-    for cloud in particle_clouds[:]:
-        cloud.update(frame_time)
-        if cloud.is_expired():
-            particle_clouds.remove(cloud)
+            particle.draw(screen, particle_time)
+    debris_layer.draw_front(screen)
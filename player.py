@@ -12,9 +12,12 @@ class Player:
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, PLAYER_WIDTH, PLAYER_HEIGHT)
         self.prev_rect = self.rect.copy()  # For interpolation
+        self.tick_rect = self.rect.copy()  # Position at the previous logic tick (for swept collisions)
         self.color = PLAYER_COLOR  # Use the new player color constant
         self.vx = 0.0
         self.vy = 0.0
+        self.steer_vx = 0.0  # Velocity change the held movement keys made on the latest step
+        self.steer_vy = 0.0
         self.push_effect_timer = 0  # Timer for visual push effect
         self.shake_offset_x = 0.0  # Shake offset for X position
         self.shake_offset_y = 0.0  # Shake offset for Y position
@@ -29,7 +32,10 @@ class Player:
     def apply_shake(self, force):
         """Apply shake effect to the player's position."""
         # Apply random shake based on force strength
-        shake_magnitude = min(force * 2.0, 10.0)  # Cap the shake magnitude
+        self.shake_by(min(force * 2.0, 10.0))  # Cap the shake magnitude
+
+    def shake_by(self, shake_magnitude):
+        """Add a random shake of up to shake_magnitude in each direction."""
         self.shake_offset_x += random.uniform(-shake_magnitude, shake_magnitude)
         self.shake_offset_y += random.uniform(-shake_magnitude, shake_magnitude)
 
@@ -90,6 +96,7 @@ class Player:
     def move(self, keys, dt):
         """Updates player position and velocity based on input."""
         # Don't move if in death animation
+        self.steer_vx = self.steer_vy = 0.0
         if self.is_dying:
             return
 
@@ -130,12 +137,14 @@ class Player:
                 speed_capacity = max(turn_factor, forward_taper)
 
             # Apply acceleration and clamp to max speed
+            start_vx, start_vy = self.vx, self.vy
             self.vx += input_x * PLAYER_ACCELERATION * dt * speed_capacity
             self.vy += input_y * PLAYER_ACCELERATION * dt * speed_capacity
             new_speed = math.sqrt(self.vx ** 2 + self.vy ** 2)
             if new_speed > PLAYER_MAX_SPEED:
                 self.vx = (self.vx / new_speed) * PLAYER_MAX_SPEED
                 self.vy = (self.vy / new_speed) * PLAYER_MAX_SPEED
+            self.steer_vx, self.steer_vy = self.vx - start_vx, self.vy - start_vy
         else:
             # Apply friction when no input is given
             self.vx *= PLAYER_FRICTION
@@ -0,0 +1,144 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import gc
+import sys
+import time
+from constants import *
+
+# Every pool registers itself here for the allocation report
+all_pools = []
+
+
+class EntityIds:
+    """Hands out entity ids that are never reused, even when a pooled object is."""
+
+    def __init__(self):
+        self.next_uid = 1  # 0 is the player
+
+    def take(self):
+        """A fresh id."""
+        uid = self.next_uid
+        self.next_uid += 1
+        return uid
+
+
+class ObjectPool:
+    """Free list of reusable entity instances with explicit acquire/release."""
+
+    def __init__(self, cls, max_free=POOL_MAX_FREE):
+        self.cls = cls
+        self.max_free = max_free
+        self.free = []
+
+        # Allocation tracking
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        all_pools.append(self)
+
+    def acquire(self, *args, **kwargs):
+        """Get an initialized instance, reusing a released one when possible."""
+        if POOLING_ENABLED and self.free:
+            obj = self.free.pop()
+            obj.__init__(*args, **kwargs)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.cls(*args, **kwargs)
+
+    def acquire_blank(self):
+        """Get an instance without running __init__ (the caller sets every field)."""
+        if POOLING_ENABLED and self.free:
+            self.reused += 1
+            obj = self.free.pop()
+        else:
+            self.created += 1
+            obj = self.cls.__new__(self.cls)
+        obj.uid = entity_ids.take()
+        return obj
+
+    def release(self, obj):
+        """Return an instance that is no longer referenced by the game."""
+        if POOLING_ENABLED and len(self.free) < self.max_free:
+            self.free.append(obj)
+            self.released += 1
+
+    def release_all(self, objs):
+        """Return several instances at once."""
+        for obj in objs:
+            self.release(obj)
+
+
+class GCMonitor:
+    """Counts cyclic garbage collections and how long they pause the game."""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]  # Per generation
+        self.total_pause = 0.0
+        self.max_pause = 0.0
+        self.pause_start = 0.0
+        self.running = False
+
+    def callback(self, phase, info):
+        """gc.callbacks hook - times each collection."""
+        if phase == 'start':
+            self.pause_start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self.pause_start
+            self.collections[info['generation']] += 1
+            self.total_pause += pause
+            self.max_pause = max(self.max_pause, pause)
+
+    def start(self):
+        """Start counting collections."""
+        if not self.running:
+            gc.callbacks.append(self.callback)
+            self.running = True
+
+    def stop(self):
+        """Stop counting collections."""
+        if self.running:
+            gc.callbacks.remove(self.callback)
+            self.running = False
+
+
+def instance_bytes(obj):
+    """Memory used by one instance, including its __dict__ when it has one."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def dict_layout_bytes(obj):
+    """Memory the same instance would use with a regular per-instance __dict__."""
+    shadow_cls = type(type(obj).__name__ + 'Dict', (), {})
+    shadow = shadow_cls()
+    for name in type(obj).__slots__:
+        if hasattr(obj, name):
+            setattr(shadow, name, getattr(obj, name))
+    return instance_bytes(shadow)
+
+
+def allocation_report():
+    """Build a text report comparing entity layouts, pool reuse and GC pauses."""
+    lines = ["Entity memory and allocation report:"]
+    for pool in all_pools:
+        sample = pool.free[-1] if pool.free else None
+        if sample is not None:
+            layout = f"{instance_bytes(sample)} bytes slotted vs {dict_layout_bytes(sample)} bytes with __dict__"
+        else:
+            layout = "no released instance to measure"
+        lines.append(f"  {pool.cls.__name__}: {layout}; created {pool.created}, reused {pool.reused}, "
+                     f"free {len(pool.free)}")
+    lines.append(f"  GC collections (gen 0/1/2): {'/'.join(str(c) for c in gc_monitor.collections)}, "
+                 f"total pause {gc_monitor.total_pause * 1000:.1f} ms, "
+                 f"longest {gc_monitor.max_pause * 1000:.2f} ms")
+    return "\n".join(lines)
+
+
+# Global entity id source
+entity_ids = EntityIds()
+
+# Global GC monitor instance
+gc_monitor = GCMonitor()
@@ -3,13 +3,19 @@
 import pygame
 import math
 from constants import *
+from pools import ObjectPool, entity_ids
+from collision import swept_projectile_hit
 
 
 class Projectile:
     """Represents a projectile fired by the player."""
 
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'dx', 'dy', 'angle', 'homing_strength', 'color', 'size',
+                 'pending_dt', 'step_start', 'uid')
+
     def __init__(self, x, y, target_x, target_y, player_vx: float = 0.0, player_vy: float = 0.0,
                  homing_strength: float = HOMING_STRENGTH, color: tuple = YELLOW, size_multiplier: float = 1.0):
+        self.uid = entity_ids.take()  # Identifies the projectile in traces
         self.prev_x = self.x = x
         self.prev_y = self.y = y
         dx, dy = target_x - x, target_y - y
@@ -45,9 +51,18 @@ class Projectile:
         self.homing_strength = homing_strength  # Store the homing strength for this projectile
         self.color = color  # Store the color for this projectile
         self.size = PROJECTILE_SIZE * SCALE_X * size_multiplier  # Calculate the projectile size
+        self.pending_dt = None  # Length of the first step when spawned between logic ticks
+        self.step_start = 0.0  # Fraction of the tick at which this tick's motion began
 
     def update(self, circles, dt):
         """Updates projectile position and applies homing."""
+        if self.pending_dt is not None:
+            # Spawned between ticks - only fly for the time since the spawn
+            self.step_start = 1.0 - self.pending_dt / dt
+            dt = self.pending_dt
+            self.pending_dt = None
+        else:
+            self.step_start = 0.0
         self.prev_x = self.x
         self.prev_y = self.y
         self.x += self.dx * dt
@@ -88,6 +103,13 @@ class Projectile:
         pygame.draw.polygon(screen, self.color, rotated_points)
 
     def collides_with(self, circle):
-        """Checks collision with a circle."""
-        distance = math.sqrt((self.x - circle.x) ** 2 + (self.y - circle.y) ** 2)
-        return distance < (circle.radius + PROJECTILE_HITBOX_BONUS)
+        """Checks collision with a circle anywhere along this tick's motion (swept, so fast shots can't tunnel)."""
+        return swept_projectile_hit(self, circle) is not None
+
+    def hit_time(self, circle):
+        """Fraction of this tick at which the projectile first touched a circle, or None."""
+        return swept_projectile_hit(self, circle)
+
+
+# Global projectile pool
+projectile_pool = ObjectPool(Projectile)
@@ -0,0 +1,110 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import numpy as np
+from constants import *
+
+
+class RandomService:
+    """Seedable random number source that hands out pre-drawn NumPy blocks."""
+
+    def __init__(self, seed=None, block_size=RNG_BLOCK_SIZE):
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Restart every stream from a seed (None picks a fresh random seed)."""
+        self.seed_value = seed
+        self.generator = np.random.default_rng(seed)
+        self.uniform_block = []
+        self.uniform_index = 0
+        self.normal_block = []
+        self.normal_index = 0
+        self.refills = 0
+
+    def _refill_uniform(self):
+        """Draw the next block of uniform samples in bulk."""
+        # Keep any leftover samples so the stream stays identical however it is consumed
+        leftover = self.uniform_block[self.uniform_index:]
+        self.uniform_block = leftover + self.generator.random(self.block_size).tolist()
+        self.uniform_index = 0
+        self.refills += 1
+
+    def random(self):
+        """Uniform float in [0, 1)."""
+        if self.uniform_index >= len(self.uniform_block):
+            self._refill_uniform()
+        value = self.uniform_block[self.uniform_index]
+        self.uniform_index += 1
+        return value
+
+    def take(self, count):
+        """Several uniform floats in [0, 1) at once (one call for a whole entity)."""
+        end = self.uniform_index + count
+        if end > len(self.uniform_block):
+            self._refill_uniform()
+            end = count
+        values = self.uniform_block[self.uniform_index:end]
+        self.uniform_index = end
+        return values
+
+    def uniform(self, a, b):
+        """Uniform float between a and b."""
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        """Uniform integer between a and b inclusive."""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        """Uniformly chosen element of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, items):
+        """Shuffle a list in place (Fisher-Yates)."""
+        for i in range(len(items) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            items[i], items[j] = items[j], items[i]
+
+    def normal(self, mu=0.0, sigma=1.0):
+        """Normally distributed float."""
+        if self.normal_index >= len(self.normal_block):
+            self.normal_block = self.generator.standard_normal(self.block_size).tolist()
+            self.normal_index = 0
+            self.refills += 1
+        value = self.normal_block[self.normal_index]
+        self.normal_index += 1
+        return mu + sigma * value
+
+    def uniform_array(self, count, a=0.0, b=1.0):
+        """NumPy array of uniform floats for vectorized code."""
+        return self.generator.uniform(a, b, count)
+
+    def integers_array(self, count, a, b):
+        """NumPy array of integers between a and b inclusive."""
+        return self.generator.integers(a, b + 1, count)
+
+    def spawn(self):
+        """Independent child stream derived from this one (e.g. for a worker thread)."""
+        return RandomService(int(self.generator.integers(0, 2 ** 63)), self.block_size)
+
+    def get_state(self):
+        """Capture the full stream state (generator plus undrawn buffered samples)."""
+        return {
+            'seed': self.seed_value,
+            'generator': self.generator.bit_generator.state,
+            'uniform': self.uniform_block[self.uniform_index:],
+            'normal': self.normal_block[self.normal_index:],
+        }
+
+    def set_state(self, state):
+        """Restore a state captured with get_state."""
+        self.seed_value = state['seed']
+        self.generator.bit_generator.state = state['generator']
+        self.uniform_block = list(state['uniform'])
+        self.uniform_index = 0
+        self.normal_block = list(state['normal'])
+        self.normal_index = 0
+
+
+# Global random service - seed it once (RNG_SEED) to make a whole session reproducible
+rng = RandomService(RNG_SEED)
@@ -0,0 +1,558 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+import time
+import random
+from collections import deque
+from itertools import repeat
+from operator import attrgetter
+import numpy as np
+import pygame
+from constants import *
+from rng import rng
+from timing import sim_clock, expiry_scheduler, settle_scheduler
+from player import Player
+from entities import circle_pool
+from projectiles import projectile_pool
+from pools import entity_ids
+from effects import Star, cloud_grid, particle_pool, explosion_pool
+from gamelogic import destruction_queue
+from debris import debris_layer
+from forces import explosion_field
+from lod import lod_scheduler
+from cache import calculation_cache
+from weapons import weapon
+from budget import object_budget
+from sounds import sound_queue
+
+# Bumped whenever a table below changes layout or meaning
+SNAPSHOT_VERSION = 3
+
+# Globals of the main module that are part of the world (ui_state is stored separately as text)
+WORLD_FIELDS = ('game_over', 'score', 'circle_hits', 'spawn_timer', 'spawn_delay', 'screen_shake_timer',
+                'max_objects', 'current_particle_count', 'star_direction')
+
+# One record of clocks, counters and main-module globals
+WORLD_DTYPE = np.dtype([
+    ('game_over', '?'),
+    ('score', '<f8'),
+    ('circle_hits', '<u4'),
+    ('spawn_timer', '<f8'),
+    ('spawn_delay', '<f8'),
+    ('screen_shake_timer', '<i4'),
+    ('max_objects', '<u4'),
+    ('current_particle_count', '<u4'),
+    ('star_direction', '<f8'),
+    ('ui_state', 'S16'),
+    ('version', '<u2'),
+    ('tick', '<i8'),
+    ('expiry_last_tick', '<i8'),
+    ('settle_last_tick', '<i8'),
+    ('destruction_tick', '<i8'),
+    ('lod_next_serial', '<i8'),
+    ('next_uid', '<u8'),
+    ('rng_seed', '<i8'),  # -1 for an unseeded session
+])
+
+# Entity tables - one record per entity; the columns after the attribute names are bookkeeping
+PLAYER_DTYPE = np.dtype([
+    ('rect', '<i4', (4,)),
+    ('prev_rect', '<i4', (4,)),
+    ('tick_rect', '<i4', (4,)),
+    ('vx', '<f8'),
+    ('vy', '<f8'),
+    ('push_effect_timer', '<i4'),
+    ('shake_offset_x', '<f8'),
+    ('shake_offset_y', '<f8'),
+    ('shake_decay', '<f8'),
+    ('death_timer', '<f8'),
+    ('is_dying', '?'),
+])
+
+WEAPON_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('held', '?'),
+    ('hold_time', '<f8'),
+    ('fire_delay', '<f8'),
+    ('next_shot_time', '<f8'),
+    ('single_shot_used', '?'),
+    ('click_count', '<i4'),
+    ('last_click_time', '<f8'),
+    ('shots_fired', '<i8'),
+])
+
+CIRCLE_DTYPE = np.dtype([
+    ('radius', '<f8'),
+    ('speed', '<f8'),
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('prev_x', '<f8'),
+    ('prev_y', '<f8'),
+    ('dx', '<f8'),
+    ('dy', '<f8'),
+    ('color', 'u1', (3,)),
+    ('lod_period', '<i4'),
+    ('lod_due', '<i8'),
+    ('lod_born', '<i8'),
+    ('lod_serial', '<i8'),
+    ('uid', '<u8'),
+])
+
+PROJECTILE_DTYPE = np.dtype([
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('prev_x', '<f8'),
+    ('prev_y', '<f8'),
+    ('dx', '<f8'),
+    ('dy', '<f8'),
+    ('angle', '<f8'),
+    ('homing_strength', '<f8'),
+    ('color', 'u1', (3,)),
+    ('size', '<f8'),
+    ('uid', '<u8'),
+    ('pending_dt', '<f8'),  # NaN for None (stored apart because of that)
+])
+
+PARTICLE_DTYPE = np.dtype([
+    ('is_persistent', '?'),
+    ('draw_in_front', '?'),
+    ('color', 'u1', (3,)),
+    ('initial_size', '<f8'),
+    ('lifetime', '<f8'),
+    ('spawn_time', '<f8'),
+    ('shrink_duration', '<f8'),
+    ('x0', '<f8'),
+    ('y0', '<f8'),
+    ('dx0', '<f8'),
+    ('dy0', '<f8'),
+    ('motion_time', '<f8'),
+    ('exit_time', '<f8'),
+    ('uid', '<u8'),
+    ('sleeping', '?'),  # Baked into the debris layer rather than in the live list
+    ('expiry_tick', '<i8'),
+    ('settle_tick', '<i8'),  # -1 when not scheduled to settle
+])
+
+EXPLOSION_DTYPE = np.dtype([
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('radius', '<f8'),
+    ('strength', '<f8'),
+    ('lifetime', '<f8'),
+    ('max_lifetime', '<f8'),
+    ('spawn_time', '<f8'),
+    ('uid', '<u8'),
+    ('expiry_tick', '<i8'),
+])
+
+STAR_DTYPE = np.dtype([
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('size', '<f8'),
+    ('color', 'u1', (3,)),
+    ('twinkle_speed', '<f8'),
+    ('twinkle_phase', '<f8'),
+    ('brightness', '<f8'),
+])
+
+CLOUD_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('expiry_time', '<f8')])
+
+# Pending destruction jobs: the next thing to do for a destroyed circle (an index into the 'queued' table)
+JOB_KINDS = ('split', 'particles')
+JOB_DTYPE = np.dtype([('kind', 'u1'), ('circle', '<u4'), ('tick', '<i8')])
+
+
+def attribute_names(dtype, extra=0):
+    """Entity attributes stored in a table (every column but the trailing bookkeeping ones)."""
+    return dtype.names[:len(dtype.names) - extra]
+
+
+CIRCLE_FIELDS = attribute_names(CIRCLE_DTYPE)
+PROJECTILE_FIELDS = attribute_names(PROJECTILE_DTYPE, 1)
+PARTICLE_FIELDS = attribute_names(PARTICLE_DTYPE, 3)
+EXPLOSION_FIELDS = attribute_names(EXPLOSION_DTYPE, 1)
+STAR_FIELDS = attribute_names(STAR_DTYPE)
+WEAPON_FIELDS = attribute_names(WEAPON_DTYPE)
+PLAYER_FIELDS = attribute_names(PLAYER_DTYPE)
+
+
+def pack(objects, dtype, names):
+    """One table row per object, filled a column at a time (bookkeeping columns are left at zero)."""
+    table = np.zeros(len(objects), dtype=dtype)
+    if not objects:
+        return table
+    for name in names:
+        table[name] = list(map(attrgetter(name), objects))
+    return table
+
+
+def unpack(table, names, make):
+    """Set the named attributes on a fresh object per row, a column at a time."""
+    objects = [make() for _ in range(len(table))]
+    for name in names:
+        values = table[name].tolist()
+        if table.dtype[name].shape:
+            values = list(map(tuple, values))  # Colours and rects come back as lists
+        # map() runs the whole column through setattr without a Python-level loop
+        list(map(setattr, objects, repeat(name), values))
+    return objects
+
+
+class SnapshotManager:
+    """Captures and restores the whole world as packed NumPy tables; keeps a quick-save and a rewind history."""
+
+    # A snapshot is a dict of arrays (no object graph), so it copies cheaply and saves as a plain .npz.
+    # Restoring and continuing a seeded session gives the same game as never having left it.
+
+    def __init__(self, interval=SNAPSHOT_REWIND_INTERVAL, capacity=SNAPSHOT_REWIND_CAPACITY):
+        self.interval = interval
+        self.history = deque(maxlen=capacity)  # (tick, snapshot), oldest first
+        self.last_recorded = None  # Tick of the latest rewind snapshot
+        self.quick_save_snapshot = None
+
+        # Statistics
+        self.captures = 0
+        self.restores = 0
+        self.capture_time = 0.0
+        self.restore_time = 0.0
+        self.max_capture_time = 0.0
+        self.max_restore_time = 0.0
+
+    def capture(self, world):
+        """Pack the current world (world is the main module, whose globals hold the game state)."""
+        start = time.perf_counter()
+        expiry_ticks = expiry_scheduler.death_ticks
+        settle_ticks = settle_scheduler.death_ticks
+        seed = rng.seed_value
+
+        header = tuple(getattr(world, name) for name in WORLD_FIELDS) + (
+            world.ui_state.encode(), SNAPSHOT_VERSION, sim_clock.tick, expiry_scheduler.last_tick,
+            settle_scheduler.last_tick, destruction_queue.tick, lod_scheduler.next_serial,
+            entity_ids.next_uid, -1 if seed is None else seed)
+
+        jobs = destruction_queue.jobs()
+        queued = [circle for _, circle, _ in jobs]  # One job per circle: its split, or its burst once split
+
+        # Awake particles in list order, then the debris layer's sleepers in bake order
+        awake, sleepers = world.particles, list(debris_layer.sleeping)
+        particles = pack(awake + sleepers, PARTICLE_DTYPE, PARTICLE_FIELDS)
+        particles['sleeping'][len(awake):] = True
+        particles['expiry_tick'] = [expiry_ticks.get(particle, -1) for particle in awake + sleepers]
+        particles['settle_tick'] = [settle_ticks.get(particle, -1) for particle in awake] + [-1] * len(sleepers)
+
+        projectiles = pack(world.projectiles, PROJECTILE_DTYPE, PROJECTILE_FIELDS)
+        projectiles['pending_dt'] = [math.nan if projectile.pending_dt is None else projectile.pending_dt
+                                     for projectile in world.projectiles]
+
+        explosions = pack(world.explosions, EXPLOSION_DTYPE, EXPLOSION_FIELDS)
+        explosions['expiry_tick'] = [expiry_ticks.get(explosion, -1) for explosion in world.explosions]
+
+        snapshot = {
+            'world': np.array([header], dtype=WORLD_DTYPE),
+            'player': pack([] if world.player is None else [world.player], PLAYER_DTYPE, PLAYER_FIELDS),
+            'weapon': pack([weapon], WEAPON_DTYPE, WEAPON_FIELDS),
+            'circles': pack(world.circles, CIRCLE_DTYPE, CIRCLE_FIELDS),
+            'queued': pack(queued, CIRCLE_DTYPE, CIRCLE_FIELDS),
+            'jobs': np.array([(JOB_KINDS.index(kind), index, tick) for index, (kind, _, tick) in enumerate(jobs)],
+                             dtype=JOB_DTYPE),
+            'projectiles': projectiles,
+            'particles': particles,
+            'explosions': explosions,
+            'stars': pack(world.stars, STAR_DTYPE, STAR_FIELDS),
+            'clouds': np.array([tuple(entry) for entries in cloud_grid.cells.values() for entry in entries],
+                               dtype=CLOUD_DTYPE),
+            'random_state': np.array(random.getstate()[1], dtype=np.uint32),  # Player shake draws
+        }
+        snapshot.update(self.pack_rng())
+        snapshot.update(calculation_cache.get_state())
+
+        elapsed = time.perf_counter() - start
+        self.captures += 1
+        self.capture_time += elapsed
+        self.max_capture_time = max(self.max_capture_time, elapsed)
+        return snapshot
+
+    @staticmethod
+    def pack_rng():
+        """The game's random stream: PCG64 words plus the samples already drawn but not yet used."""
+        state = rng.get_state()
+        generator = state['generator']
+        if generator['bit_generator'] != 'PCG64':
+            raise ValueError(f"Cannot snapshot a {generator['bit_generator']} generator")
+        words = generator['state']
+        mask = (1 << 64) - 1
+        return {
+            'rng_generator': np.array([words['state'] >> 64, words['state'] & mask, words['inc'] >> 64,
+                                       words['inc'] & mask, generator['has_uint32'], generator['uinteger']],
+                                      dtype=np.uint64),
+            'rng_uniform': np.array(state['uniform'], dtype=np.float64),
+            'rng_normal': np.array(state['normal'], dtype=np.float64),
+        }
+
+    def restore(self, world, snapshot):
+        """Replace the current world with a captured one."""
+        start = time.perf_counter()
+        header = snapshot['world'][0]
+        if header['version'] != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {header['version']} does not match {SNAPSHOT_VERSION}")
+
+        # Hand the current entities back to their pools and drop everything that refers to them
+        circle_pool.release_all(world.circles)
+        circle_pool.release_all([circle for _, circle, _ in destruction_queue.jobs()])  # Awaiting their jobs
+        projectile_pool.release_all(world.projectiles)
+        particle_pool.release_all(world.particles)
+        particle_pool.release_all(debris_layer.sleeping)
+        explosion_pool.release_all(world.explosions)
+        expiry_scheduler.clear()
+        debris_layer.clear()  # Clears the settle schedule too
+        cloud_grid.clear()
+        explosion_field.clear()
+        destruction_queue.clear()
+        sound_queue.clear()
+
+        # Clocks and counters
+        values = header.tolist()
+        for name, value in zip(WORLD_FIELDS, values):
+            setattr(world, name, value)
+        world.ui_state = header['ui_state'].decode()
+        world.start_time = time.time() - world.score
+        sim_clock.set_tick(int(header['tick']))
+        expiry_scheduler.last_tick = int(header['expiry_last_tick'])
+        settle_scheduler.last_tick = int(header['settle_last_tick'])
+        destruction_queue.tick = int(header['destruction_tick'])
+        lod_scheduler.next_serial = int(header['lod_next_serial'])
+
+        # Entities
+        circles = unpack(snapshot['circles'], CIRCLE_FIELDS, circle_pool.acquire_blank)
+        queued = unpack(snapshot['queued'], CIRCLE_FIELDS, circle_pool.acquire_blank)
+        for kind, circle, tick in snapshot['jobs'].tolist():
+            destruction_queue.requeue(JOB_KINDS[kind], queued[circle], tick)
+
+        projectile_table = snapshot['projectiles']
+        projectiles = unpack(projectile_table, PROJECTILE_FIELDS, projectile_pool.acquire_blank)
+        for projectile, pending_dt in zip(projectiles, projectile_table['pending_dt'].tolist()):
+            projectile.pending_dt = None if math.isnan(pending_dt) else pending_dt
+
+        particle_table = snapshot['particles']
+        particles, sleepers = [], []
+        for particle, sleeping, expiry_tick, settle_tick in zip(
+                unpack(particle_table, PARTICLE_FIELDS, particle_pool.acquire_blank),
+                particle_table['sleeping'].tolist(), particle_table['expiry_tick'].tolist(),
+                particle_table['settle_tick'].tolist()):
+            if expiry_tick >= 0:
+                expiry_scheduler.schedule_tick(particle, 'particle', expiry_tick)
+            if settle_tick >= 0:
+                settle_scheduler.schedule_tick(particle, 'particle', settle_tick)
+            (sleepers if sleeping else particles).append(particle)
+        debris_layer.lay_down(sleepers)
+
+        explosion_table = snapshot['explosions']
+        explosions = unpack(explosion_table, EXPLOSION_FIELDS, explosion_pool.acquire_blank)
+        for explosion, expiry_tick in zip(explosions, explosion_table['expiry_tick'].tolist()):
+            if expiry_tick >= 0:
+                expiry_scheduler.schedule_tick(explosion, 'explosion', expiry_tick)
+        explosion_field.rebuild(explosions)
+
+        world.stars[:] = unpack(snapshot['stars'], STAR_FIELDS, lambda: Star.__new__(Star))
+        entity_ids.next_uid = int(header['next_uid'])  # After the unpacks, whose blank objects drew ids
+        for x, y, expiry_time in snapshot['clouds'].tolist():
+            key = (int(x // cloud_grid.cell_size), int(y // cloud_grid.cell_size))
+            cloud_grid.cells.setdefault(key, []).append([x, y, expiry_time])
+
+        # The lists are refilled in place, so everything holding them (e.g. the object budget) stays valid
+        world.circles[:] = circles
+        world.projectiles[:] = projectiles
+        world.particles[:] = particles
+        world.explosions[:] = explosions
+        object_budget.limit = world.max_objects
+        object_budget.particles = world.particles
+        object_budget.counts.update(circle=len(circles), projectile=len(projectiles),
+                                    particle=len(particles) + len(sleepers))
+
+        # Player and weapon
+        if len(snapshot['player']):
+            if world.player is None:
+                world.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            player = unpack(snapshot['player'], PLAYER_FIELDS, lambda: world.player)[0]
+            player.rect, player.prev_rect, player.tick_rect = (pygame.Rect(player.rect), pygame.Rect(player.prev_rect),
+                                                               pygame.Rect(player.tick_rect))
+        unpack(snapshot['weapon'], WEAPON_FIELDS, lambda: weapon)
+
+        # Random streams and the pattern pools they fill
+        self.restore_rng(snapshot, None if header['rng_seed'] < 0 else int(header['rng_seed']))
+        random.setstate((3, tuple(snapshot['random_state'].tolist()), None))
+        calculation_cache.set_state({name: array for name, array in snapshot.items() if name.startswith('cache_')})
+
+        elapsed = time.perf_counter() - start
+        self.restores += 1
+        self.restore_time += elapsed
+        self.max_restore_time = max(self.max_restore_time, elapsed)
+
+    @staticmethod
+    def restore_rng(snapshot, seed):
+        """Put the game's random stream back where pack_rng found it."""
+        high_state, low_state, high_inc, low_inc, has_uint32, uinteger = snapshot['rng_generator'].tolist()
+        rng.set_state({
+            'seed': seed,
+            'generator': {'bit_generator': 'PCG64',
+                          'state': {'state': (high_state << 64) | low_state, 'inc': (high_inc << 64) | low_inc},
+                          'has_uint32': has_uint32, 'uinteger': uinteger},
+            'uniform': snapshot['rng_uniform'].tolist(),
+            'normal': snapshot['rng_normal'].tolist(),
+        })
+
+    @staticmethod
+    def save(snapshot, file):
+        """Write a snapshot as an uncompressed .npz (a path or a binary file object)."""
+        np.savez(file, **snapshot)
+
+    @staticmethod
+    def load(file):
+        """Read a snapshot written by save."""
+        with np.load(file) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    def quick_save(self, world):
+        """Keep a snapshot of the current world for quick_load (and write it to disk if enabled)."""
+        self.quick_save_snapshot = self.capture(world)
+        if SNAPSHOT_QUICKSAVE_TO_DISK:
+            self.save(self.quick_save_snapshot, SNAPSHOT_QUICKSAVE_PATH)
+
+    def quick_load(self, world):
+        """Return to the quick-save (or the quick-save file); returns False if there is none."""
+        snapshot = self.quick_save_snapshot
+        if snapshot is None:
+            try:
+                snapshot = self.load(SNAPSHOT_QUICKSAVE_PATH)
+            except OSError:
+                return False
+        self.restore(world, snapshot)
+        self.forget_history()
+        return True
+
+    def record(self, world):
+        """Add a rewind snapshot once every interval ticks (only when SNAPSHOT_REWIND_ENABLED is set)."""
+        if not SNAPSHOT_REWIND_ENABLED:
+            return
+        tick = sim_clock.tick
+        if self.last_recorded is not None and tick - self.last_recorded < self.interval:
+            return
+        self.history.append((tick, self.capture(world)))
+        self.last_recorded = tick
+
+    def rewind(self, world):
+        """Step back to the previous rewind snapshot; returns False if there is none."""
+        # A snapshot taken moments ago would barely move the game - skip to the one before it
+        while self.history and sim_clock.tick - self.history[-1][0] < self.interval // 2:
+            self.history.pop()
+        if not self.history:
+            return False
+        tick, snapshot = self.history[-1]
+        self.restore(world, snapshot)
+        self.last_recorded = tick
+        return True
+
+    def forget_history(self):
+        """Drop the rewind snapshots (e.g. on game reset)."""
+        self.history.clear()
+        self.last_recorded = None
+
+    def report(self):
+        """Report how many snapshots were taken and restored and how long they took."""
+        return {
+            'captures': self.captures,
+            'restores': self.restores,
+            'capture_ms_mean': round(1000 * self.capture_time / self.captures, 2) if self.captures else 0.0,
+            'capture_ms_max': round(1000 * self.max_capture_time, 2),
+            'restore_ms_mean': round(1000 * self.restore_time / self.restores, 2) if self.restores else 0.0,
+            'restore_ms_max': round(1000 * self.max_restore_time, 2),
+            'history': len(self.history),
+        }
+
+
+# Global snapshot manager instance
+world_snapshots = SnapshotManager()
+
+
+if __name__ == "__main__":
+    # Benchmark: capture, restore and .npz size of a seeded scene of about SCENE_ENTITIES entities, plus a
+    # check that a restored session plays on exactly like the uninterrupted one
+    import io
+    import os
+    import hashlib
+    import timeit
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main
+
+    SCENE_ENTITIES = 2000
+
+    def play(ticks, circles_per_tick):
+        """Run the game logic with extra circles streaming in and the player standing still."""
+        for _ in range(ticks):
+            for _ in range(circles_per_tick):
+                if object_budget.grant('circle', 1):
+                    main.circles.append(circle_pool.acquire())
+            main.game_logic(LOGIC_TIMESTEP)
+            main.player.vx = main.player.vy = 0.0
+            main.player.is_dying = False
+
+    def entity_count():
+        """Everything a snapshot packs one row per entity for."""
+        return len(main.circles) + len(destruction_queue.jobs()) + len(main.projectiles) + len(main.particles) + \
+            len(debris_layer) + len(main.explosions) + len(main.stars)
+
+    def fingerprint():
+        """Digest of everything the simulation carries forward."""
+        state = ([(c.x, c.y, c.dx, c.dy, c.radius) for c in main.circles],
+                 [(p.x0, p.y0, p.dx0, p.dy0, p.spawn_time) for p in main.particles],
+                 sorted((p.x0, p.y0) for p in debris_layer.sleeping),
+                 [(e.x, e.y, e.radius) for e in main.explosions],
+                 main.player.rect.topleft, main.circle_hits, sim_clock.tick, rng.random())
+        return hashlib.md5(repr(state).encode()).hexdigest()
+
+    rng.seed(7)
+    calculation_cache.preload_all()
+    main.reset_game()
+    main.stars[:] = [Star(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)) for _ in range(STAR_COUNT)]
+    play(240, 6)  # Build up a crowded scene, which levels off below SCENE_ENTITIES
+    for _ in range(SCENE_ENTITIES - entity_count()):
+        if object_budget.grant('circle', 1):
+            main.circles.append(circle_pool.acquire())
+    queued = len(destruction_queue.jobs())
+    entities = entity_count()
+    snapshot = world_snapshots.capture(main)
+    buffer = io.BytesIO()
+    world_snapshots.save(snapshot, buffer)
+    print(f"scene: {len(main.circles)} circles (+{queued} still being destroyed), {len(main.particles)} particles, "
+          f"{len(debris_layer)} debris, {len(main.explosions)} explosions, {len(main.stars)} stars "
+          f"= {entities} entities (target {SCENE_ENTITIES}); .npz {buffer.tell() / 1024:.0f} KiB")
+
+    capture_time = min(timeit.repeat(lambda: world_snapshots.capture(main), number=10, repeat=5)) / 10
+    restore_time = min(timeit.repeat(lambda: world_snapshots.restore(main, snapshot), number=10, repeat=5)) / 10
+    buffer.seek(0)
+    load_time = timeit.timeit(lambda: (buffer.seek(0), world_snapshots.load(buffer)), number=10) / 10
+    print(f"capture {capture_time * 1000:.2f} ms, restore {restore_time * 1000:.2f} ms, "
+          f"load from .npz {load_time * 1000:.2f} ms")
+
+    # Determinism: play on, then go back (through the file format) and play the same ticks again
+    world_snapshots.restore(main, snapshot)
+    play(200, 2)
+    uninterrupted = fingerprint()
+    buffer.seek(0)
+    world_snapshots.restore(main, world_snapshots.load(buffer))
+    play(200, 2)
+    print(f"restored session matches: {fingerprint() == uninterrupted}")
+
+    def circles_out():
+        """Circles handed out by the pool and not yet given back."""
+        return circle_pool.created + circle_pool.reused - circle_pool.released
+
+    # Restoring over and over must hand back everything the last restore handed out
+    circle_pool.max_free = 10 ** 6  # Count every release (a full free list drops instances without counting)
+    world_snapshots.restore(main, snapshot)
+    before = circles_out()
+    for _ in range(20):
+        world_snapshots.restore(main, snapshot)
+    print(f"circles out of the pool after 20 more restores: {before} -> {circles_out()}")
@@ -1,11 +1,12 @@
 # made by SSJMarx with the help of GLM 4.6
 
 import pygame
+import math
 import numpy as np
 from constants import *
 
-# Initialize pygame mixer
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+# Initialize pygame mixer (mono - every generated sound is identical on both sides anyway)
+pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
 
 class SoundManager:
     """Manages all game sounds using procedural generation."""
@@ -14,17 +15,34 @@ class SoundManager:
         self.sounds = {}
         self.enabled = True
         self.volume = 0.5
+        self.explosion_bank = None
         self.generate_all_sounds()
     
+    @staticmethod
+    def to_int16(arr):
+        """Convert a float buffer in the -1 to 1 range into mono int16 samples."""
+        return (arr * 32767).astype(np.int16)
+    
+    def to_sound(self, arr):
+        """Turn a mono float buffer into a pygame Sound matching the mixer layout."""
+        return self.samples_to_sound(self.to_int16(arr))
+    
+    @staticmethod
+    def samples_to_sound(samples):
+        """Turn mono int16 samples into a pygame Sound matching the mixer layout."""
+        mixer_channels = pygame.mixer.get_init()[2]
+        if mixer_channels > 1:
+            # Mixer fell back to a multi-channel layout; duplicate only at the last step
+            samples = np.repeat(samples.reshape(len(samples), 1), mixer_channels, axis=1)
+        return pygame.sndarray.make_sound(samples)
+    
     def generate_tone(self, frequency, duration, sample_rate=22050, volume=0.5):
         """Generate a simple sine wave tone."""
         frames = int(duration * sample_rate)
         arr = np.zeros(frames)
         for i in range(frames):
             arr[i] = volume * np.sin(2 * np.pi * frequency * i / sample_rate)
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(frames, 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return self.to_sound(arr)
     
     def generate_blip(self, frequency, duration, sample_rate=22050, volume=0.5):
         """Generate a blip sound with envelope."""
@@ -41,24 +59,19 @@ class SoundManager:
             
             arr[i] = volume * envelope * np.sin(2 * np.pi * frequency * i / sample_rate)
         
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(frames, 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return self.to_sound(arr)
     
-    def generate_explosion(self, duration, sample_rate=22050, volume=0.5):
-        """Generate a very bassy explosion sound like a bass drum with long reverb."""
+    def synthesize_explosion(self, duration, sample_rate=22050, volume=0.5):
+        """Synthesize the bassy explosion waveform as a mono float buffer."""
         frames = int(duration * sample_rate)
-        arr = np.zeros(frames)
+        i = np.arange(frames)
         
-        # Main bass drum hit - very low frequency thump
-        for i in range(frames):
-            # Primary bass frequency (around 60-80 Hz for deep bass drum)
-            bass_freq = 60 + (80 - 60) * (1 - i / frames)  # Slight pitch drop
-            arr[i] += volume * 0.8 * np.sin(2 * np.pi * bass_freq * i / sample_rate)
+        # Main bass drum hit - very low frequency thump (60-80 Hz with slight pitch drop)
+        bass_freq = 60 + (80 - 60) * (1 - i / frames)
+        arr = volume * 0.8 * np.sin(2 * np.pi * bass_freq * i / sample_rate)
         
         # Add sub-bass rumble (30-40 Hz range)
-        for i in range(frames):
-            arr[i] += volume * 0.4 * np.sin(2 * np.pi * 35 * i / sample_rate)
+        arr += volume * 0.4 * np.sin(2 * np.pi * 35 * i / sample_rate)
         
         # Long reverb tail - multiple delayed low frequencies
         reverb_delays = [0.05, 0.08, 0.12, 0.18]  # Delays in seconds
@@ -67,33 +80,28 @@ class SoundManager:
         for delay, gain in zip(reverb_delays, reverb_gains):
             delay_frames = int(delay * sample_rate)
             if delay_frames < frames:
-                for i in range(delay_frames, frames):
-                    # Reverb with lower frequencies
-                    reverb_freq = 50 + np.random.uniform(-10, 10)  # Slight frequency variation
-                    arr[i] += gain * volume * 0.3 * np.sin(2 * np.pi * reverb_freq * (i - delay_frames) / sample_rate)
-                    arr[i] *= np.exp(-0.5 * (i - delay_frames) / (frames - delay_frames))  # Reverb decay
+                offset = i[delay_frames:] - delay_frames
+                # Reverb with lower frequencies and slight per-sample frequency variation
+                reverb_freq = 50 + np.random.uniform(-10, 10, frames - delay_frames)
+                arr[delay_frames:] += gain * volume * 0.3 * np.sin(2 * np.pi * reverb_freq * offset / sample_rate)
+                arr[delay_frames:] *= np.exp(-0.5 * offset / (frames - delay_frames))  # Reverb decay
         
-        # Apply envelope - slow attack, long decay for drum feel
-        for i in range(frames):
-            # Quick attack like a drum hit
-            if i < frames * 0.02:  # First 2% - attack
-                envelope = i / (frames * 0.02)
-            else:
-                # Long decay with reverb tail
-                decay_progress = (i - frames * 0.02) / (frames * 0.98)
-                envelope = np.exp(-1.5 * decay_progress)  # Slower decay for longer sustain
-            arr[i] *= envelope
+        # Apply envelope - quick attack like a drum hit, long decay with reverb tail
+        attack_frames = frames * 0.02
+        envelope = np.where(i < attack_frames,
+                            i / attack_frames,
+                            np.exp(-1.5 * (i - attack_frames) / (frames * 0.98)))
+        arr *= envelope
         
         # Add subtle noise for texture
         noise = np.random.normal(0, volume * 0.1, frames)
-        for i in range(frames):
-            noise_envelope = np.exp(-3 * i / frames)  # Quick noise decay
-            arr[i] += noise[i] * noise_envelope
+        arr += noise * np.exp(-3 * i / frames)  # Quick noise decay
         
-        arr = np.clip(arr, -1, 1)
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(frames, 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return np.clip(arr, -1, 1)
+    
+    def generate_explosion(self, duration, sample_rate=22050, volume=0.5):
+        """Generate a very bassy explosion sound like a bass drum with long reverb."""
+        return self.to_sound(self.synthesize_explosion(duration, sample_rate, volume))
     
     def generate_missile_hiss(self, duration, sample_rate=22050, volume=0.5):
         """Generate a hissy missile launch sound that fades out."""
@@ -120,9 +128,7 @@ class SoundManager:
             arr[i] += 0.2 * volume * np.sin(2 * np.pi * 80 * i / sample_rate) * np.exp(-4 * i / frames)
         
         arr = np.clip(arr, -1, 1)
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(frames, 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return self.to_sound(arr)
     
     def generate_sweep(self, start_freq, end_freq, duration, sample_rate=22050, volume=0.5):
         """Generate a frequency sweep sound."""
@@ -135,9 +141,7 @@ class SoundManager:
             freq = start_freq * (end_freq / start_freq) ** t
             arr[i] = volume * np.sin(2 * np.pi * freq * i / sample_rate)
         
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(frames, 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return self.to_sound(arr)
     
     def generate_double_beep(self, frequency1, frequency2, duration, sample_rate=22050, volume=0.5):
         """Generate a double beep effect."""
@@ -161,9 +165,7 @@ class SoundManager:
         
         # Combine
         arr = np.concatenate([arr1, gap, arr2])
-        arr = (arr * 32767).astype(np.int16)
-        arr = np.repeat(arr.reshape(len(arr), 1), 2, axis=1)
-        return pygame.sndarray.make_sound(arr)
+        return self.to_sound(arr)
     
     def generate_all_sounds(self):
         """Generate all game sounds."""
@@ -176,10 +178,9 @@ class SoundManager:
         # Projectile hit - medium pitch blip
         self.sounds['hit'] = self.generate_blip(330, 0.1, volume=0.4)
         
-        # Circle explosions - different sizes for performance
-        self.sounds['explosion_small'] = self.generate_explosion(0.2, volume=0.5)
-        self.sounds['explosion_medium'] = self.generate_explosion(0.3, volume=0.7)
-        self.sounds['explosion_large'] = self.generate_explosion(0.4, volume=0.9)
+        # Circle explosions - bank of size and pitch variants
+        self.explosion_bank = ExplosionSoundBank(self)
+        self.explosion_bank.build()
         
         # Player death - descending tone
         self.sounds['death'] = self.generate_sweep(880, 110, 0.5, volume=0.6)
@@ -188,24 +189,15 @@ class SoundManager:
         self.sounds['collision'] = self.generate_double_beep(440, 220, 0.15, volume=0.4)
         
         # Set volume for all sounds
-        for sound in self.sounds.values():
-            sound.set_volume(self.volume)
+        self.set_volume(self.volume)
     
     def play_sized_explosion(self, size_factor):
         """Play explosion sound with size-based parameters using pre-generated sounds."""
         if not self.enabled:
             return
         
-        # Use pre-generated explosion sounds with size-based selection
-        if size_factor < 0.33:
-            # Small explosion
-            self.sounds['explosion_small'].play()
-        elif size_factor < 0.67:
-            # Medium explosion
-            self.sounds['explosion_medium'].play()
-        else:
-            # Large explosion
-            self.sounds['explosion_large'].play()
+        # Nearest pre-generated variant, no synthesis at runtime
+        self.explosion_bank.select(size_factor).play()
     
     def play(self, sound_name):
         """Play a sound by name."""
@@ -217,11 +209,178 @@ class SoundManager:
         self.volume = max(0.0, min(1.0, volume))
         for sound in self.sounds.values():
             sound.set_volume(self.volume)
+        if self.explosion_bank is not None:
+            self.explosion_bank.set_volume(self.volume)
     
     def toggle(self):
         """Toggle sound on/off."""
         self.enabled = not self.enabled
         return self.enabled
+    
+    def memory_report(self):
+        """Report the sample memory held by each sound bank."""
+        sample_rate, _, channels = pygame.mixer.get_init()
+        effect_bytes = sum(int(sound.get_length() * sample_rate) * channels * 2 for sound in self.sounds.values())
+        return {
+            'effects': {'variants': len(self.sounds), 'bytes': effect_bytes},
+            'explosions': self.explosion_bank.memory_report(),
+        }
+
+
+class ExplosionSoundBank:
+    """Pre-generated explosion variants across the size range, with pitch-shifted copies."""
+    
+    def __init__(self, manager, size_steps=SOUND_BANK_SIZE_STEPS, pitch_factors=SOUND_BANK_PITCH_FACTORS):
+        self.manager = manager
+        self.size_steps = size_steps
+        self.pitch_factors = pitch_factors
+        self.variants = []  # variants[size_index][pitch_index] -> Sound
+        self.variant_bytes = {}  # Key: (size_index, pitch_index), Value: mono int16 byte count
+        self.resample_cache = {}  # Key: (size_index, pitch_factor), Value: mono int16 buffer
+        self.next_pitch = 0  # Round-robin pitch selection
+    
+    def resample(self, size_index, base, pitch_factor):
+        """Pitch-shift a mono buffer by resampling it (cached per size and pitch)."""
+        key = (size_index, pitch_factor)
+        cached = self.resample_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if pitch_factor == 1.0:
+            shifted = base
+        else:
+            # Reading the buffer faster raises the pitch and shortens it
+            new_length = max(1, int(len(base) / pitch_factor))
+            positions = np.arange(new_length) * pitch_factor
+            shifted = np.interp(positions, np.arange(len(base)), base).astype(np.int16)
+        
+        self.resample_cache[key] = shifted
+        return shifted
+    
+    def build(self):
+        """Synthesize every size step once and derive its pitch variants."""
+        self.variants = []
+        for size_index in range(self.size_steps):
+            # Interpolate duration and volume between the old small and large explosions
+            t = size_index / max(1, self.size_steps - 1)
+            duration = 0.2 + (0.4 - 0.2) * t
+            volume = 0.5 + (0.9 - 0.5) * t
+            base = self.manager.to_int16(self.manager.synthesize_explosion(duration, volume=volume))
+            
+            row = []
+            for pitch_index, pitch_factor in enumerate(self.pitch_factors):
+                samples = self.resample(size_index, base, pitch_factor)
+                self.variant_bytes[(size_index, pitch_index)] = samples.nbytes
+                row.append(self.manager.samples_to_sound(samples))
+            self.variants.append(row)
+        
+        # Buffers are only needed while building; the Sounds own their own copies
+        self.resample_cache.clear()
+    
+    def select(self, size_factor):
+        """Pick the nearest pre-generated variant in constant time."""
+        ratio = max(0.0, min(1.0, size_factor / SOUND_BANK_MAX_SIZE))
+        size_index = int(ratio * (self.size_steps - 1) + 0.5)
+        pitch_index = self.next_pitch
+        self.next_pitch = (self.next_pitch + 1) % len(self.pitch_factors)
+        return self.variants[size_index][pitch_index]
+    
+    def all_sounds(self):
+        """Iterate over every variant in the bank."""
+        for row in self.variants:
+            for sound in row:
+                yield sound
+    
+    def active_voices(self):
+        """Count mixer channels currently playing any explosion variant."""
+        return sum(sound.get_num_channels() for sound in self.all_sounds())
+    
+    def set_volume(self, volume):
+        """Set volume for every variant."""
+        for sound in self.all_sounds():
+            sound.set_volume(volume)
+    
+    def memory_report(self):
+        """Report variant count and sample memory for this bank."""
+        total_bytes = sum(self.variant_bytes.values())
+        return {
+            'variants': len(self.variant_bytes),
+            'bytes': total_bytes,
+            'stereo_equivalent_bytes': total_bytes * 2,
+            'largest_variant_bytes': max(self.variant_bytes.values(), default=0),
+        }
+
+
+class SoundEventQueue:
+    """Collects sound requests during a logic tick and plays them once per tick."""
+    
+    def __init__(self, manager):
+        self.manager = manager
+        self.pending = {}  # Key: event kind, Value: [count, largest size factor]
+        self.last_flush_count = 0  # Sounds actually started by the last flush
+        self.merged_events = 0  # Total requests folded into another event
+        self.dropped_events = 0  # Total events skipped by priority or voice caps
+    
+    def push(self, kind, size_factor=0.0):
+        """Queue a sound event for this tick, merging it with same-kind events."""
+        entry = self.pending.get(kind)
+        if entry is None:
+            self.pending[kind] = [1, size_factor]
+        else:
+            entry[0] += 1
+            entry[1] = max(entry[1], size_factor)
+            self.merged_events += 1
+    
+    def push_explosion(self, size_factor):
+        """Queue an explosion sound with a size factor (0-1 range)."""
+        self.push('explosion', size_factor)
+    
+    def active_voices(self, kind):
+        """Count the mixer channels currently playing sounds of this kind."""
+        if kind == 'explosion':
+            return self.manager.explosion_bank.active_voices()
+        sound = self.manager.sounds.get(kind)
+        return sound.get_num_channels() if sound is not None else 0
+    
+    def flush(self):
+        """Play the queued events in priority order, then clear the queue."""
+        self.last_flush_count = 0
+        if not self.pending:
+            return
+        
+        # Highest priority first; unknown kinds go last
+        events = sorted(self.pending.items(), key=lambda item: SOUND_PRIORITIES.get(item[0], 0), reverse=True)
+        self.pending = {}
+        
+        if not self.manager.enabled:
+            return
+        
+        for kind, (count, size_factor) in events:
+            if self.last_flush_count >= SOUND_MAX_EVENTS_PER_TICK:
+                self.dropped_events += 1
+                continue
+            
+            # Respect the per-sound voice cap instead of stealing channels
+            if self.active_voices(kind) >= SOUND_VOICE_CAPS.get(kind, 1):
+                self.dropped_events += 1
+                continue
+            
+            if kind == 'explosion':
+                # Merged explosions play as one larger variant
+                if count > 1:
+                    size_factor *= 1.0 + SOUND_MERGE_SIZE_BOOST * math.log2(count)
+                self.manager.play_sized_explosion(size_factor)
+            else:
+                self.manager.play(kind)
+            self.last_flush_count += 1
+    
+    def clear(self):
+        """Drop all pending events without playing them."""
+        self.pending = {}
+
 
 # Global sound manager instance
 sound_manager = SoundManager()
+
+# Global per-tick sound event queue
+sound_queue = SoundEventQueue(sound_manager)
@@ -0,0 +1,582 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import sys
+import math
+import time
+import zlib
+import socket
+import struct
+from operator import attrgetter
+import numpy as np
+from constants import *
+from timing import sim_clock
+from tracelog import KIND_PLAYER, KIND_CIRCLE, KIND_PROJECTILE, KIND_PARTICLE, KIND_DEBRIS
+
+# Wire format: every message is a little-endian u4 length followed by a zlib-compressed payload of
+# header, removed ids, spawn records, then the moved entities as three columns (id gaps, x deltas, y deltas)
+HEADER_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('keyframe', 'u1'),  # 1 - forget every entity before applying this message
+    ('game_over', 'u1'),
+    ('score', '<f4'),
+    ('circle_hits', '<u4'),
+    ('removed', '<u4'),
+    ('spawned', '<u4'),
+    ('moved', '<u4'),
+])
+
+# Everything about an entity that does not change after it spawns, plus its first position
+SPAWN_DTYPE = np.dtype([
+    ('uid', '<u4'),
+    ('kind', 'u1'),
+    ('flags', 'u1'),  # Particles: 1 persistent, 2 drawn in front
+    ('color', 'u1', (3,)),
+    ('x', '<i2'),  # Quantized positions, in SPECTATOR_POSITION_QUANTUM steps
+    ('y', '<i2'),
+    ('size', '<u2'),  # Radius (circles), size (projectiles) or initial size (particles), quantized the same way
+    ('angle', '<i2'),  # Projectiles: radians * 10000
+    ('age', '<u2'),  # Particles: ticks since they spawned
+])
+
+LENGTH = struct.Struct('<I')
+FULL_STATE_BYTES = 36  # Per entity when sent whole: uid, kind, flags, color, then x, y and size as f8
+POSITION_LIMIT = 16383  # Quantized positions are clipped to this, so every delta fits in an i2
+ANGLE_SCALE = 10000.0
+FLAG_PERSISTENT = 1
+FLAG_FRONT = 2
+
+
+def spectator_address():
+    """Socket address from the constants: a Unix socket path when one is set, otherwise host and port."""
+    if SPECTATOR_UNIX_PATH and hasattr(socket, 'AF_UNIX'):
+        return SPECTATOR_UNIX_PATH
+    return SPECTATOR_HOST, SPECTATOR_PORT
+
+
+def open_socket(address):
+    """A stream socket of the family matching the address."""
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    return socket.socket(family, socket.SOCK_STREAM)
+
+
+def quantize(values):
+    """Positions or sizes in pixels to SPECTATOR_POSITION_QUANTUM steps."""
+    return np.clip(np.rint(np.asarray(values) / SPECTATOR_POSITION_QUANTUM), -POSITION_LIMIT, POSITION_LIMIT
+                   ).astype(np.int32)
+
+
+class Subscriber:
+    """One connected spectator and the bytes it has not taken yet."""
+
+    __slots__ = ('sock', 'backlog', 'synced')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.backlog = bytearray()
+        self.synced = False  # Gets a keyframe before any delta
+
+
+class SpectatorServer:
+    """Publishes per-tick world deltas (spawned and removed ids, quantized moves) to spectators on a local socket."""
+
+    def __init__(self):
+        self.enabled = False
+        self.listener = None
+        self.address = None
+        self.subscribers = []
+
+        # What every synced subscriber holds: ids sorted, with their last sent quantized positions
+        self.known_uids = np.empty(0, np.uint32)
+        self.known_x = np.empty(0, np.int32)
+        self.known_y = np.empty(0, np.int32)
+
+        # Statistics
+        self.ticks_published = 0
+        self.bytes_sent = 0  # Compressed, as written to the sockets
+        self.delta_bytes = 0  # Delta payloads before compression
+        self.full_bytes = 0  # What sending every entity's full float state would have taken
+        self.keyframes = 0
+        self.dropped_subscribers = 0  # Fell more than SPECTATOR_MAX_BACKLOG behind
+        self.publish_time = 0.0
+
+    def start(self, address=None):
+        """Listen for spectators (only when SPECTATOR_ENABLED is set, unless an address is given)."""
+        if self.enabled or (address is None and not SPECTATOR_ENABLED):
+            return
+        address = spectator_address() if address is None else address
+        self.listener = open_socket(address)
+        if not isinstance(address, str):
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.enabled = True
+
+    def stop(self):
+        """Disconnect every spectator and stop listening."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for subscriber in self.subscribers:
+            subscriber.sock.close()
+        self.subscribers = []
+        self.listener.close()
+        self.listener = None
+        if isinstance(self.address, str):
+            import os
+            os.unlink(self.address)
+
+    def accept(self):
+        """Take in spectators that connected since the last tick."""
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            if sock.family != getattr(socket, 'AF_UNIX', None):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.subscribers.append(Subscriber(sock))
+
+    def gather(self, player, circles, projectiles, particles, sleepers):
+        """Ids, kinds and quantized positions of every drawn entity, as arrays in list order."""
+        groups = (circles, projectiles, particles, sleepers)
+        head = [] if player is None else [player]
+        objects = head + circles + projectiles + particles + sleepers
+        kinds = np.repeat(np.array([KIND_PLAYER, KIND_CIRCLE, KIND_PROJECTILE, KIND_PARTICLE, KIND_DEBRIS], np.uint8),
+                          [len(head)] + [len(group) for group in groups])
+        uids = np.array([0] * len(head) + list(map(attrgetter('uid'), objects[len(head):])), np.uint32)
+
+        x = np.empty(len(objects))
+        y = np.empty(len(objects))
+        if player is not None:
+            x[0], y[0] = player.rect.center
+        end = len(head) + len(circles) + len(projectiles)
+        x[len(head):end] = list(map(attrgetter('x'), objects[len(head):end]))
+        y[len(head):end] = list(map(attrgetter('y'), objects[len(head):end]))
+        moving = particles + sleepers
+        if moving:
+            # Same closed form as Particle.position_at
+            x0, y0, dx0, dy0, motion_time = (np.array(list(map(attrgetter(name), moving)))
+                                             for name in ('x0', 'y0', 'dx0', 'dy0', 'motion_time'))
+            travelled = (1.0 - PARTICLE_FRICTION ** (np.maximum(0.0, sim_clock.now - motion_time) / LOGIC_TIMESTEP)
+                         ) * PARTICLE_GLIDE_FACTOR
+            x[end:] = x0 + dx0 * travelled
+            y[end:] = y0 + dy0 * travelled
+        return objects, kinds, uids, quantize(x), quantize(y)
+
+    @staticmethod
+    def spawn_records(objects, kinds, uids, qx, qy, rows, tick):
+        """Spawn records for the given rows of the gathered arrays."""
+        records = np.zeros(len(rows), SPAWN_DTYPE)
+        if not len(rows):
+            return records
+        values = []
+        for row in rows.tolist():
+            entity, kind = objects[row], kinds[row]
+            flags = size = angle = age = 0
+            if kind == KIND_CIRCLE:
+                size = entity.radius
+            elif kind == KIND_PROJECTILE:
+                size, angle = entity.size, entity.angle
+            elif kind != KIND_PLAYER:
+                flags = FLAG_PERSISTENT * entity.is_persistent + FLAG_FRONT * entity.draw_in_front
+                size = entity.initial_size
+                age = round(tick - entity.spawn_time / LOGIC_TIMESTEP)
+            values.append((uids[row], kind, flags, entity.color, qx[row], qy[row],
+                           max(0, round(size / SPECTATOR_POSITION_QUANTUM)), round(angle * ANGLE_SCALE),
+                           min(age, 65535)))
+        records[:] = values
+        return records
+
+    @staticmethod
+    def encode(header, removed, spawned, gaps, dx, dy):
+        """Frame one message; returns the framed bytes and the payload size before compression."""
+        payload = b''.join((header.tobytes(), removed.tobytes(), spawned.tobytes(),
+                            gaps.tobytes(), dx.tobytes(), dy.tobytes()))
+        compressed = zlib.compress(payload, SPECTATOR_COMPRESSION_LEVEL)
+        return LENGTH.pack(len(compressed)) + compressed, len(payload)
+
+    def publish(self, tick, player, circles, projectiles, particles, game_over, score, circle_hits):
+        """Send this tick's changes to every spectator (a keyframe to the ones that just joined)."""
+        if not self.enabled:
+            return
+        self.accept()
+        if not self.subscribers:
+            # Nobody to stay in step with - whoever connects next starts from a keyframe
+            self.known_uids = self.known_uids[:0]
+            return
+        start_time = time.perf_counter()
+        from debris import debris_layer
+        objects, kinds, uids, qx, qy = self.gather(player, circles, projectiles, particles,
+                                                   list(debris_layer.sleeping))
+
+        # Match against what the spectators already hold
+        order = np.argsort(uids, kind='stable')
+        uids_sorted, qx_sorted, qy_sorted = uids[order], qx[order], qy[order]
+        known = self.known_uids
+        if len(known):
+            slot = np.minimum(np.searchsorted(known, uids_sorted), len(known) - 1)
+            found = known[slot] == uids_sorted
+        else:
+            slot = np.zeros(len(uids_sorted), np.intp)
+            found = np.zeros(len(uids_sorted), bool)
+        removed = known[~np.isin(known, uids_sorted, assume_unique=True)]
+        moved = found & ((qx_sorted != self.known_x[slot]) | (qy_sorted != self.known_y[slot])) if len(known) \
+            else found
+        moved_uids = uids_sorted[moved]
+        gaps = np.diff(moved_uids, prepend=np.uint32(0)).astype(np.uint32)
+        dx = (qx_sorted[moved] - self.known_x[slot[moved]]).astype(np.int16)
+        dy = (qy_sorted[moved] - self.known_y[slot[moved]]).astype(np.int16)
+        spawned = self.spawn_records(objects, kinds, uids, qx, qy, order[~found], tick)
+        self.known_uids, self.known_x, self.known_y = uids_sorted, qx_sorted, qy_sorted
+
+        header = np.array([(tick, 0, game_over, score, circle_hits, len(removed), len(spawned), len(moved_uids))],
+                          HEADER_DTYPE)
+        delta, delta_size = self.encode(header, removed, spawned, gaps, dx, dy)
+        keyframe = None
+        for subscriber in list(self.subscribers):
+            if subscriber.synced:
+                message = delta
+            else:
+                if keyframe is None:
+                    header['keyframe'] = 1
+                    header['removed'] = header['moved'] = 0
+                    header['spawned'] = len(objects)
+                    everything = self.spawn_records(objects, kinds, uids, qx, qy, order, tick)
+                    keyframe, _ = self.encode(header, removed[:0], everything, gaps[:0], dx[:0], dy[:0])
+                    self.keyframes += 1
+                message = keyframe
+                subscriber.synced = True
+            subscriber.backlog += message
+            self.bytes_sent += len(message)
+            self.send(subscriber)
+
+        self.ticks_published += 1
+        self.delta_bytes += delta_size
+        self.full_bytes += len(objects) * FULL_STATE_BYTES
+        self.publish_time += time.perf_counter() - start_time
+
+    def send(self, subscriber):
+        """Write as much of a spectator's backlog as its socket takes without blocking."""
+        try:
+            sent = subscriber.sock.send(subscriber.backlog)
+            del subscriber.backlog[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self.drop(subscriber)
+            return
+        if len(subscriber.backlog) > SPECTATOR_MAX_BACKLOG:
+            self.dropped_subscribers += 1  # Too slow to keep up; it can reconnect for a fresh keyframe
+            self.drop(subscriber)
+
+    def drop(self, subscriber):
+        """Disconnect a spectator."""
+        subscriber.sock.close()
+        self.subscribers.remove(subscriber)
+
+    def report(self):
+        """Report bandwidth and cost per published tick."""
+        ticks = self.ticks_published
+        return {'subscribers': len(self.subscribers), 'ticks': ticks, 'keyframes': self.keyframes,
+                'kb_per_tick': round(self.bytes_sent / ticks / 1024, 2) if ticks else 0.0,
+                'vs_full_state_pct': round(100.0 * self.bytes_sent / self.full_bytes, 1) if self.full_bytes else 0.0,
+                'publish_ms': round(1000 * self.publish_time / ticks, 3) if ticks else 0.0,
+                'dropped_subscribers': self.dropped_subscribers}
+
+
+class SpectatorClient:
+    """Rebuilds the world from a spectator stream as entities the game's own draw code can draw."""
+
+    def __init__(self):
+        self.sock = None
+        self.connected = False
+        self.buffer = bytearray()
+        self.entities = {}  # Key: uid, Value: [kind, entity, quantized x, quantized y]
+        self.player = None
+        self.circles = []
+        self.projectiles = []
+        self.particles = []
+        self.tick = 0
+        self.tick_time = 0.0  # perf_counter when the latest tick arrived
+        self.game_over = False
+        self.score = 0.0
+        self.circle_hits = 0
+
+        # Statistics
+        self.ticks_applied = 0
+        self.bytes_received = 0
+        self.apply_time = 0.0
+
+    def connect(self, address=None):
+        """Connect to a spectator server (the address from the constants by default)."""
+        address = spectator_address() if address is None else address
+        self.sock = open_socket(address)
+        self.sock.connect(address)
+        self.sock.setblocking(False)
+        self.connected = True
+
+    def poll(self):
+        """Apply every complete message that has arrived; returns how many ticks were applied."""
+        while self.connected:
+            try:
+                data = self.sock.recv(1 << 20)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                self.connected = False
+                break
+            self.buffer += data
+            self.bytes_received += len(data)
+
+        applied = 0
+        offset = 0
+        buffer = self.buffer
+        while len(buffer) - offset >= LENGTH.size:
+            (size,) = LENGTH.unpack_from(buffer, offset)
+            if len(buffer) - offset - LENGTH.size < size:
+                break
+            start = offset + LENGTH.size
+            self.apply(zlib.decompress(buffer[start:start + size]))
+            offset = start + size
+            applied += 1
+        del buffer[:offset]
+        return applied
+
+    def spawn(self, record):
+        """Create the drawable entity for a spawn record."""
+        from player import Player
+        from entities import Circle
+        from projectiles import Projectile
+        from effects import Particle
+        kind = int(record['kind'])
+        x = int(record['x']) * SPECTATOR_POSITION_QUANTUM
+        y = int(record['y']) * SPECTATOR_POSITION_QUANTUM
+        size = int(record['size']) * SPECTATOR_POSITION_QUANTUM
+        color = tuple(record['color'].tolist())
+        if kind == KIND_PLAYER:
+            entity = Player(0, 0)
+            entity.rect.center = (x, y)
+            entity.prev_rect = entity.rect.copy()
+            entity.color = color
+            self.player = entity
+        elif kind in (KIND_CIRCLE, KIND_PROJECTILE):
+            entity = (Circle if kind == KIND_CIRCLE else Projectile).__new__(Circle if kind == KIND_CIRCLE
+                                                                             else Projectile)
+            entity.prev_x = entity.x = x
+            entity.prev_y = entity.y = y
+            entity.color = color
+            if kind == KIND_CIRCLE:
+                entity.radius = size
+            else:
+                entity.size = size
+                entity.angle = int(record['angle']) / ANGLE_SCALE
+        else:
+            entity = Particle.__new__(Particle)
+            flags = int(record['flags'])
+            entity.is_persistent = bool(flags & FLAG_PERSISTENT)
+            entity.draw_in_front = bool(flags & FLAG_FRONT)
+            entity.color = color
+            entity.initial_size = size
+            entity.lifetime = PERSISTENT_PARTICLE_LIFETIME if entity.is_persistent else 1.0
+            entity.shrink_duration = 0.5
+            entity.spawn_time = entity.motion_time = (self.tick - int(record['age'])) * LOGIC_TIMESTEP
+            entity.x0, entity.y0 = x, y
+            entity.dx0 = entity.dy0 = 0.0  # Moves only when the stream says so
+        self.entities[int(record['uid'])] = [kind, entity, int(record['x']), int(record['y'])]
+
+    def move(self, state, x, y):
+        """Put an entity at a new position; circles and projectiles keep the old one to interpolate from."""
+        kind, entity = state[0], state[1]
+        if kind == KIND_PLAYER:
+            entity.rect.center = (x, y)
+        elif kind == KIND_CIRCLE:
+            entity.x, entity.y = x, y
+        elif kind == KIND_PROJECTILE:
+            entity.x, entity.y = x, y
+            entity.angle = math.atan2(y - entity.prev_y, x - entity.prev_x)
+        else:
+            entity.x0, entity.y0 = x, y
+
+    def apply(self, payload):
+        """Apply one decompressed message."""
+        start_time = time.perf_counter()
+        header = np.frombuffer(payload, HEADER_DTYPE, 1)[0]
+        offset = HEADER_DTYPE.itemsize
+        removed = np.frombuffer(payload, '<u4', int(header['removed']), offset)
+        offset += removed.nbytes
+        spawned = np.frombuffer(payload, SPAWN_DTYPE, int(header['spawned']), offset)
+        offset += spawned.nbytes
+        count = int(header['moved'])
+        gaps = np.frombuffer(payload, '<u4', count, offset)
+        dx = np.frombuffer(payload, '<i2', count, offset + 4 * count)
+        dy = np.frombuffer(payload, '<i2', count, offset + 6 * count)
+
+        self.tick = int(header['tick'])
+        self.tick_time = time.perf_counter()
+        self.game_over = bool(header['game_over'])
+        self.score = float(header['score'])
+        self.circle_hits = int(header['circle_hits'])
+        if header['keyframe']:
+            self.entities.clear()
+            self.player = None
+
+        # The previous tick's positions are what this tick interpolates from
+        for circle in self.circles:
+            circle.prev_x, circle.prev_y = circle.x, circle.y
+        for projectile in self.projectiles:
+            projectile.prev_x, projectile.prev_y = projectile.x, projectile.y
+        if self.player is not None:
+            self.player.prev_rect = self.player.rect.copy()
+
+        entities = self.entities
+        for uid in removed.tolist():
+            state = entities.pop(uid, None)
+            if state is not None and state[0] == KIND_PLAYER:
+                self.player = None
+        for record in spawned:
+            self.spawn(record)
+        quantum = SPECTATOR_POSITION_QUANTUM
+        for uid, step_x, step_y in zip(np.cumsum(gaps, dtype=np.uint32).tolist(), dx.tolist(), dy.tolist()):
+            state = entities[uid]
+            state[2] += step_x
+            state[3] += step_y
+            self.move(state, state[2] * quantum, state[3] * quantum)
+
+        if len(removed) or len(spawned) or header['keyframe']:
+            self.circles = [state[1] for state in entities.values() if state[0] == KIND_CIRCLE]
+            self.projectiles = [state[1] for state in entities.values() if state[0] == KIND_PROJECTILE]
+            self.particles = [state[1] for state in entities.values() if state[0] >= KIND_PARTICLE]
+        self.ticks_applied += 1
+        self.apply_time += time.perf_counter() - start_time
+
+    def report(self):
+        """Report what has been received and what applying it cost."""
+        ticks = self.ticks_applied
+        return {'ticks': ticks, 'entities': len(self.entities),
+                'kb_per_tick': round(self.bytes_received / ticks / 1024, 2) if ticks else 0.0,
+                'apply_ms': round(1000 * self.apply_time / ticks, 3) if ticks else 0.0}
+
+
+def run_viewer(address=None):
+    """Spectator window: draws the streamed world with the game's own draw code until closed."""
+    import pygame
+    from playarea import draw_game_objects
+    from ui import draw_game_ui
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Spectator")
+    font_small = pygame.font.SysFont(None, int(24 * SCALE_X))
+    clock = pygame.time.Clock()
+    client = SpectatorClient()
+    client.connect(address)
+
+    while client.connected:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        client.poll()
+        alpha = min(1.0, (time.perf_counter() - client.tick_time) / LOGIC_TIMESTEP)
+        sim_clock.set_tick(client.tick)  # This process's clock only drives the particle draw time
+
+        screen.fill(BACKGROUND_BLUE)
+        draw_game_objects(screen, client.player, client.circles, client.projectiles, client.particles,
+                          alpha, alpha, client.game_over)
+        draw_game_ui(screen, font_small, client.score, client.circle_hits)
+        pygame.display.flip()
+        clock.tick(60)
+    print(f"Spectator: {client.report()}")
+
+
+# Global spectator server instance
+spectator_server = SpectatorServer()
+
+
+if __name__ == "__main__":
+    if "--bench" not in sys.argv:
+        # Usage: python spectator.py [host:port | unix socket path]
+        target = sys.argv[1] if len(sys.argv) > 1 else None
+        if target is not None and ':' in target:
+            host, port = target.rsplit(':', 1)
+            target = (host, int(port))
+        run_viewer(target)
+        sys.exit()
+
+    # Usage: python spectator.py --bench
+    # 2000 moving entities with some churn, streamed over localhost TCP to a client in the same process:
+    # bandwidth against sending the full float state, server and client cost, and how close the copy is
+    import random
+    import pygame
+    from player import Player
+    from entities import Circle
+    from projectiles import Projectile
+    from effects import Particle
+
+    random.seed(1)
+    pygame.init()
+
+    def particle():
+        """A persistent or short-lived particle with a random push."""
+        return Particle(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), random.random() < 0.7,
+                        (random.uniform(-6, 6) * SCALE_X, random.uniform(-6, 6) * SCALE_X))
+
+    def projectile():
+        """A projectile fired from the middle towards a random point."""
+        return Projectile(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, random.uniform(0, SCREEN_WIDTH),
+                          random.uniform(0, SCREEN_HEIGHT))
+
+    player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    circles = [Circle() for _ in range(200)]
+    projectiles = [projectile() for _ in range(100)]
+    particles = [particle() for _ in range(1699)]
+
+    server = SpectatorServer()
+    server.start(('127.0.0.1', 0))
+    client = SpectatorClient()
+    client.connect(server.address)
+
+    worst = 0.0
+    ticks = 400
+    for tick in range(ticks):
+        sim_clock.advance()
+        for circle in circles:
+            circle.update(LOGIC_TIMESTEP)
+        for shot in projectiles:
+            shot.update(circles, LOGIC_TIMESTEP)
+        player.rect.x += 1
+
+        # Churn: a few shots leave and particles burn out each tick, and as many new ones appear
+        for i in random.sample(range(len(projectiles)), 3):
+            projectiles[i] = projectile()
+        for i in random.sample(range(len(particles)), 40):
+            particles[i] = particle()
+        if tick % 50 == 0:
+            for _ in range(5):
+                particles[random.randrange(len(particles))].apply_impulse(5.0, -5.0, sim_clock.now)
+
+        server.publish(sim_clock.tick, player, circles, projectiles, particles, False, tick * LOGIC_TIMESTEP, 0)
+        while client.tick < sim_clock.tick:
+            client.poll()
+
+        # Every entity on the client is within half a quantum step of the real one
+        truth = [(shot.uid, shot.x, shot.y) for shot in projectiles] + [(c.uid, c.x, c.y) for c in circles] + \
+                [(p.uid, *p.position_at(sim_clock.now)) for p in particles]
+        for uid, x, y in truth:
+            _, _, qx, qy = client.entities[uid]
+            if max(abs(x), abs(y)) < POSITION_LIMIT * SPECTATOR_POSITION_QUANTUM:  # Else clipped on purpose
+                worst = max(worst, abs(qx * SPECTATOR_POSITION_QUANTUM - x), abs(qy * SPECTATOR_POSITION_QUANTUM - y))
+        assert len(client.entities) == 1 + len(circles) + len(projectiles) + len(particles)
+
+    report, client_report = server.report(), client.report()
+    entities = 1 + len(circles) + len(projectiles) + len(particles)
+    print(f"{entities} entities over localhost TCP, {ticks} ticks")
+    print(f"  full float state: {entities * FULL_STATE_BYTES / 1024:.1f} KB per tick")
+    print(f"  delta payload:    {server.delta_bytes / ticks / 1024:.1f} KB per tick before compression")
+    print(f"  on the wire:      {report['kb_per_tick']:.1f} KB per tick ({report['vs_full_state_pct']}% of full state, "
+          f"{report['kb_per_tick'] * 20 / 1024:.2f} MB/s at 20 ticks/s)")
+    print(f"  server publish:   {report['publish_ms']:.2f} ms per tick")
+    print(f"  client apply:     {client_report['apply_ms']:.2f} ms per tick")
+    print(f"  largest position error: {worst:.3f} px (quantum {SPECTATOR_POSITION_QUANTUM} px)")
+    server.stop()
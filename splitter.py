@@ -0,0 +1,176 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+import numpy as np
+from constants import *
+from rng import rng
+from entities import circle_pool
+
+MAX_SPLITS = 6  # Children per split are 2 to MAX_SPLITS; tables are padded to this width
+
+
+class BatchSplitter:
+    """Splits a tick's batch of destroyed circles in one vectorized pass using precomputed split tables."""
+
+    def __init__(self, table_size=SPLIT_TABLE_SIZE):
+        self.table_size = table_size
+        self.min_radius = MIN_SPLIT_RADIUS * SCALE_X
+        self.min_area = math.pi * self.min_radius ** 2
+
+        # Padded tables indexed by [split count - 2, ...]
+        counts = np.arange(2, MAX_SPLITS + 1)
+        slots = np.arange(MAX_SPLITS)
+        self.valid = slots[None, :] < counts[:, None]  # Which of the MAX_SPLITS slots a count uses
+        self.slot_angles = np.where(self.valid, 2 * math.pi * slots[None, :] / counts[:, None], 0.0)
+        self.ratio_table = None  # (counts, table_size, MAX_SPLITS) size ratios, 0 in unused slots
+
+        self.splits = 0
+        self.children = 0
+        self.batches = 0  # Calls that took the vectorized path
+        self.scalar_splits = 0  # Parents split one at a time because their tick's batch was small
+
+    def build_tables(self):
+        """Precompute table_size size-ratio rows per split count (same distribution as Circle.split)."""
+        generator = rng.generator
+        table = np.zeros((MAX_SPLITS - 1, self.table_size, MAX_SPLITS))
+        for n in range(2, MAX_SPLITS + 1):
+            ratios = np.zeros((self.table_size, n))
+            remaining = np.ones(self.table_size)
+            for i in range(n - 1):
+                # Each slot takes a random portion of what is left; the last slot gets the rest
+                ratios[:, i] = 0.1 + (remaining * 0.8 - 0.1) * generator.random(self.table_size)
+                remaining -= ratios[:, i]
+            ratios[:, n - 1] = remaining
+
+            # Shuffle each row so any slot can get the big piece, then normalize to 80% of the area
+            order = np.argsort(generator.random((self.table_size, n)), axis=1)
+            ratios = np.take_along_axis(ratios, order, axis=1)
+            ratios *= 0.8 / ratios.sum(axis=1, keepdims=True)
+            table[n - 2, :, :n] = ratios
+        self.ratio_table = table
+
+    def split_batch(self, parents, delays=None, dt=LOGIC_TIMESTEP):
+        """Split many circles at once; returns the children (late ones are advanced by delays[i] ticks)."""
+        if self.ratio_table is None:
+            self.build_tables()
+        if not parents:
+            return []
+
+        count = len(parents)
+        if count < SPLIT_BATCH_MIN:
+            return self.split_each(parents, delays, dt)
+        radius = np.fromiter((c.radius for c in parents), float, count)
+        eligible = radius >= self.min_radius * 2
+        if not eligible.any():
+            return []
+        index = np.flatnonzero(eligible)
+        radius = radius[index]
+        count = len(index)
+        parents = [parents[i] for i in index]
+        x = np.fromiter((c.x for c in parents), float, count)
+        y = np.fromiter((c.y for c in parents), float, count)
+        speed = np.fromiter((c.speed for c in parents), float, count) * 1.2  # Children are slightly faster
+        delay = np.zeros(count) if delays is None else np.asarray(delays, float)[index]
+
+        # Split counts, reduced when the parent is too small to give every child the minimum size
+        total_area = math.pi * radius ** 2 * 0.8
+        n = rng.integers_array(count, 2, MAX_SPLITS)
+        too_many = total_area < n * self.min_area
+        n = np.where(too_many, np.clip((total_area / self.min_area).astype(int), 2, MAX_SPLITS), n)
+
+        # Look up a random table row per parent and a random rotation
+        rows = rng.integers_array(count, 0, self.table_size - 1)
+        ratios = self.ratio_table[n - 2, rows]  # (count, MAX_SPLITS)
+        mask = self.valid[n - 2]
+        angles = rng.uniform_array(count, 0, 2 * math.pi)[:, None] + self.slot_angles[n - 2]
+
+        # Child radii from their share of the area, never below the minimum split size
+        target_area = total_area[:, None] * ratios
+        child_radius = np.sqrt(np.maximum(target_area, 0) / math.pi)
+        child_radius = np.where(target_area > 0, np.maximum(child_radius, self.min_radius), self.min_radius)
+
+        # Children start 70% of the parent radius out and move straight away from the centre
+        cos_a, sin_a = np.cos(angles), np.sin(angles)
+        child_dx = cos_a * speed[:, None]
+        child_dy = sin_a * speed[:, None]
+        child_x = x[:, None] + cos_a * (radius * 0.7)[:, None] + child_dx * (dt * delay)[:, None]
+        child_y = y[:, None] + sin_a * (radius * 0.7)[:, None] + child_dy * (dt * delay)[:, None]
+
+        # Flatten the padded rows (masked slots are dropped) and emit pooled circles
+        parent_of = np.nonzero(mask)[0].tolist()
+        children = []
+        for parent_index, r, cx, cy, dx, dy in zip(parent_of, child_radius[mask].tolist(),
+                                                   child_x[mask].tolist(), child_y[mask].tolist(),
+                                                   child_dx[mask].tolist(), child_dy[mask].tolist()):
+            parent = parents[parent_index]
+            child = circle_pool.acquire_blank()
+            child.radius = r
+            child.speed = parent.speed * 1.2
+            child.color = parent.color
+            child.prev_x = child.x = cx
+            child.prev_y = child.y = cy
+            child.dx = dx
+            child.dy = dy
+            child.lod_period = 0
+            child.lod_due = 0
+            child.lod_born = 0
+            child.lod_serial = 0
+            children.append(child)
+
+        self.splits += count
+        self.children += len(children)
+        self.batches += 1
+        return children
+
+    def split_each(self, parents, delays=None, dt=LOGIC_TIMESTEP):
+        """Scalar path for small batches - one Circle.split per parent."""
+        children = []
+        for i, parent in enumerate(parents):
+            delay = delays[i] if delays is not None else 0
+            for child in parent.split():
+                # Catch late children up to where they would be had they spawned on time
+                child.prev_x = child.x = child.x + child.dx * dt * delay
+                child.prev_y = child.y = child.y + child.dy * dt * delay
+                children.append(child)
+        self.scalar_splits += len(parents)
+        self.children += len(children)
+        return children
+
+    def report(self):
+        """Report how many splits took the vectorized and the scalar path."""
+        return {'batches': self.batches, 'batched_splits': self.splits, 'scalar_splits': self.scalar_splits,
+                'children': self.children}
+
+
+# Global batch splitter instance
+batch_splitter = BatchSplitter()
+
+
+if __name__ == "__main__":
+    # Benchmark: scalar Circle.split per circle versus one batched pass
+    import timeit
+    from entities import Circle
+    from cache import calculation_cache
+
+    calculation_cache.preload_all()
+    batch_splitter.build_tables()
+    print(f"{'splits':>7} {'scalar us':>10} {'batched us':>11} {'speedup':>8}")
+    for batch in (1, 10, 100):
+        parents = [Circle() for _ in range(batch)]
+        for parent in parents:
+            parent.radius = MAX_RADIUS * SCALE_X  # Always large enough to split
+
+        def scalar():
+            for parent in parents:
+                circle_pool.release_all(parent.split())
+
+        def batched():
+            circle_pool.release_all(batch_splitter.split_batch(parents))
+
+        if batch < SPLIT_BATCH_MIN:
+            batched = scalar  # split_batch hands small batches to the scalar path anyway
+
+        repeats = max(20, 2000 // batch)
+        scalar_time = min(timeit.repeat(scalar, number=repeats, repeat=5)) / repeats * 1e6
+        batched_time = min(timeit.repeat(batched, number=repeats, repeat=5)) / repeats * 1e6
+        print(f"{batch:>7} {scalar_time:>10.1f} {batched_time:>11.1f} {scalar_time / batched_time:>7.2f}x")
@@ -0,0 +1,183 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import os
+import sys
+import glob
+import time
+import threading
+import numpy as np
+from constants import *
+
+# game_logic phases recorded per tick (names match the watchdog.mark calls in main.py)
+TELEMETRY_PHASES = ('circles', 'projectiles', 'expiry', 'explosions', 'collisions',
+                    'destruction', 'stars', 'cache_and_audio')
+
+# Record kinds
+RECORD_TICK = 0
+RECORD_FRAME = 1
+
+# Fire modes
+FIRE_IDLE = 0
+FIRE_SINGLE = 1
+FIRE_AUTO = 2
+
+# One fixed-width record per tick or frame; seq 0 marks a slot that was never written
+RECORD_DTYPE = np.dtype([
+    ('seq', '<u8'),            # Monotonic record number - orders the ring when it wraps
+    ('time', '<f8'),           # Seconds since the session started
+    ('kind', 'u1'),            # RECORD_TICK or RECORD_FRAME
+    ('fire_mode', 'u1'),       # FIRE_IDLE, FIRE_SINGLE or FIRE_AUTO
+    ('sounds_played', '<u2'),  # Sounds started by this tick's flush
+    ('tick', '<u4'),           # Logic tick number
+    ('circles', '<u2'),
+    ('projectiles', '<u2'),
+    ('particles', '<u4'),
+    ('explosions', '<u2'),
+    ('clouds', '<u2'),
+    ('spawn_delay', '<f4'),
+    ('fire_delay', '<f4'),     # Seconds between auto-fire volleys
+    ('sounds_merged', '<u4'),  # Running totals from the sound queue
+    ('sounds_dropped', '<u4'),
+    ('fps', '<f4'),            # Frame records only
+    ('frame_time', '<f4'),     # Frame records: seconds since the previous frame
+    ('phases', '<f4', (len(TELEMETRY_PHASES),)),  # Tick records: seconds spent in each phase
+])
+
+
+class TelemetrySink:
+    """Writes per-tick and per-frame records into a fixed-size memory-mapped ring on disk."""
+
+    def __init__(self):
+        self.enabled = False
+        self.records = None
+        self.path = None
+        self.capacity = TELEMETRY_CAPACITY
+        self.seq = 0
+        self.start_time = 0.0
+        self.phase_index = {name: i for i, name in enumerate(TELEMETRY_PHASES)}
+        self.phase_buffer = [0.0] * len(TELEMETRY_PHASES)
+        self.no_phases = [0.0] * len(TELEMETRY_PHASES)
+
+        # Background flush thread
+        self.flush_thread = None
+        self.flush_event = threading.Event()
+
+    def start(self):
+        """Open a new session file and start the flush thread (only when TELEMETRY_ENABLED is set)."""
+        if self.enabled or not TELEMETRY_ENABLED:
+            return
+        os.makedirs(TELEMETRY_LOG_DIR, exist_ok=True)
+        self.remove_old_sessions()
+        self.path = os.path.join(TELEMETRY_LOG_DIR, time.strftime("session_%Y%m%d_%H%M%S.npy"))
+
+        # A standard .npy file, so any NumPy install can open it without this module
+        self.records = np.lib.format.open_memmap(self.path, mode='w+', dtype=RECORD_DTYPE,
+                                                 shape=(self.capacity,))
+        self.seq = 0
+        self.start_time = time.perf_counter()
+        self.enabled = True
+
+        # Phase durations come from the watchdog's marks
+        from watchdog import watchdog
+        watchdog.timing = True
+
+        self.flush_event.clear()
+        self.flush_thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.flush_thread.start()
+
+    def stop(self):
+        """Flush the ring one last time and close the session."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.flush_event.set()
+        self.flush_thread.join(timeout=2.0)
+        self.records.flush()
+        self.records = None
+
+    def remove_old_sessions(self):
+        """Keep at most TELEMETRY_MAX_SESSIONS session files (including the one about to be opened)."""
+        sessions = sorted(glob.glob(os.path.join(TELEMETRY_LOG_DIR, "session_*.npy")))
+        for old_path in sessions[:max(0, len(sessions) - TELEMETRY_MAX_SESSIONS + 1)]:
+            os.remove(old_path)
+
+    def flush_loop(self):
+        """Flush loop - pushes dirty pages to disk so the game thread never waits on I/O."""
+        while not self.flush_event.wait(TELEMETRY_FLUSH_INTERVAL):
+            records = self.records
+            if records is not None:
+                records.flush()
+
+    def write(self, record):
+        """Store one record tuple in the next ring slot."""
+        self.seq += 1
+        self.records[self.seq % self.capacity] = record
+
+    def record_tick(self, tick, circles, projectiles, particles, explosions, clouds,
+                    spawn_delay, fire_delay, fire_mode, sound_queue, phases):
+        """Record the state at the end of a game_logic tick."""
+        if not self.enabled:
+            return
+        buffer = self.phase_buffer
+        for i in range(len(buffer)):
+            buffer[i] = 0.0
+        for name, duration in phases.items():
+            i = self.phase_index.get(name)
+            if i is not None:
+                buffer[i] = duration
+        self.write((self.seq + 1, time.perf_counter() - self.start_time, RECORD_TICK, fire_mode,
+                    sound_queue.last_flush_count, tick, circles, projectiles, particles, explosions,
+                    clouds, spawn_delay, fire_delay, sound_queue.merged_events,
+                    sound_queue.dropped_events, 0.0, 0.0, buffer))
+
+    def record_frame(self, tick, fps, frame_time):
+        """Record one rendered frame."""
+        if not self.enabled:
+            return
+        self.write((self.seq + 1, time.perf_counter() - self.start_time, RECORD_FRAME, FIRE_IDLE, 0,
+                    tick, 0, 0, 0, 0, 0, 0.0, 0.0, 0, 0, fps, frame_time, self.no_phases))
+
+
+def load_session(path=None):
+    """Load a session log into chronological tick and frame record arrays (latest session by default)."""
+    if path is None:
+        sessions = sorted(glob.glob(os.path.join(TELEMETRY_LOG_DIR, "session_*.npy")))
+        if not sessions:
+            raise FileNotFoundError(f"No telemetry sessions in {TELEMETRY_LOG_DIR}")
+        path = sessions[-1]
+
+    records = np.load(path, mmap_mode='r')
+    written = records[records['seq'] > 0]
+    written = written[np.argsort(written['seq'])]  # Undo the ring wrap-around
+    return {
+        'ticks': written[written['kind'] == RECORD_TICK],
+        'frames': written[written['kind'] == RECORD_FRAME],
+        'phases': TELEMETRY_PHASES,
+        'path': path,
+    }
+
+
+def summarize(session):
+    """Text summary of a loaded session."""
+    ticks, frames = session['ticks'], session['frames']
+    lines = [f"{session['path']}: {len(ticks)} ticks, {len(frames)} frames"]
+    if len(frames):
+        frame_ms = frames['frame_time'] * 1000
+        lines.append(f"  frame time ms: median {np.median(frame_ms):.1f}, p99 {np.percentile(frame_ms, 99):.1f}, "
+                     f"max {frame_ms.max():.1f}")
+    if len(ticks):
+        for name in ('circles', 'projectiles', 'particles', 'explosions', 'clouds'):
+            lines.append(f"  {name}: mean {ticks[name].mean():.0f}, max {ticks[name].max()}")
+        phase_ms = ticks['phases'] * 1000
+        for i, name in enumerate(session['phases']):
+            lines.append(f"  phase {name} ms: mean {phase_ms[:, i].mean():.2f}, max {phase_ms[:, i].max():.2f}")
+    return "\n".join(lines)
+
+
+# Global telemetry sink instance
+telemetry = TelemetrySink()
+
+
+if __name__ == "__main__":
+    # Usage: python telemetry.py [session.npy]
+    print(summarize(load_session(sys.argv[1] if len(sys.argv) > 1 else None)))
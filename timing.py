@@ -0,0 +1,103 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+from constants import *
+
+
+class SimulationClock:
+    """Tracks logic-tick time so effects can be evaluated at any moment between ticks."""
+
+    def __init__(self):
+        self.tick = 0
+        self.now = 0.0  # Simulation time of the latest logic tick
+
+    def advance(self):
+        """Advance by one logic tick (call once at the start of each tick)."""
+        self.tick += 1
+        self.now = self.tick * LOGIC_TIMESTEP
+
+    def set_tick(self, tick):
+        """Jump to a given logic tick (e.g. when restoring a snapshot)."""
+        self.tick = tick
+        self.now = tick * LOGIC_TIMESTEP
+
+    def render_time(self, alpha):
+        """Simulation time shown by a frame drawn with the given interpolation alpha."""
+        # Interpolated entities are drawn between the previous and latest tick
+        return self.now + (alpha - 1.0) * LOGIC_TIMESTEP
+
+
+class ExpiryScheduler:
+    """Buckets entity deaths by logic tick so each tick only touches what dies on it."""
+
+    def __init__(self, kinds=('particle', 'explosion')):
+        self.kinds = kinds
+        self.buckets = {}  # Key: death tick, Value: dict of entity -> kind (insertion ordered)
+        self.death_ticks = {}  # Key: entity, Value: scheduled death tick
+        self.last_tick = sim_clock.tick
+
+    def schedule(self, entity, kind, expiry_time):
+        """Schedule an entity to expire at a simulation time (replaces any earlier schedule)."""
+        # Never schedule into a tick that has already been processed
+        self.schedule_tick(entity, kind, max(self.last_tick + 1, math.ceil(expiry_time / LOGIC_TIMESTEP - 1e-9)))
+
+    def schedule_tick(self, entity, kind, death_tick):
+        """Schedule an entity to expire on a given tick (e.g. when restoring a snapshot)."""
+        self.cancel(entity)
+        bucket = self.buckets.get(death_tick)
+        if bucket is None:
+            bucket = self.buckets[death_tick] = {}
+        bucket[entity] = kind
+        self.death_ticks[entity] = death_tick
+
+    def cancel(self, entity):
+        """Forget a scheduled entity (e.g. when it is removed early)."""
+        death_tick = self.death_ticks.pop(entity, None)
+        if death_tick is not None:
+            bucket = self.buckets[death_tick]
+            del bucket[entity]
+            if not bucket:
+                del self.buckets[death_tick]
+
+    def pop_due(self, tick):
+        """Return the entities that die on or before this tick, grouped by kind."""
+        due = {kind: [] for kind in self.kinds}
+        while self.last_tick < tick:
+            self.last_tick += 1
+            bucket = self.buckets.pop(self.last_tick, None)
+            if bucket:
+                for entity, kind in bucket.items():
+                    del self.death_ticks[entity]
+                    due[kind].append(entity)
+        return due
+
+    def clear(self):
+        """Forget every scheduled entity (e.g. on game reset)."""
+        self.buckets.clear()
+        self.death_ticks.clear()
+
+    def __len__(self):
+        return len(self.death_ticks)
+
+
+def discard_from(items, dead):
+    """Remove dead entities from a list, rebuilding it once when many die together."""
+    if len(dead) < 8:
+        for entity in dead:
+            try:
+                items.remove(entity)
+            except ValueError:
+                pass
+    else:
+        dead_ids = set(map(id, dead))
+        items[:] = [entity for entity in items if id(entity) not in dead_ids]
+
+
+# Global simulation clock instance
+sim_clock = SimulationClock()
+
+# Global expiry scheduler instance
+expiry_scheduler = ExpiryScheduler()
+
+# Global scheduler for persistent particles coming to rest (see debris.py)
+settle_scheduler = ExpiryScheduler(kinds=('particle',))
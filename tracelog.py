@@ -0,0 +1,269 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import os
+import sys
+import glob
+import time
+import shutil
+from operator import attrgetter
+import numpy as np
+from constants import *
+from timing import sim_clock
+
+# Entity kinds, indexed by the kind column
+TRACE_KINDS = ('player', 'circle', 'projectile', 'particle', 'debris', 'explosion')
+KIND_PLAYER, KIND_CIRCLE, KIND_PROJECTILE, KIND_PARTICLE, KIND_DEBRIS, KIND_EXPLOSION = range(len(TRACE_KINDS))
+
+# One file per column, rows appended tick after tick (velocities are each entity's own dx/dy or vx/vy)
+TRACE_COLUMNS = (
+    ('uid', '<u4'),
+    ('kind', 'u1'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('vx', '<f4'),
+    ('vy', '<f4'),
+    ('radius', '<f4'),
+)
+
+# One record per recorded tick: where its rows start and how many there are; seq 0 marks an unused slot
+TICK_DTYPE = np.dtype([
+    ('seq', '<u4'),
+    ('tick', '<u4'),
+    ('time', '<f8'),   # Simulation time
+    ('start', '<u8'),  # First row in the column files
+    ('count', '<u4'),
+])
+
+
+class TraceRecorder:
+    """Appends every entity's id, kind, position, velocity and radius each tick to memory-mapped column files."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.maps = {}  # Key: column name, Value: memory-mapped array
+        self.columns = {}  # Key: column name, Value: plain ndarray view of the map (cheaper to slice)
+        self.ticks = None
+        self.capacity = TRACE_CAPACITY
+        self.tick_capacity = TRACE_TICK_CAPACITY
+        self.rows = 0
+        self.seq = 0
+        self.dropped_ticks = 0  # Ticks that no longer fitted in the files
+        self.record_time = 0.0
+
+    def start(self):
+        """Create a new session directory and preallocate its files (only when TRACE_ENABLED is set)."""
+        if self.enabled or not TRACE_ENABLED:
+            return
+        os.makedirs(TRACE_LOG_DIR, exist_ok=True)
+        self.remove_old_sessions()
+        self.path = os.path.join(TRACE_LOG_DIR, time.strftime("trace_%Y%m%d_%H%M%S"))
+        os.makedirs(self.path, exist_ok=True)
+
+        # Standard .npy files, so any NumPy install can map them without this module
+        self.maps = {name: np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode='w+',
+                                                     dtype=dtype, shape=(self.capacity,))
+                     for name, dtype in TRACE_COLUMNS}
+        self.columns = {name: np.asarray(column) for name, column in self.maps.items()}
+        self.ticks = np.lib.format.open_memmap(os.path.join(self.path, "ticks.npy"), mode='w+',
+                                               dtype=TICK_DTYPE, shape=(self.tick_capacity,))
+        self.rows = 0
+        self.seq = 0
+        self.dropped_ticks = 0
+        self.record_time = 0.0
+        self.enabled = True
+
+    def stop(self):
+        """Flush the files and close the session."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for column in self.maps.values():
+            column.flush()
+        self.ticks.flush()
+        self.maps = {}
+        self.columns = {}
+        self.ticks = None
+
+    def remove_old_sessions(self):
+        """Keep at most TRACE_MAX_SESSIONS session directories (including the one about to be created)."""
+        sessions = sorted(glob.glob(os.path.join(TRACE_LOG_DIR, "trace_*")))
+        for old_path in sessions[:max(0, len(sessions) - TRACE_MAX_SESSIONS + 1)]:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    def fill(self, row, objects, kind, names):
+        """Copy the x, y, vx, vy and radius attributes column by column into the mapped rows (None writes 0)."""
+        end = row + len(objects)
+        columns = self.columns
+        columns['uid'][row:end] = list(map(attrgetter('uid'), objects))
+        columns['kind'][row:end] = kind
+        for column, name in zip(('x', 'y', 'vx', 'vy', 'radius'), names):
+            columns[column][row:end] = 0.0 if name is None else list(map(attrgetter(name), objects))
+        return end
+
+    def fill_particles(self, row, particles, sleepers):
+        """Evaluate the closed-form particle motion for awake particles and debris sleepers in one pass."""
+        count = len(particles) + len(sleepers)
+        end = row + count
+        if not count:
+            return end
+        columns = self.columns
+        both = particles + sleepers
+        columns['uid'][row:end] = list(map(attrgetter('uid'), both))
+        columns['kind'][row:row + len(particles)] = KIND_PARTICLE
+        columns['kind'][row + len(particles):end] = KIND_DEBRIS
+
+        x0, y0, dx0, dy0, motion_time, spawn_time, initial_size, shrink_duration = (
+            np.array(list(map(attrgetter(name), both))) for name in
+            ('x0', 'y0', 'dx0', 'dy0', 'motion_time', 'spawn_time', 'initial_size', 'shrink_duration'))
+        now = sim_clock.now
+
+        # Same formulas as Particle.position_at, velocity_at and size_at
+        decay = PARTICLE_FRICTION ** (np.maximum(0.0, now - motion_time) / LOGIC_TIMESTEP)
+        travelled = (1.0 - decay) * PARTICLE_GLIDE_FACTOR
+        columns['x'][row:end] = x0 + dx0 * travelled
+        columns['y'][row:end] = y0 + dy0 * travelled
+        columns['vx'][row:end] = dx0 * decay
+        columns['vy'][row:end] = dy0 * decay
+        shrink_ratio = np.clip((now - spawn_time) / shrink_duration, 0.0, 1.0)
+        columns['radius'][row:end] = initial_size * (1.0 - shrink_ratio * 0.5)
+        return end
+
+    def record_tick(self, tick, player, circles, projectiles, particles, explosions):
+        """Append every entity's state at the end of a game_logic tick."""
+        if not self.enabled:
+            return
+        start_time = time.perf_counter()
+        from debris import debris_layer
+        sleepers = list(debris_layer.sleeping)
+        count = ((player is not None) + len(circles) + len(projectiles) + len(particles) + len(sleepers) +
+                 len(explosions))
+        if self.rows + count > self.capacity or self.seq >= self.tick_capacity:
+            self.dropped_ticks += 1  # Full - the session keeps everything recorded so far
+            return
+
+        row = start = self.rows
+        if player is not None:
+            columns = self.columns
+            columns['uid'][row] = 0
+            columns['kind'][row] = KIND_PLAYER
+            columns['x'][row] = player.rect.centerx
+            columns['y'][row] = player.rect.centery
+            columns['vx'][row] = player.vx
+            columns['vy'][row] = player.vy
+            columns['radius'][row] = PLAYER_WIDTH / 2
+            row += 1
+        row = self.fill(row, circles, KIND_CIRCLE, ('x', 'y', 'dx', 'dy', 'radius'))
+        row = self.fill(row, projectiles, KIND_PROJECTILE, ('x', 'y', 'dx', 'dy', 'size'))
+        row = self.fill_particles(row, particles, sleepers)
+        row = self.fill(row, explosions, KIND_EXPLOSION, ('x', 'y', None, None, 'radius'))
+
+        self.ticks[self.seq] = (self.seq + 1, tick, sim_clock.now, start, count)
+        self.seq += 1
+        self.rows = row
+        self.record_time += time.perf_counter() - start_time
+
+    def report(self):
+        """Report how much has been recorded and what it cost."""
+        return {'ticks': self.seq, 'rows': self.rows, 'dropped_ticks': self.dropped_ticks,
+                'record_ms': round(1000 * self.record_time / self.seq, 3) if self.seq else 0.0}
+
+
+def load_trace(path=None):
+    """Map a trace session read-only; every column is a zero-copy view of the rows written (latest by default)."""
+    if path is None:
+        sessions = sorted(glob.glob(os.path.join(TRACE_LOG_DIR, "trace_*")))
+        if not sessions:
+            raise FileNotFoundError(f"No trace sessions in {TRACE_LOG_DIR}")
+        path = sessions[-1]
+
+    ticks = np.load(os.path.join(path, "ticks.npy"), mmap_mode='r')
+    written = int(np.count_nonzero(ticks['seq']))  # Slots are filled in order, so this is a prefix
+    ticks = ticks[:written]
+    rows = int(ticks['start'][-1] + ticks['count'][-1]) if written else 0
+    trace = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')[:rows] for name, _ in TRACE_COLUMNS}
+    trace.update(ticks=ticks, kinds=TRACE_KINDS, path=path)
+    return trace
+
+
+def tick_rows(trace, index):
+    """Zero-copy views of every column for the index-th recorded tick."""
+    record = trace['ticks'][index]
+    start, end = int(record['start']), int(record['start'] + record['count'])
+    return {name: trace[name][start:end] for name, _ in TRACE_COLUMNS}
+
+
+def summarize(trace):
+    """Text summary of a loaded trace session."""
+    ticks = trace['ticks']
+    lines = [f"{trace['path']}: {len(ticks)} ticks, {len(trace['uid'])} rows"]
+    if len(ticks):
+        lines.append(f"  ticks {ticks['tick'][0]}-{ticks['tick'][-1]}, "
+                     f"rows per tick: mean {ticks['count'].mean():.0f}, max {ticks['count'].max()}")
+        kinds = np.bincount(trace['kind'], minlength=len(TRACE_KINDS))
+        for kind, name in enumerate(TRACE_KINDS):
+            if kinds[kind]:
+                ids = np.unique(trace['uid'][trace['kind'] == kind])
+                lines.append(f"  {name}: {len(ids)} entities, {kinds[kind] / len(ticks):.1f} per tick")
+    return "\n".join(lines)
+
+
+# Global trace recorder instance
+trace_recorder = TraceRecorder()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] != "--bench":
+        # Usage: python tracelog.py [session_dir]
+        print(summarize(load_trace(sys.argv[1])))
+        sys.exit()
+    if len(sys.argv) == 1:
+        print(summarize(load_trace()))
+        sys.exit()
+
+    # Usage: python tracelog.py --bench
+    # Cost of one recorded tick with a crowded world, and a check that the reader gets back what was written
+    import random
+    import tempfile
+    from entities import Circle
+    from projectiles import Projectile
+    from effects import Particle, Explosion
+    from player import Player
+
+    random.seed(1)
+    player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    circles = [Circle() for _ in range(200)]
+    projectiles = [Projectile(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT),
+                              random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT)) for _ in range(100)]
+    particles = [Particle(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), True,
+                          (random.uniform(-4, 4), random.uniform(-4, 4))) for _ in range(1680)]
+    explosions = [Explosion(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), 100, 5, 0.5)
+                  for _ in range(20)]
+    entities = 1 + len(circles) + len(projectiles) + len(particles) + len(explosions)
+
+    with tempfile.TemporaryDirectory() as directory:
+        TRACE_ENABLED = True
+        TRACE_LOG_DIR = directory
+        recorder = TraceRecorder()
+        recorder.capacity = entities * 600
+        recorder.start()
+        for _ in range(500):
+            sim_clock.advance()
+            recorder.record_tick(sim_clock.tick, player, circles, projectiles, particles, explosions)
+        recorder.stop()
+        report = recorder.report()
+        print(f"{entities} entities: {report['record_ms']:.2f} ms per recorded tick, "
+              f"{entities * sum(np.dtype(dtype).itemsize for _, dtype in TRACE_COLUMNS) / 1024:.0f} KB per tick")
+
+        trace = load_trace(recorder.path)
+        last = tick_rows(trace, -1)
+        now = sim_clock.now
+        expected_x = [player.rect.centerx] + [c.x for c in circles] + [p.x for p in projectiles] + \
+                     [p.position_at(now)[0] for p in particles] + [e.x for e in explosions]
+        expected_radius = [PLAYER_WIDTH / 2] + [c.radius for c in circles] + [p.size for p in projectiles] + \
+                          [p.size_at(now) for p in particles] + [e.radius for e in explosions]
+        print(f"zero-copy views: {not last['x'].flags['OWNDATA'] and isinstance(trace['x'].base, np.memmap)}")
+        print(f"positions match: {np.allclose(last['x'], expected_x, rtol=1e-5)}, "
+              f"radii match: {np.allclose(last['radius'], expected_radius, rtol=1e-5)}")
+        print(summarize(trace))
+        del trace, last  # Release the maps before the directory goes
@@ -0,0 +1,197 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from constants import *
+
+
+class FrameWatchdog:
+    """Flags frames and logic ticks that blow their budget and saves a sampled profile of each one."""
+
+    def __init__(self):
+        self.enabled = False
+        self.timing = False  # Phase timing also runs for telemetry when the watchdog itself is off
+        self.main_thread_id = threading.main_thread().ident
+
+        # Sampler thread - keeps a short rolling window of main-thread stacks
+        self.samples = deque(maxlen=int(WATCHDOG_SAMPLE_WINDOW / WATCHDOG_SAMPLE_INTERVAL))
+        self.sampler_thread = None
+        self.saved_switch_interval = sys.getswitchinterval()
+        self.labels = {}  # Key: code object, Value: "file:function" label (built once per function)
+
+        # Writer thread - incidents go to disk off the game thread
+        self.incident_queue = queue.Queue()
+        self.writer_thread = None
+        self.running = False
+        self.index_lines = deque(maxlen=WATCHDOG_MAX_INCIDENTS)
+
+        # Current frame and tick
+        self.frame_start = 0.0
+        self.frame_ticks = []  # (total, phases) for each logic tick run during this frame
+        self.frame_gc_pause = 0.0
+        self.tick_start = 0.0
+        self.phase_start = 0.0
+        self.tick_phases = {}
+        self.last_tick_phases = {}
+
+        # Statistics
+        self.frames = 0
+        self.incidents = 0
+        self.worst_frame = 0.0
+
+    def start(self):
+        """Start the sampler and writer threads (only when WATCHDOG_ENABLED is set)."""
+        if self.running or not WATCHDOG_ENABLED:
+            return
+        os.makedirs(WATCHDOG_LOG_DIR, exist_ok=True)
+        self.enabled = True
+        self.timing = True
+        self.running = True
+        # The sampler can only run when the main thread yields the GIL, so let it yield as often as we sample
+        self.saved_switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.saved_switch_interval, WATCHDOG_SAMPLE_INTERVAL))
+        self.sampler_thread = threading.Thread(target=self.sample_loop, daemon=True)
+        self.writer_thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.sampler_thread.start()
+        self.writer_thread.start()
+
+    def stop(self):
+        """Stop both threads, writing out any incidents still queued."""
+        if not self.running:
+            return
+        self.running = False
+        self.enabled = False
+        self.incident_queue.put(None)
+        self.sampler_thread.join(timeout=1.0)
+        self.writer_thread.join(timeout=2.0)
+        sys.setswitchinterval(self.saved_switch_interval)
+
+    def label(self, code):
+        """Flame-graph frame label for a code object."""
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self.labels[code] = label
+        return label
+
+    def sample_loop(self):
+        """Sampler loop - records the main thread's stack every WATCHDOG_SAMPLE_INTERVAL."""
+        while self.running:
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(self.label(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()  # Folded stacks run from the root to the leaf
+                self.samples.append((time.perf_counter(), ";".join(stack)))
+            time.sleep(WATCHDOG_SAMPLE_INTERVAL)
+
+    def begin_frame(self):
+        """Mark the start of a frame."""
+        if not self.enabled:
+            return
+        from pools import gc_monitor
+        self.frame_start = time.perf_counter()
+        self.frame_ticks = []
+        self.frame_gc_pause = gc_monitor.total_pause
+
+    def begin_tick(self):
+        """Mark the start of a game_logic tick."""
+        if not self.timing:
+            return
+        self.tick_start = self.phase_start = time.perf_counter()
+        self.tick_phases = {}
+
+    def mark(self, phase):
+        """Close the current game_logic phase under the given name."""
+        if not self.timing:
+            return
+        now = time.perf_counter()
+        self.tick_phases[phase] = self.tick_phases.get(phase, 0.0) + now - self.phase_start
+        self.phase_start = now
+
+    def end_tick(self):
+        """Mark the end of a game_logic tick."""
+        if not self.timing:
+            return
+        total = time.perf_counter() - self.tick_start
+        self.last_tick_phases = self.tick_phases
+        if self.enabled:
+            self.frame_ticks.append((total, self.tick_phases))
+
+    def end_frame(self, entity_counts):
+        """Mark the end of a frame; queues an incident when the frame or one of its ticks overran."""
+        if not self.enabled:
+            return
+        from pools import gc_monitor
+        end = time.perf_counter()
+        duration = end - self.frame_start
+        self.frames += 1
+        self.worst_frame = max(self.worst_frame, duration)
+
+        slow_ticks = [tick for tick in self.frame_ticks if tick[0] > WATCHDOG_TICK_BUDGET]
+        if duration <= WATCHDOG_FRAME_BUDGET and not slow_ticks:
+            return
+
+        # Fold the stack samples that fall inside this frame
+        folded = {}
+        for stamp, stack in list(self.samples):
+            if self.frame_start <= stamp <= end:
+                folded[stack] = folded.get(stack, 0) + 1
+
+        # Blame the slowest phase of the slowest tick
+        worst_phase = None
+        if self.frame_ticks:
+            worst_tick = max(self.frame_ticks, key=lambda tick: tick[0])
+            if worst_tick[1]:
+                worst_phase = max(worst_tick[1].items(), key=lambda item: item[1])
+
+        self.incidents += 1
+        self.incident_queue.put({
+            'number': self.incidents,
+            'time': time.time(),
+            'duration': duration,
+            'ticks': [total for total, _ in self.frame_ticks],
+            'worst_phase': worst_phase,
+            'gc_pause': gc_monitor.total_pause - self.frame_gc_pause,
+            'counts': dict(entity_counts),
+            'folded': folded,
+        })
+
+    def write_loop(self):
+        """Writer loop - saves each incident as a folded-stack file plus a line in the index."""
+        while True:
+            incident = self.incident_queue.get()
+            if incident is None:
+                return
+            self.write_incident(incident)
+
+    def write_incident(self, incident):
+        """Write one incident (slot files are reused so the log stays WATCHDOG_MAX_INCIDENTS long)."""
+        slot = (incident['number'] - 1) % WATCHDOG_MAX_INCIDENTS
+        filename = f"incident_{slot:02d}.folded"
+        # Folded format ("root;child;leaf count") opens in flamegraph.pl, speedscope and similar viewers
+        with open(os.path.join(WATCHDOG_LOG_DIR, filename), 'w') as f:
+            for stack, count in sorted(incident['folded'].items()):
+                f.write(f"{stack} {count}\n")
+
+        phase = incident['worst_phase']
+        phase_text = f"{phase[0]} {phase[1] * 1000:.1f}ms" if phase else "none"
+        ticks_text = ",".join(f"{total * 1000:.1f}" for total in incident['ticks'])
+        counts_text = " ".join(f"{name}={count}" for name, count in incident['counts'].items())
+        self.index_lines.append(
+            f"#{incident['number']} {time.strftime('%H:%M:%S', time.localtime(incident['time']))} "
+            f"frame={incident['duration'] * 1000:.1f}ms ticks=[{ticks_text}]ms worst_phase={phase_text} "
+            f"gc={incident['gc_pause'] * 1000:.1f}ms {counts_text} "
+            f"samples={sum(incident['folded'].values())} file={filename}")
+        with open(os.path.join(WATCHDOG_LOG_DIR, "incidents.log"), 'w') as f:
+            f.write("\n".join(self.index_lines) + "\n")
+
+
+# Global watchdog instance
+watchdog = FrameWatchdog()
@@ -0,0 +1,128 @@
+# made by SSJMarx with the help of GLM 4.6
+
+import math
+import pygame
+from constants import *
+from projectiles import projectile_pool
+from sounds import sound_queue
+from latency import latency_tracker
+from budget import object_budget
+
+
+class Weapon:
+    """Player weapon that schedules shots in continuous time on the 120 Hz player step."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Return to the idle state (e.g. on game reset)."""
+        self.time = 0.0  # Weapon clock - advanced by each player step
+        self.held = False
+        self.hold_time = 0.0
+        self.fire_delay = AUTO_FIRE_BASE_DELAY * LOGIC_TIMESTEP  # Seconds between auto-fire volleys
+        self.next_shot_time = 0.0  # Earliest time the next auto-fire volley may leave
+        self.single_shot_used = False
+        self.click_count = 0
+        self.last_click_time = -RAPID_CLICK_THRESHOLD
+        self.shots_fired = 0
+
+    def count_click(self):
+        """Track rapid clicking (a quick second click switches from homing shots to auto-fire)."""
+        if self.time - self.last_click_time < RAPID_CLICK_THRESHOLD:
+            self.click_count += 1
+        else:
+            self.click_count = 1
+        self.last_click_time = self.time
+
+    def press(self):
+        """Mouse button went down."""
+        self.held = True
+        self.single_shot_used = False
+        self.hold_time = 0.0
+        self.fire_delay = AUTO_FIRE_BASE_DELAY * LOGIC_TIMESTEP
+        self.count_click()
+        # Fire as soon as the cooldown from the previous volley allows
+        self.next_shot_time = max(self.next_shot_time, self.time)
+
+    def release(self):
+        """Mouse button went up."""
+        self.held = False
+        self.single_shot_used = False
+        self.hold_time = 0.0
+        self.fire_delay = AUTO_FIRE_BASE_DELAY * LOGIC_TIMESTEP
+        self.count_click()
+
+    def is_single_shot(self):
+        """True when the next volley should be the homing single shot."""
+        return (self.click_count == 1 and not self.single_shot_used and
+                self.time - self.last_click_time < RAPID_CLICK_THRESHOLD)
+
+    def update(self, dt, tick_remaining, player, projectiles, volley_size):
+        """Advance by one player step and fire every volley due inside it.
+
+        tick_remaining is the time from the end of this step to the next game_logic tick; new
+        projectiles cover exactly that much ground on their first logic update.
+        """
+        step_start = self.time
+        self.time += dt
+        if not self.held or player is None or player.is_dying:
+            return
+
+        # Ramp the fire rate smoothly while the button is held
+        self.hold_time += dt
+        hold_ratio = min(1.0, self.hold_time / AUTO_FIRE_RAMP_UP_TIME)
+        self.fire_delay = (AUTO_FIRE_BASE_DELAY - (
+            AUTO_FIRE_BASE_DELAY - AUTO_FIRE_MIN_DELAY) * hold_ratio) * LOGIC_TIMESTEP
+
+        if self.is_single_shot():
+            self.fire_volley(step_start, tick_remaining, player, projectiles, volley_size,
+                             SINGLE_FIRE_HOMING_STRENGTH, SINGLE_FIRE_COLOR, SINGLE_FIRE_SIZE_MULTIPLIER, 'missile')
+            self.single_shot_used = True
+            self.next_shot_time = step_start + self.fire_delay
+            return
+
+        size_multiplier = 1.0 + (PROJECTILE_MAX_SIZE_MULTIPLIER - 1.0) * (
+            1.0 - self.fire_delay / (AUTO_FIRE_BASE_DELAY * LOGIC_TIMESTEP))
+        self.next_shot_time = max(self.next_shot_time, step_start)
+        while self.next_shot_time <= self.time:
+            self.fire_volley(self.next_shot_time, tick_remaining, player, projectiles, volley_size,
+                             HOMING_STRENGTH, AUTO_FIRE_COLOR, size_multiplier, 'shoot')
+            self.next_shot_time += self.fire_delay
+
+    def fire_volley(self, shot_time, tick_remaining, player, projectiles, volley_size, homing_strength,
+                    color, size_multiplier, sound):
+        """Spawn one fanned volley aimed at the mouse; returns how many projectiles were added."""
+        # A volley is all or nothing - a lopsided fan would look like a bug
+        if not object_budget.grant('projectile', volley_size, partial=False):
+            return 0
+
+        # Shots that left partway through the step have already flown for the rest of it
+        age = self.time - shot_time
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        origin_x, origin_y = player.rect.centerx, player.rect.centery
+        for i in range(volley_size):
+            angle = (i - (volley_size - 1) / 2) * 0.2 if volley_size > 1 else 0
+            dx, dy = mouse_x - origin_x, mouse_y - origin_y
+            distance = math.sqrt(dx ** 2 + dy ** 2)
+            if distance > 0:
+                cos_a, sin_a = math.cos(angle), math.sin(angle)
+                new_dx, new_dy = dx * cos_a - dy * sin_a, dx * sin_a + dy * cos_a
+                target_x, target_y = origin_x + new_dx, origin_y + new_dy
+            else:
+                target_x, target_y = origin_x, origin_y - 100
+            projectile = projectile_pool.acquire(origin_x, origin_y, target_x, target_y, player.vx, player.vy,
+                                                 homing_strength, color, size_multiplier)
+            projectile.prev_x = projectile.x = origin_x + projectile.dx * age
+            projectile.prev_y = projectile.y = origin_y + projectile.dy * age
+            projectile.pending_dt = tick_remaining
+            projectiles.append(projectile)
+            sound_queue.push(sound)
+
+        self.shots_fired += volley_size
+        latency_tracker.effect('fire')
+        return volley_size
+
+
+# Global player weapon instance
+weapon = Weapon()